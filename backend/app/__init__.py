@@ -1,49 +1,116 @@
 from flask import Flask
 from flask_cors import CORS
 from config import Config
+from app.artifacts import creer_store
+from app.json_codec import FastJSONProvider
+from app.render_cache import RenderCache
+from app.batch import BatchRenderer
+from app.concurrence import LimiteurRendus
+from app.jobs import JobQueue
+from app.cache_pages import cache_pages
+from app.demarrage import PremiereRequete
+from app.image_cache import cache_images
+from app.profils import RegistreProfils
+from app.retention import RetentionManager
+from app import sortie
+from app.telechargement import Telechargements
 import os
-import time
-import threading
-import shutil
-
-def cleanup_temp_files(app):
-    """Clean up temporary files that are older than the retention time"""
-    with app.app_context():
-        retention_time = app.config['PDF_RETENTION_TIME']
-        temp_folder = app.config['TEMP_FOLDER']
-        
-        while True:
-            if os.path.exists(temp_folder):
-                current_time = time.time()
-                for filename in os.listdir(temp_folder):
-                    file_path = os.path.join(temp_folder, filename)
-                    # Check if the file is older than retention time
-                    if os.path.isfile(file_path) and current_time - os.path.getmtime(file_path) > retention_time:
-                        try:
-                            os.remove(file_path)
-                        except Exception as e:
-                            app.logger.error(f"Failed to delete {file_path}: {str(e)}")
-            # Sleep for 15 minutes before next cleanup
-            time.sleep(900)
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    # Analyse et sérialisation JSON rapides (orjson si disponible)
+    app.json = FastJSONProvider(app)
+    
     # Enable CORS with configured origins
     CORS(app, origins=app.config['CORS_ORIGINS'])
     
     # Ensure temp directory exists
     os.makedirs(app.config['TEMP_FOLDER'], exist_ok=True)
     
+    # Stockage des PDF et exports générés
+    store = creer_store(app.config)
+    app.extensions['artifacts'] = store
+    
+    # Téléchargement des artefacts (ETag, Range, délégation au proxy)
+    app.extensions['downloads'] = Telechargements(
+        store,
+        max_age=app.config['PDF_RETENTION_TIME'],
+        offload=app.config['DOWNLOAD_OFFLOAD'],
+        prefixe_accel=app.config['DOWNLOAD_ACCEL_PREFIX']
+    )
+    
+    # Suppression planifiée des fichiers générés
+    retention = RetentionManager(
+        store,
+        app.config['PDF_RETENTION_TIME'],
+        max_bytes=app.config['TEMP_FOLDER_MAX_BYTES'],
+        intervalle_reconciliation=app.config['RETENTION_RECONCILE_INTERVAL'],
+        intervalle_plafond=app.config['RETENTION_CAP_INTERVAL'],
+        logger=app.logger
+    )
+    app.extensions['retention'] = retention
+    
+    # Cache des PDF générés, partagé par les requêtes de ce worker
+    app.extensions['render_cache'] = RenderCache(
+        store,
+        max_entries=app.config['RENDER_CACHE_MAX_ENTRIES'],
+        max_bytes=app.config['RENDER_CACHE_MAX_BYTES'],
+        on_hit=retention.prolonger
+    )
+    
+    # Profils de société enregistrés (coordonnées, mentions légales, logo pré-redimensionné)
+    app.extensions['profiles'] = RegistreProfils(
+        app.config['PROFILES_DB'] or os.path.join(app.instance_path, 'profiles.sqlite3')
+    )
+    
+    # Nombre de rendus simultanés dans ce worker
+    app.extensions['render_limiter'] = LimiteurRendus(
+        app.config['RENDER_CONCURRENCY'],
+        delai_attente=app.config['RENDER_QUEUE_TIMEOUT']
+    )
+    
+    # Pool de processus pour les rendus en lot
+    app.extensions['batch_renderer'] = BatchRenderer(workers=app.config['BATCH_WORKERS'])
+    
+    # File de rendus asynchrones, exécutés sur le même pool ; état partagé par les workers
+    def enregistrer_job(cle, pdf):
+        from app.routes import _enregistrer_pdf
+        with app.app_context():
+            return _enregistrer_pdf(cle, pdf)
+    
+    app.extensions['job_queue'] = JobQueue(
+        app.extensions['batch_renderer'],
+        enregistrer_job,
+        app.config['JOBS_DB'] or os.path.join(app.instance_path, 'jobs.sqlite3'),
+        max_depth=app.config['JOB_MAX_QUEUE_DEPTH'],
+        retention=app.config['PDF_RETENTION_TIME']
+    )
+    
+    # Cache des logos et signatures décodés, partagé par tous les rendus
+    cache_images.configurer(
+        max_bytes=app.config['IMAGE_CACHE_MAX_BYTES'],
+        dpi=app.config['IMAGE_DPI']
+    )
+    
+    # Polices TrueType intégrées par le profil de sortie archive
+    sortie.configurer(fichiers_polices=app.config['PDF_FONT_FILES'])
+    
+    # Pages de produits déjà mises en page, reprises par les rendus suivants
+    cache_pages.configurer(max_bytes=app.config['PAGE_CACHE_MAX_BYTES'])
+    
+    # Durée de la première requête de chaque worker (jauge devis_startup_seconds)
+    app.wsgi_app = PremiereRequete(app.wsgi_app)
+    
     # Register blueprints
     from app.routes import bp as routes_bp
     app.register_blueprint(routes_bp)
     
-    # Start cleanup thread if not in debug mode
+    # Thread de nettoyage démarré dans chaque processus qui sert des requêtes :
+    # avec preload_app, l'application est créée dans le maître gunicorn, dont
+    # les workers forkés n'héritent pas des threads (voir aussi gunicorn.conf.py)
     if not app.config['DEBUG']:
-        cleanup_thread = threading.Thread(target=cleanup_temp_files, args=(app,))
-        cleanup_thread.daemon = True
-        cleanup_thread.start()
+        app.before_request(retention.start)
     
     return app
\ No newline at end of file
@@ -0,0 +1,358 @@
+# app/artifacts.py
+"""
+Stockage des fichiers générés (PDF, exports JSON)
+
+Les routes ne manipulent plus de chemins : elles écrivent et relisent des
+artefacts par leur nom public (celui renvoyé au client et passé à
+/api/download). Trois implémentations sont disponibles :
+
+- `FilesystemStore` : répertoires répartis par préfixe d'empreinte du nom,
+  pour que le dossier temporaire ne contienne jamais des dizaines de milliers
+  d'entrées à plat ;
+- `SQLiteStore` : blobs dans une base SQLite en mode WAL, partagée par tous
+  les workers d'une machine ;
+- `MemoryStore` : dictionnaire en mémoire, pour le développement en un seul
+  processus.
+
+Toutes les écritures sont atomiques : un lecteur concurrent voit soit
+l'ancienne version, soit la nouvelle, jamais un fichier partiel.
+"""
+import contextlib
+import hashlib
+import io
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+def valider_nom(nom):
+    """Refuse les noms qui sortiraient du stockage (séparateurs, fichiers cachés)"""
+    if not nom or nom.startswith('.') or '/' in nom or '\\' in nom or '\0' in nom:
+        raise ValueError(f"Nom d'artefact invalide : {nom!r}")
+    return nom
+
+
+class ArtifactStore:
+    """Interface commune des stockages d'artefacts"""
+
+    backend = None
+
+    def ecrire(self, nom, data):
+        """Enregistre un artefact de façon atomique ; retourne sa taille"""
+        with self.ecriture(nom) as f:
+            f.write(data)
+        return len(data)
+
+    @contextlib.contextmanager
+    def ecriture(self, nom):
+        """Fichier binaire en écriture, publié sous ce nom seulement si le bloc réussit"""
+        valider_nom(nom)
+        tampon = io.BytesIO()
+        yield tampon
+        self.ecrire(nom, tampon.getvalue())
+
+    def lire(self, nom):
+        """Contenu d'un artefact ; lève FileNotFoundError s'il n'existe pas"""
+        raise NotImplementedError
+
+    def ouvrir(self, nom):
+        """Fichier binaire en lecture sur un artefact"""
+        return io.BytesIO(self.lire(nom))
+
+    def chemin(self, nom):
+        """Chemin du fichier sur disque s'il y en a un (envoi direct), sinon None"""
+        return None
+
+    def taille(self, nom):
+        """Taille d'un artefact en octets, ou None s'il n'existe pas"""
+        raise NotImplementedError
+
+    def existe(self, nom):
+        return self.taille(nom) is not None
+
+    def mtime(self, nom):
+        """Date de modification d'un artefact (timestamp), ou None s'il n'existe pas"""
+        raise NotImplementedError
+
+    def toucher(self, nom):
+        """Reporte la date de modification à maintenant (artefact réutilisé) ; retourne False s'il n'existe pas"""
+        raise NotImplementedError
+
+    def supprimer(self, nom):
+        """Supprime un artefact ; retourne False s'il n'existait pas"""
+        raise NotImplementedError
+
+    def lister(self):
+        """Itère sur (nom, taille, date de modification) de tous les artefacts"""
+        raise NotImplementedError
+
+    def supprimer_temporaires(self, avant):
+        """Supprime les écritures inachevées (worker tué) antérieures à `avant` ; retourne leur nombre"""
+        return 0
+
+    def chemin_verrou(self, nom):
+        """Fichier de verrou partagé par les processus utilisant ce stockage, ou None"""
+        return None
+
+    def stats(self):
+        return {'backend': self.backend}
+
+
+class FilesystemStore(ArtifactStore):
+    """
+    Artefacts stockés dans des sous-dossiers dérivés de l'empreinte du nom
+
+    Avec `profondeur=2`, `devis_ab12….pdf` est rangé sous `<racine>/7f/3c/` ;
+    chaque niveau compte au plus 256 sous-dossiers. `profondeur=0` conserve
+    l'ancienne disposition à plat.
+    """
+
+    backend = 'filesystem'
+
+    def __init__(self, racine, profondeur=2):
+        # Chemin absolu : send_file résout les chemins relatifs depuis le paquet app
+        self.racine = os.path.abspath(racine)
+        self.profondeur = profondeur
+        os.makedirs(racine, exist_ok=True)
+
+    def _dossier(self, nom):
+        if not self.profondeur:
+            return self.racine
+        empreinte = hashlib.md5(nom.encode('utf-8')).hexdigest()
+        return os.path.join(self.racine, *(empreinte[2 * i:2 * i + 2] for i in range(self.profondeur)))
+
+    def chemin(self, nom):
+        return os.path.join(self._dossier(valider_nom(nom)), nom)
+
+    @contextlib.contextmanager
+    def ecriture(self, nom):
+        chemin = self.chemin(nom)
+        os.makedirs(os.path.dirname(chemin), exist_ok=True)
+
+        # Écrire dans un fichier temporaire du même dossier puis le renommer,
+        # pour qu'un téléchargement concurrent ne voie jamais un fichier partiel
+        tmp_path = f"{chemin}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                yield f
+            os.replace(tmp_path, chemin)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    def lire(self, nom):
+        with open(self.chemin(nom), 'rb') as f:
+            return f.read()
+
+    def ouvrir(self, nom):
+        return open(self.chemin(nom), 'rb')
+
+    def taille(self, nom):
+        try:
+            return os.path.getsize(self.chemin(nom))
+        except OSError:
+            return None
+
+    def mtime(self, nom):
+        try:
+            return os.path.getmtime(self.chemin(nom))
+        except OSError:
+            return None
+
+    def toucher(self, nom):
+        try:
+            os.utime(self.chemin(nom))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def supprimer(self, nom):
+        try:
+            os.remove(self.chemin(nom))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def lister(self):
+        for entree, stat in self._parcourir(self.racine, self.profondeur):
+            if not entree.name.endswith('.tmp'):
+                yield entree.name, stat.st_size, stat.st_mtime
+
+    def supprimer_temporaires(self, avant):
+        supprimes = 0
+        for entree, stat in self._parcourir(self.racine, self.profondeur):
+            if entree.name.endswith('.tmp') and stat.st_mtime < avant:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(entree.path)
+                    supprimes += 1
+        return supprimes
+
+    def _parcourir(self, dossier, profondeur):
+        """(entrée, stat) des fichiers du stockage, écritures inachevées (.tmp) comprises"""
+        try:
+            entrees = list(os.scandir(dossier))
+        except FileNotFoundError:
+            return
+        for entree in entrees:
+            if profondeur:
+                if entree.is_dir() and len(entree.name) == 2:
+                    yield from self._parcourir(entree.path, profondeur - 1)
+            elif entree.is_file() and not entree.name.startswith('.'):
+                try:
+                    stat = entree.stat()
+                except OSError:
+                    continue
+                yield entree, stat
+
+    def chemin_verrou(self, nom):
+        return os.path.join(self.racine, nom)
+
+    def stats(self):
+        return {'backend': self.backend, 'root': self.racine, 'shard_depth': self.profondeur}
+
+
+class SQLiteStore(ArtifactStore):
+    """
+    Artefacts stockés en blobs dans une base SQLite (journal WAL)
+
+    Le mode WAL laisse les lectures se poursuivre pendant une écriture, ce qui
+    permet de partager la base entre les workers d'une même machine. Chaque
+    thread (et chaque processus après un fork) ouvre sa propre connexion.
+    """
+
+    backend = 'sqlite'
+
+    def __init__(self, chemin_base, timeout=30):
+        self.chemin_base = chemin_base
+        self.timeout = timeout
+        self._local = threading.local()
+        dossier = os.path.dirname(chemin_base)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        with self._connexion() as connexion:
+            connexion.execute(
+                "CREATE TABLE IF NOT EXISTS artifacts ("
+                " nom TEXT PRIMARY KEY,"
+                " data BLOB NOT NULL,"
+                " taille INTEGER NOT NULL,"
+                " mtime REAL NOT NULL)"
+            )
+
+    def _connexion(self):
+        connexion = getattr(self._local, 'connexion', None)
+        if connexion is None or self._local.pid != os.getpid():
+            connexion = sqlite3.connect(self.chemin_base, timeout=self.timeout, isolation_level=None)
+            connexion.execute('PRAGMA journal_mode=WAL')
+            connexion.execute('PRAGMA synchronous=NORMAL')
+            self._local.connexion = connexion
+            self._local.pid = os.getpid()
+        return connexion
+
+    def ecrire(self, nom, data):
+        # Une seule instruction, donc une transaction atomique
+        self._connexion().execute(
+            "INSERT OR REPLACE INTO artifacts (nom, data, taille, mtime) VALUES (?, ?, ?, ?)",
+            (valider_nom(nom), sqlite3.Binary(data), len(data), time.time())
+        )
+        return len(data)
+
+    def lire(self, nom):
+        ligne = self._connexion().execute("SELECT data FROM artifacts WHERE nom = ?", (nom,)).fetchone()
+        if ligne is None:
+            raise FileNotFoundError(nom)
+        return bytes(ligne[0])
+
+    def taille(self, nom):
+        ligne = self._connexion().execute("SELECT taille FROM artifacts WHERE nom = ?", (nom,)).fetchone()
+        return ligne[0] if ligne is not None else None
+
+    def mtime(self, nom):
+        ligne = self._connexion().execute("SELECT mtime FROM artifacts WHERE nom = ?", (nom,)).fetchone()
+        return ligne[0] if ligne is not None else None
+
+    def toucher(self, nom):
+        return self._connexion().execute(
+            "UPDATE artifacts SET mtime = ? WHERE nom = ?", (time.time(), nom)
+        ).rowcount > 0
+
+    def supprimer(self, nom):
+        return self._connexion().execute("DELETE FROM artifacts WHERE nom = ?", (nom,)).rowcount > 0
+
+    def lister(self):
+        yield from self._connexion().execute("SELECT nom, taille, mtime FROM artifacts").fetchall()
+
+    def chemin_verrou(self, nom):
+        return f"{self.chemin_base}{nom}"
+
+    def stats(self):
+        return {'backend': self.backend, 'path': self.chemin_base}
+
+
+class MemoryStore(ArtifactStore):
+    """Artefacts conservés en mémoire, propres au processus (développement, tests)"""
+
+    backend = 'memory'
+
+    def __init__(self):
+        self._artefacts = {}  # nom -> (data, mtime)
+        self._lock = threading.Lock()
+
+    def ecrire(self, nom, data):
+        data = bytes(data)
+        with self._lock:
+            self._artefacts[valider_nom(nom)] = (data, time.time())
+        return len(data)
+
+    def lire(self, nom):
+        with self._lock:
+            entree = self._artefacts.get(nom)
+        if entree is None:
+            raise FileNotFoundError(nom)
+        return entree[0]
+
+    def taille(self, nom):
+        with self._lock:
+            entree = self._artefacts.get(nom)
+        return len(entree[0]) if entree is not None else None
+
+    def mtime(self, nom):
+        with self._lock:
+            entree = self._artefacts.get(nom)
+        return entree[1] if entree is not None else None
+
+    def toucher(self, nom):
+        with self._lock:
+            entree = self._artefacts.get(nom)
+            if entree is None:
+                return False
+            self._artefacts[nom] = (entree[0], time.time())
+        return True
+
+    def supprimer(self, nom):
+        with self._lock:
+            return self._artefacts.pop(nom, None) is not None
+
+    def lister(self):
+        with self._lock:
+            entrees = list(self._artefacts.items())
+        for nom, (data, mtime) in entrees:
+            yield nom, len(data), mtime
+
+    def stats(self):
+        with self._lock:
+            return {'backend': self.backend, 'entries': len(self._artefacts)}
+
+
+def creer_store(config):
+    """Construit le stockage d'artefacts décrit par la configuration de l'application"""
+    backend = config['ARTIFACT_BACKEND']
+    if backend == 'filesystem':
+        return FilesystemStore(config['TEMP_FOLDER'], profondeur=config['ARTIFACT_SHARD_DEPTH'])
+    if backend == 'sqlite':
+        return SQLiteStore(config['ARTIFACT_SQLITE_PATH'] or os.path.join(config['TEMP_FOLDER'], 'artifacts.sqlite3'))
+    if backend == 'memory':
+        return MemoryStore()
+    raise ValueError(f"Stockage d'artefacts inconnu : {backend}")
@@ -0,0 +1,232 @@
+# app/asgi.py
+"""
+Point d'entrée ASGI de l'application Flask
+
+Les entrées/sorties réseau (lecture des corps de requête, envoi des réponses
+aux clients lents) sont faites par la boucle d'événements ; le code Flask,
+synchrone, est exécuté dans deux pools de threads distincts :
+
+- les rendus (chemins de CHEMINS_RENDU) dans un pool de `max_rendus` threads,
+  après avoir obtenu un créneau dans la boucle : une requête qui attend plus de
+  `delai_attente` secondes reçoit un 503 + Retry-After, sans avoir occupé de thread ;
+- toutes les autres requêtes (téléchargements, export, santé, métriques) dans
+  un pool séparé, qui ne se remplit donc jamais de rendus en attente.
+
+Un client qui se déconnecte (message `http.disconnect`) abandonne sa requête :
+il cesse d'attendre un créneau de rendu, et l'envoi de la réponse s'arrête au
+morceau suivant. Un rendu déjà commencé va toutefois jusqu'à son terme.
+"""
+import asyncio
+import contextlib
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.wsgi import FileWrapper
+
+from app import json_codec
+from app.metrics import metriques
+
+# Préfixes des chemins dont les requêtes déclenchent un rendu
+CHEMINS_RENDU = ('/api/generate-devis', '/api/devis.pdf')
+
+# Au-delà, le corps de la requête est mis en fichier temporaire plutôt qu'en mémoire
+_TAILLE_CORPS_MEMOIRE = 1024 * 1024
+
+# Blocs des fichiers envoyés (wsgi.file_wrapper) : un aller-retour avec la boucle par bloc
+_TAILLE_BLOC_FICHIER = 256 * 1024
+
+
+def _file_wrapper(f, taille_bloc=_TAILLE_BLOC_FICHIER):
+    return FileWrapper(f, taille_bloc)
+
+
+def _environ(scope, corps):
+    """Environnement WSGI (PEP 3333) d'une requête HTTP ASGI"""
+    serveur = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': serveur[0],
+        'SERVER_PORT': str(serveur[1] or 80),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': corps,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+        'wsgi.file_wrapper': _file_wrapper,
+    }
+    for nom, valeur in scope.get('headers', ()):
+        nom = nom.decode('latin-1').upper().replace('-', '_')
+        valeur = valeur.decode('latin-1')
+        if nom not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            nom = f'HTTP_{nom}'
+        environ[nom] = f"{environ[nom]},{valeur}" if nom in environ else valeur
+    return environ
+
+
+class ApplicationAsgi:
+    """Adaptateur ASGI d'une application WSGI, avec créneaux de rendu bornés"""
+
+    def __init__(self, wsgi_app, max_rendus=2, delai_attente=10.0, retry_after=2, threads=16):
+        self.wsgi_app = wsgi_app
+        self.max_rendus = max_rendus
+        self.delai_attente = delai_attente
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(threads, thread_name_prefix='asgi')
+        self._pool_rendus = ThreadPoolExecutor(max_rendus or threads, thread_name_prefix='asgi-rendu')
+        self._creneaux = None  # créé dans la boucle d'événements
+
+    @classmethod
+    def depuis_flask(cls, app):
+        """Adaptateur configuré par la configuration de l'application"""
+        return cls(
+            app.wsgi_app,
+            max_rendus=app.config['RENDER_CONCURRENCY'],
+            delai_attente=app.config['RENDER_QUEUE_TIMEOUT'],
+            retry_after=app.config['RENDER_RETRY_AFTER'],
+            threads=app.config['ASGI_THREADS'],
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._cycle_de_vie(receive, send)
+        if scope['type'] != 'http':
+            raise ValueError(f"Type de connexion non pris en charge : {scope['type']}")
+
+        deconnecte = threading.Event()
+        corps = await self._lire_corps(receive, deconnecte)
+        ecoute = asyncio.ensure_future(self._ecouter_deconnexion(receive, deconnecte))
+        try:
+            if deconnecte.is_set():
+                return
+            if not scope['path'].startswith(CHEMINS_RENDU):
+                return await self._executer(self._pool, scope, corps, send, deconnecte)
+
+            if self.max_rendus:
+                creneau = await self._obtenir_creneau(ecoute)
+                if creneau is None:
+                    # Client parti pendant l'attente : ni rendu, ni réponse
+                    return
+                if not creneau:
+                    metriques.incrementer('devis_renders_rejected_total')
+                    return await self._refuser(send)
+            try:
+                await self._executer(self._pool_rendus, scope, corps, send, deconnecte)
+            finally:
+                if self.max_rendus:
+                    self._creneaux.release()
+        finally:
+            ecoute.cancel()
+            corps.close()
+
+    async def _cycle_de_vie(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self._pool.shutdown(wait=False)
+                self._pool_rendus.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _lire_corps(self, receive, deconnecte):
+        corps = tempfile.SpooledTemporaryFile(max_size=_TAILLE_CORPS_MEMOIRE)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                deconnecte.set()
+                break
+            corps.write(message.get('body', b''))
+            if not message.get('more_body'):
+                break
+        corps.seek(0)
+        return corps
+
+    async def _ecouter_deconnexion(self, receive, deconnecte):
+        """Attend la déconnexion du client (corps déjà lu) ; signale aussi les threads"""
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        deconnecte.set()
+
+    async def _obtenir_creneau(self, ecoute):
+        """True si un créneau est obtenu, False après delai_attente, None si le client s'est déconnecté"""
+        if self._creneaux is None:
+            self._creneaux = asyncio.Semaphore(self.max_rendus)
+        acquisition = asyncio.ensure_future(self._creneaux.acquire())
+        await asyncio.wait({acquisition, ecoute}, timeout=self.delai_attente, return_when=asyncio.FIRST_COMPLETED)
+        if not acquisition.done():
+            acquisition.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await acquisition
+        obtenu = not acquisition.cancelled()
+        if ecoute.done():
+            if obtenu:
+                self._creneaux.release()
+            return None
+        return obtenu
+
+    async def _refuser(self, send):
+        corps = json_codec.dumps({
+            'success': False,
+            'error': f"Trop de rendus en cours ({self.max_rendus}), réessayez plus tard"
+        })
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(corps)).encode('latin-1')),
+                (b'retry-after', str(self.retry_after).encode('latin-1')),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': corps})
+
+    async def _executer(self, pool, scope, corps, send, deconnecte):
+        boucle = asyncio.get_running_loop()
+        await boucle.run_in_executor(pool, self._appeler_wsgi, boucle, scope, corps, send, deconnecte)
+
+    def _appeler_wsgi(self, boucle, scope, corps, send, deconnecte):
+        """Exécute l'application WSGI dans un thread ; les envois sont faits par la boucle"""
+        def envoyer(message):
+            asyncio.run_coroutine_threadsafe(send(message), boucle).result()
+
+        reponse = {}
+
+        def start_response(status, headers, exc_info=None):
+            if exc_info and reponse.get('envoyee'):
+                raise exc_info[1].with_traceback(exc_info[2])
+            reponse['status'] = int(status.split(' ', 1)[0])
+            reponse['headers'] = [(nom.lower().encode('latin-1'), valeur.encode('latin-1')) for nom, valeur in headers]
+
+        def commencer():
+            if not reponse.get('envoyee'):
+                reponse['envoyee'] = True
+                envoyer({'type': 'http.response.start', 'status': reponse['status'], 'headers': reponse['headers']})
+
+        if deconnecte.is_set():
+            return
+        iterable = self.wsgi_app(_environ(scope, corps), start_response)
+        try:
+            for morceau in iterable:
+                if deconnecte.is_set():
+                    # Réponse abandonnée : le générateur est fermé sans être épuisé
+                    return
+                if morceau:
+                    commencer()
+                    envoyer({'type': 'http.response.body', 'body': morceau, 'more_body': True})
+            commencer()
+            envoyer({'type': 'http.response.body', 'body': b''})
+        finally:
+            if hasattr(iterable, 'close'):
+                iterable.close()
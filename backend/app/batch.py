@@ -0,0 +1,70 @@
+# app/batch.py
+import atexit
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# Générateur préconstruit propre à chaque processus du pool
+_generator = None
+
+
+def _init_worker():
+    """Initialise un worker du pool avec un générateur prêt à l'emploi"""
+    global _generator
+    from app.devis_generator import GenerateurDevis
+    _generator = GenerateurDevis()
+
+
+def _rendre_devis(parametres):
+    """Rend un devis dans un buffer mémoire (exécuté dans un worker du pool)"""
+    buffer = io.BytesIO()
+    _generator.generer_devis(buffer, **parametres)
+    return buffer.getvalue()
+
+
+class BatchRenderer:
+    """
+    Pool de processus pour le rendu de devis en parallèle
+
+    Le rendu ReportLab est purement CPU et reste bloqué par le GIL dans un
+    thread ; un pool de processus permet d'utiliser tous les cœurs. Le pool est
+    créé à la première utilisation et réutilisé ensuite.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+                atexit.register(self.shutdown)
+            return self._executor
+
+    def submit(self, parametres):
+        """Soumet un rendu au pool et retourne le Future correspondant"""
+        return self.executor.submit(_rendre_devis, parametres)
+
+    def rendre(self, liste_parametres):
+        """
+        Rend une liste de devis en parallèle
+
+        Produit des tuples (index, pdf, erreur) dans l'ordre des entrées ; une
+        erreur sur un devis n'interrompt pas le reste du lot.
+        """
+        futures = [self.submit(parametres) for parametres in liste_parametres]
+        for index, future in enumerate(futures):
+            try:
+                yield index, future.result(), None
+            except Exception as e:
+                yield index, None, e
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
@@ -0,0 +1,99 @@
+# app/cache_pages.py
+"""
+Cache des pages de produits déjà mises en page
+
+Un devis modifié dans l'éditeur est régénéré après chaque changement, souvent
+limité à une ligne. Chaque page de produits est identifiée par l'empreinte de
+ce qui la détermine : l'en-tête (société, client : il fixe la hauteur du
+cadre), les produits de la page et leurs totaux. Le contenu compressé de ses
+pages PDF (hors en-tête et pied de page, dessinés par le template) est
+conservé ; au rendu suivant, une page dont l'empreinte n'a pas changé est
+recopiée telle quelle, sans mise en page ni compression. La dernière page,
+qui porte les totaux du devis, est toujours recalculée.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from app import json_codec
+
+
+def empreinte_document(infos_societe, infos_client):
+    """Empreinte de ce qui est commun à toutes les pages (en-tête et géométrie du cadre)"""
+    return hashlib.sha256(json_codec.dumps([infos_societe, infos_client])).hexdigest()
+
+
+def empreinte_page(cle_document, produits, totaux_lignes):
+    """Empreinte d'une page de produits"""
+    h = hashlib.sha256(cle_document.encode('ascii'))
+    h.update(json_codec.dumps([produits, totaux_lignes]))
+    return h.hexdigest()
+
+
+class CachePages:
+    """
+    Cache LRU du contenu des pages de produits, borné en octets
+
+    Une entrée est le tuple des contenus compressés (Flate) des pages PDF
+    d'une page de produits (plusieurs quand son tableau déborde).
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def configurer(self, max_bytes=None):
+        """Applique la configuration de l'application et vide le cache"""
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def get(self, cle):
+        """Contenus des pages pour cette empreinte, ou None"""
+        with self._lock:
+            contenus = self._entries.get(cle)
+            if contenus is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(cle)
+            self.hits += 1
+            return contenus
+
+    def put(self, cle, contenus):
+        taille = sum(len(c) for c in contenus)
+        with self._lock:
+            if cle in self._entries or taille > self.max_bytes:
+                return
+            self._entries[cle] = contenus
+            self._total_bytes += taille
+            while self._total_bytes > self.max_bytes:
+                _, ancien = self._entries.popitem(last=False)
+                self._total_bytes -= sum(len(f) for f in ancien)
+                self.evictions += 1
+
+    def stats(self):
+        """Compteurs et occupation du cache"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+# Cache partagé par tous les rendus du processus
+cache_pages = CachePages()
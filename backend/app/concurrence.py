@@ -0,0 +1,71 @@
+# app/concurrence.py
+"""
+Limitation du nombre de rendus simultanés
+
+Un rendu de devis est purement CPU : au-delà de quelques rendus en parallèle
+dans un même worker, chacun ralentit tous les autres (GIL) sans améliorer le
+débit, et les requêtes légères (téléchargements, export, métriques) attendent
+derrière. Les rendus prennent donc un créneau parmi `max_concurrents` ; une
+requête qui n'obtient pas de créneau après `delai_attente` secondes est
+refusée (503 + Retry-After) au lieu d'allonger la file.
+"""
+import contextlib
+import threading
+
+from app.metrics import metriques
+
+
+class RenduSatureError(Exception):
+    """Levée quand aucun créneau de rendu ne s'est libéré à temps"""
+
+
+class LimiteurRendus:
+    """Créneaux de rendu partagés par les threads d'un worker (0 = illimité)"""
+
+    def __init__(self, max_concurrents, delai_attente=10.0):
+        self.max_concurrents = max_concurrents
+        self.delai_attente = delai_attente
+        self._semaphore = threading.BoundedSemaphore(max_concurrents) if max_concurrents else None
+        self._lock = threading.Lock()
+        self.en_cours = 0
+        self.en_attente = 0
+        self.refus = 0
+
+    @contextlib.contextmanager
+    def creneau(self):
+        """Bloc exécuté avec un créneau de rendu ; lève RenduSatureError après le délai d'attente"""
+        if self._semaphore is None:
+            yield
+            return
+
+        with self._lock:
+            self.en_attente += 1
+        try:
+            obtenu = self._semaphore.acquire(timeout=self.delai_attente)
+        finally:
+            with self._lock:
+                self.en_attente -= 1
+        if not obtenu:
+            with self._lock:
+                self.refus += 1
+            metriques.incrementer('devis_renders_rejected_total')
+            raise RenduSatureError(f"Trop de rendus en cours ({self.max_concurrents}), réessayez plus tard")
+
+        with self._lock:
+            self.en_cours += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.en_cours -= 1
+            self._semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'max_concurrent': self.max_concurrents,
+                'running': self.en_cours,
+                'waiting': self.en_attente,
+                'rejected': self.refus,
+                'queue_timeout': self.delai_attente,
+            }
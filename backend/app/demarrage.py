@@ -0,0 +1,118 @@
+# app/demarrage.py
+"""
+Démarrage rapide des workers
+
+ReportLab, PIL et NumPy ne sont importés qu'à la première utilisation : les
+routes qui ne rendent pas de PDF (téléchargement, export, santé) n'en
+dépendent pas. Les points d'entrée (wsgi.py, asgi.py) appellent en revanche
+`prechauffer(app)` : la pile de rendu est importée puis exercée par un rendu
+jetable (polices, styles, métriques de police, désignations compilées).
+Chargée avec `preload_app` (voir gunicorn.conf.py), elle l'est une seule fois
+dans le processus maître, et les workers forkés la partagent en copie sur
+écriture au lieu de payer ce coût à leur première requête.
+
+Les durées d'import, de préchauffage et de la première requête de chaque
+processus sont exposées par la jauge `devis_startup_seconds`.
+"""
+import io
+import os
+import threading
+import time
+
+from app.metrics import metriques
+
+# Devis jetable du préchauffage : en-tête complet, désignations avec puces et retours à la ligne
+_PAYLOAD_PRECHAUFFAGE = {
+    'infos_societe': {
+        'nom': 'Préchauffage', 'adresse': '1 rue de la Paix', 'code_postal': '75002', 'ville': 'Paris',
+        'telephone': '01 23 45 67 89', 'email': 'contact@exemple.fr', 'numero_devis': 'D-00000',
+        'siret': '123 456 789 00012', 'tva_intracom': 'FR00123456789',
+    },
+    'infos_client': {'nom': 'Client', 'adresse': '2 avenue Foch', 'code_postal': '69001', 'ville': 'Lyon'},
+    'produits': [
+        {'quantite': i + 1, 'designation': f"- Pose et fourniture n°{i}\nFinitions, nettoyage du chantier", 'prix_unitaire': 12.5}
+        for i in range(6)
+    ],
+    'conditions': {'tva_taux': 20, 'validite': '3 mois'},
+}
+
+_demarrage = {}
+_lock = threading.Lock()
+
+
+def importer_rendu():
+    """Importe la pile de rendu (ReportLab, générateur) ; renvoie la durée en secondes"""
+    debut = time.perf_counter()
+    from app import designation, devis_generator, pagination  # noqa: F401
+    duree = time.perf_counter() - debut
+    _noter('import', duree)
+    return duree
+
+
+def prechauffer(app):
+    """
+    Importe et exerce la pile de rendu avant la première requête
+
+    Rend un devis jetable dans chaque mode de pagination, puis remet à zéro
+    les métriques et le cache de pages pour que ce rendu n'apparaisse nulle part.
+    """
+    from app.cache_pages import cache_pages
+    from app.render_cache import normaliser_parametres
+
+    duree_import = importer_rendu()
+    from app.devis_generator import GenerateurDevis
+
+    debut = time.perf_counter()
+    generateur = GenerateurDevis()
+    for mode in ('fixed', 'auto'):
+        data = dict(_PAYLOAD_PRECHAUFFAGE, conditions=dict(
+            _PAYLOAD_PRECHAUFFAGE['conditions'], paginationSettings={'mode': mode, 'itemsPerPage': 4}
+        ))
+        generateur.generer_devis(io.BytesIO(), **normaliser_parametres(data))
+    duree = time.perf_counter() - debut
+
+    metriques.reinitialiser()
+    cache_pages.configurer()
+    _noter('warmup', duree)
+    app.logger.info("Pile de rendu préchauffée : import %.0f ms, rendu jetable %.0f ms",
+                    duree_import * 1000, duree * 1000)
+
+
+def _noter(phase, duree):
+    with _lock:
+        _demarrage[phase] = duree
+    metriques.definir('devis_startup_seconds', duree, phase=phase)
+
+
+def stats():
+    """Durées de démarrage de ce processus, en millisecondes"""
+    with _lock:
+        return {phase: round(duree * 1000, 1) for phase, duree in _demarrage.items()}
+
+
+class PremiereRequete:
+    """
+    Middleware WSGI chronométrant la première requête de chaque processus
+
+    Un worker forké hérite de l'état du maître : la mesure est refaite après
+    chaque fork (comparaison du pid).
+    """
+
+    def __init__(self, application):
+        self.application = application
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def __call__(self, environ, start_response):
+        if self._pid == os.getpid():
+            return self.application(environ, start_response)
+        with self._lock:
+            premiere = self._pid != os.getpid()
+            self._pid = os.getpid()
+        if not premiere:
+            return self.application(environ, start_response)
+        debut = time.perf_counter()
+        try:
+            return self.application(environ, start_response)
+        finally:
+            _noter('first_request', time.perf_counter() - debut)
@@ -0,0 +1,118 @@
+# app/designation.py
+"""
+Compilation des désignations de produits en paragraphes ReportLab
+
+Une désignation est convertie une seule fois en markup (sauts de ligne, puces)
+puis analysée par le parseur de ReportLab ; le résultat (fragments) est mis en
+cache et réutilisé pour tous les paragraphes portant le même texte, si bien
+que les articles de catalogue récurrents ne sont plus jamais ré-analysés.
+La césure en lignes est elle aussi partagée : pour une largeur donnée, elle
+n'est calculée qu'une fois, qu'il s'agisse de mesurer la ligne pour la
+pagination ou de la dessiner dans le tableau.
+"""
+import functools
+import re
+
+from reportlab.platypus import Paragraph
+
+# Séparateurs de lignes : retour à la ligne ou balise <br/> déjà présente
+_SEPARATEUR_LIGNES = re.compile(r'\n|<br/>')
+
+# Caractères introduisant une ligne de liste à puces (tiret, puce, étoile)
+_PUCES = frozenset('-•*')
+
+# Nombre de désignations compilées conservées
+TAILLE_CACHE = 4096
+
+# Nombre de blocs de société et pieds de page compilés conservés
+TAILLE_CACHE_BLOCS = 256
+
+
+def compiler_markup(designation):
+    """Convertit le texte brut d'une désignation en markup ReportLab, en une seule passe"""
+    lignes = []
+    for ligne in _SEPARATEUR_LIGNES.split(designation):
+        texte = ligne.strip()
+        if texte and texte[0] in _PUCES:
+            # Enlever le tiret/bullet et ajouter le texte au format bullet de ReportLab
+            lignes.append(f"<bullet>&bull;</bullet>{texte[1:].strip()}")
+        else:
+            lignes.append(ligne)
+    return '<br/>'.join(lignes)
+
+
+class ParagrapheDesignation(Paragraph):
+    """
+    Paragraphe dont la césure est partagée avec les autres copies de la même désignation
+
+    `cesures` associe une largeur disponible au résultat de la césure ; les
+    lignes calculées ne sont que lues au dessin, elles peuvent donc être
+    partagées entre paragraphes (et entre threads).
+    """
+
+    def __init__(self, text, style, cesures, **kwargs):
+        super().__init__(text, style, **kwargs)
+        self._cesures = cesures
+
+    def wrap(self, availWidth, availHeight):
+        cesure = self._cesures.get(availWidth)
+        if cesure is None:
+            largeur, hauteur = super().wrap(availWidth, availHeight)
+            if getattr(self, 'blPara', None) is not None:
+                self._cesures[availWidth] = (self._wrapWidths, self.blPara, hauteur)
+            return largeur, hauteur
+        self._wrapWidths, self.blPara, self.height = cesure
+        self.width = availWidth
+        return self.width, self.height
+
+
+@functools.lru_cache(maxsize=TAILLE_CACHE)
+def _compiler(designation, style, style_secours):
+    """Analyse une désignation une fois ; retourne un paragraphe prototype"""
+    try:
+        prototype = Paragraph(compiler_markup(designation), style)
+    except Exception as e:
+        print(f"Erreur lors du traitement de la désignation: {e}")
+        # En cas d'erreur, utiliser le texte brut sans formatage
+        prototype = Paragraph(designation.replace('\n', '<br/>'), style_secours)
+    # Césures par largeur, partagées par tous les paragraphes issus de ce prototype
+    prototype.cesures = {}
+    return prototype
+
+
+def paragraphe_designation(designation, style, style_secours):
+    """Crée le paragraphe d'une désignation à partir des fragments et césures en cache"""
+    prototype = _compiler(designation, style, style_secours)
+    return ParagrapheDesignation(
+        prototype.text, prototype.style, prototype.cesures,
+        bulletText=prototype.bulletText, frags=prototype.frags
+    )
+
+
+@functools.lru_cache(maxsize=TAILLE_CACHE_BLOCS)
+def _analyser(markup, style):
+    prototype = Paragraph(markup, style)
+    prototype.cesures = {}
+    return prototype
+
+
+def paragraphe_bloc(markup, style):
+    """
+    Paragraphe d'un bloc répété d'un devis à l'autre (société, pied de page)
+
+    Même partage que pour les désignations : le markup n'est analysé, et
+    coupé en lignes pour une largeur donnée, qu'une fois par émetteur.
+    """
+    prototype = _analyser(markup, style)
+    return ParagrapheDesignation(prototype.text, prototype.style, prototype.cesures, frags=prototype.frags)
+
+
+def stats():
+    """Compteurs du cache des désignations compilées"""
+    info = _compiler.cache_info()
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'entries': info.currsize,
+        'max_entries': info.maxsize,
+    }
@@ -1,64 +1,485 @@
 # app/devis_generator.py
 from reportlab.lib.pagesizes import A4
-from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak, Frame, PageTemplate
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import BaseDocTemplate, Table, Paragraph, Spacer, PageBreak, Frame, PageTemplate, Flowable
 from reportlab.lib.units import cm
-import datetime
-import base64
-import io
-import re
+from reportlab.pdfbase.pdfdoc import PDFArray, PDFName, PDFStream, PDFZCompress
+from reportlab.pdfgen.canvas import Canvas
 import math
 
+from app.cache_pages import cache_pages, empreinte_document, empreinte_page
+from app.image_cache import cache_images
+from app.metrics import metriques
+from app.montants import CalculTotaux, calculer_totaux, formater, formater_taux
+from app.designation import paragraphe_bloc, paragraphe_designation
+from app.pagination import ENTETE_PRODUITS, hauteur_entete, hauteur_ligne, paginer, par_paquets
+from app.sortie import PROFIL_DEFAUT, polices_integrees
+from app.styles import (
+    CADRE_LOGO, FEUILLE_STANDARD, TABLE_STYLE_BLOC_DEVIS, TABLE_STYLE_ENTETE, TABLE_STYLE_LOGO, feuille_de_styles
+)
+
+# Espace entre le tableau des produits et la suite de la page
+ESPACE_APRES_TABLEAU = 0.3*cm
+
+# Polices enregistrées dans cet ordre au début de chaque rendu incrémental : leurs
+# noms internes (/F1, /F2...) sont les mêmes d'un document à l'autre, condition
+# pour recopier le flux d'une page dans un autre document
+POLICES_STABLES = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique')
+
+
+class _FluxFlowables(list):
+    """
+    Liste de flowables alimentée à la demande par un itérateur
+
+    doc.build consomme les flowables par le début de la liste (et y réinsère les
+    morceaux d'un flowable coupé) ; on ne matérialise donc que ce qu'il regarde.
+    """
+    
+    def __init__(self, source):
+        super().__init__()
+        self._source = iter(source)
+    
+    def _remplir(self, taille):
+        while list.__len__(self) < taille:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                return
+    
+    def __len__(self):
+        self._remplir(1)
+        return list.__len__(self)
+    
+    def __getitem__(self, index):
+        if isinstance(index, int) and index >= 0:
+            self._remplir(index + 1)
+        return list.__getitem__(self, index)
+
+
+def _flux_flate(donnees):
+    """Flux de contenu de page à partir de données déjà compressées (Flate)"""
+    flux = PDFStream(content=donnees)
+    flux.dictionary['Filter'] = PDFArray([PDFName(PDFZCompress.pdfname)])
+    flux.__Comment__ = "page stream"
+    return flux
+
+
+class _CanvasMesure(Canvas):
+    """
+    Canvas dont l'écriture finale du PDF est chronométrée
+
+    Le numéro de page « Page n / N » est différé : chaque page fait référence
+    à un Form XObject propre, dont le contenu n'est dessiné qu'à l'écriture du
+    fichier, quand le nombre total de pages est connu. Une seule mise en page
+    suffit donc pour un total toujours exact, même quand un tableau déborde
+    sur une page supplémentaire.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._numeros = []
+    
+    def numeroter(self, x, y, police, taille):
+        """Réserve le numéro « Page n / N » de la page en cours, centré sur x"""
+        self._numeros.append((x, y, police, taille))
+        self.doForm(f'numero_page_{len(self._numeros)}')
+    
+    def _dessiner_numeros(self):
+        total = len(self._numeros)
+        for page_num, (x, y, police, taille) in enumerate(self._numeros, start=1):
+            self.beginForm(f'numero_page_{page_num}')
+            self.setFont(police, taille)
+            self.drawCentredString(x, y, f"Page {page_num} / {total}")
+            self.endForm()
+    
+    def marquer_contenu(self):
+        """Appelée après l'en-tête et le pied de page : le contenu propre de la page commence ici"""
+    
+    def save(self):
+        with metriques.mesurer('numerotation'):
+            self._dessiner_numeros()
+        with metriques.mesurer('ecriture'):
+            super().save()
+
+
+class _CanvasIncremental(_CanvasMesure):
+    """
+    Canvas qui sépare le contenu propre de chaque page de son en-tête et pied de page
+
+    Chaque page PDF a deux flux de contenu : l'en-tête et le pied de page
+    (propres au document), puis le contenu du cadre, compressé une fois pour
+    toutes. C'est ce second flux qui est conservé dans le cache de pages et,
+    pour une page reprise du cache, recopié tel quel sans être recompressé.
+    Chaque page est attribuée à la page de produits en cours (voir _DebutPage).
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for police in POLICES_STABLES:
+            self._doc.getInternalFontName(police)
+        self.page_produits = None
+        self.pages_capturees = []
+        self._debut_contenu = 0
+        self._ressources_decor = (0, 0, 0)
+        self._contenu_repris = None
+    
+    def _ressources(self):
+        return len(self._formsinuse), len(self._annotationrefs), len(self._colorsUsed)
+    
+    def marquer_contenu(self):
+        self._debut_contenu = len(self._code)
+        self._ressources_decor = self._ressources()
+    
+    def inserer(self, contenu):
+        """Reprend le contenu compressé d'une page rendue précédemment"""
+        self._contenu_repris = contenu
+    
+    def polices_stables(self):
+        """Vrai si le document n'utilise que les polices de POLICES_STABLES"""
+        return set(self._doc.fontMapping) <= set(POLICES_STABLES)
+    
+    def showPage(self):
+        contenu = self._contenu_repris
+        if contenu is None:
+            contenu = PDFZCompress.encode('\n'.join(self._code[self._debut_contenu:]) + '\n')
+        del self._code[self._debut_contenu:]
+        # Un contenu qui utilise ses propres ressources (images, liens) ne peut être recopié seul
+        reutilisable = self._contenu_repris is not None or self._ressources() == self._ressources_decor
+        self.pages_capturees.append((self.page_produits, contenu if reutilisable else None))
+        self._debut_contenu = 0
+        self._contenu_repris = None
+        
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+        if page.compression:
+            propre = _flux_flate(PDFZCompress.encode(page.stream))
+        else:
+            propre = PDFStream(content=page.stream)
+        page.Contents = PDFArray([propre, _flux_flate(contenu)])
+        page.stream = None
+
+
+class _DebutPage(Flowable):
+    """Marque le début d'une page de produits dans le flux de flowables (rendu incrémental)"""
+    
+    _ZEROSIZE = True
+    
+    def __init__(self, numero):
+        super().__init__()
+        self.numero = numero
+    
+    def wrap(self, availWidth, availHeight):
+        return 0, 0
+    
+    def drawOn(self, canvas, x, y, _sW=0):
+        canvas.page_produits = self.numero
+
+
+class _PageEnCache(Flowable):
+    """Page PDF reprise du cache : occupe tout le cadre, dont le contenu est recopié"""
+    
+    def __init__(self, contenu):
+        super().__init__()
+        self.contenu = contenu
+    
+    def wrap(self, availWidth, availHeight):
+        return availWidth, availHeight
+    
+    def drawOn(self, canvas, x, y, _sW=0):
+        canvas.inserer(self.contenu)
+
+
+class _CanvasFlux(_CanvasMesure):
+    """
+    Canvas qui compresse chaque page dès qu'elle est terminée
+
+    Par défaut ReportLab garde le flux non compressé de toutes les pages jusqu'à
+    l'écriture du fichier ; en rendu au fil de l'eau on ne conserve ainsi que
+    la version compressée des pages déjà produites.
+    """
+    
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+        if page.stream and page.compression:
+            page.Contents = _flux_flate(PDFZCompress.encode(page.stream))
+            page.stream = None
+
+
 class GenerateurDevis:
-    def __init__(self):
-        # Configuration des styles
-        self.styles = getSampleStyleSheet()
-        self.styles.add(ParagraphStyle(name='Center', alignment=1))
-        self.styles.add(ParagraphStyle(name='Right', alignment=2))
+    def __init__(self, feuille=FEUILLE_STANDARD):
+        # Styles partagés par tous les rendus (construits une seule fois par famille de polices)
+        self.feuille = feuille
+        self.styles = feuille.styles
         
-    def generer_devis(self, nom_fichier, infos_societe, infos_client, produits, conditions=None, signature=None, mention_accord=None, date_signature=None):
+    def generer_devis(self, nom_fichier, infos_societe, infos_client, produits, conditions=None, signature=None, mention_accord=None, date_signature=None, totaux=None, profil_sortie=None):
         """
         Génère un devis au format PDF
         
         Args:
             nom_fichier (str): Nom du fichier PDF à générer
-            infos_societe (dict): Informations sur la société
-            infos_client (dict): Informations sur le client
-            produits (list): Liste de dictionnaires contenant les produits/services
-            conditions (dict, optional): Conditions du devis
+            infos_societe (InfosSociete): Informations sur la société
+            infos_client (InfosClient): Informations sur le client
+            produits (sequence): Produits/services (Produit)
+            conditions (Conditions): Conditions du devis
             signature (str, optional): Image de signature en base64
             mention_accord (str, optional): Mention d'accord
             date_signature (str, optional): Date de signature
+            totaux (Totaux, optional): Totaux déjà calculés par calculer_totaux
+            profil_sortie (ProfilSortie, optional): Images et polices (voir app.sortie)
+        
+        Returns:
+            Totaux: Totaux du devis (en centimes)
         """
+        profil = profil_sortie or PROFIL_DEFAUT
+        generateur = self._generateur(profil)
+        if generateur is not self:
+            return generateur.generer_devis(
+                nom_fichier, infos_societe, infos_client, produits, conditions, signature,
+                mention_accord, date_signature, totaux=totaux, profil_sortie=profil
+            )
+        
+        # Totaux de chaque ligne, HT, TVA et TTC, calculés en une passe
+        if totaux is None:
+            totaux = calculer_totaux(produits, conditions)
+        
         # Auto-entrepreneur flag
-        is_auto_entrepreneur = conditions.get('isAutoEntrepreneur', False)
+        is_auto_entrepreneur = conditions.is_auto_entrepreneur
+        pagination = conditions.pagination
         
-        # Gestion de la pagination
-        pagination_settings = conditions.get('paginationSettings', {})
-        items_per_page = pagination_settings.get('itemsPerPage', 4)
-        total_pages = pagination_settings.get('totalPages', math.ceil(len(produits) / items_per_page)) if items_per_page > 0 else 1
+        doc = self._creer_document(nom_fichier, infos_societe, infos_client, is_auto_entrepreneur, profil)
         
-        # Créer un document avec marges réduites
-        doc = SimpleDocTemplate(nom_fichier, pagesize=A4, 
-                               leftMargin=1*cm, rightMargin=1*cm,
-                               topMargin=0.5*cm, bottomMargin=2.5*cm)
+        # Éléments de la dernière page : totaux, conditions et signature
+        elements_finaux = self._creer_elements_finaux(totaux, conditions, signature, mention_accord, date_signature, doc.width, profil)
+        page_finale_seule = False
+        
+        # Diviser les produits en pages
+        if pagination.mode == 'auto':
+            pages, page_finale_seule = self._paginer_auto(produits, elements_finaux, doc)
+        else:
+            items_per_page = pagination.items_per_page
+            nombre_pages = pagination.total_pages or max(1, math.ceil(len(produits) / items_per_page))
+            pages = [produits[i * items_per_page:(i + 1) * items_per_page] for i in range(nombre_pages)]
+        
+        # Rendu incrémental : les pages de produits inchangées depuis un rendu précédent
+        # sont recopiées depuis le cache au lieu d'être remises en page (voir app/cache_pages) ;
+        # le flux repris est compressé et n'utilise que les polices standard
+        incremental = cache_pages.enabled and not profil.polices_integrees
+        cle_document = empreinte_document(infos_societe, infos_client) if incremental else None
+        a_conserver = {}
+        
+        elements = []
+        start_idx = 0
+        for page_num, page_products in enumerate(pages, start=1):
+            if page_num > 1:
+                elements.append(PageBreak())
+            
+            end_idx = start_idx + len(page_products)
+            totaux_lignes = totaux.lignes[start_idx:end_idx]
+            start_idx = end_idx
+            
+            # La dernière page porte les totaux du devis : elle est toujours remise en page
+            if incremental and page_num < len(pages):
+                elements.append(_DebutPage(page_num))
+                cle = empreinte_page(cle_document, page_products, totaux_lignes)
+                contenus = cache_pages.get(cle)
+                if contenus is not None:
+                    elements.extend(self._pages_en_cache(contenus))
+                    continue
+                a_conserver[page_num] = cle
+            elif incremental:
+                elements.append(_DebutPage(None))
+            
+            # Tableau des produits pour cette page
+            elements.append(self._creer_tableau_produits(page_products, totaux_lignes, doc.width))
+            elements.append(Spacer(1, ESPACE_APRES_TABLEAU))
+        
+        # Totaux (affichés uniquement sur la dernière page, seuls s'ils ne tiennent pas sous les produits)
+        if page_finale_seule:
+            elements.append(PageBreak())
+        elements.extend(elements_finaux)
         
-        # Stocker les infos de pied de page pour les utiliser dans le template
-        self.footer_info = {
+        # Génération du document
+        with metriques.mesurer('build'):
+            doc.build(elements, canvasmaker=_CanvasIncremental if incremental else _CanvasMesure)
+        if a_conserver:
+            self._conserver_pages(doc.canv, a_conserver)
+        self._compter_rendu(doc, len(produits))
+        return totaux
+    
+    def generer_devis_flux(self, nom_fichier, infos_societe, infos_client, produits, conditions=None, signature=None, mention_accord=None, date_signature=None, profil_sortie=None):
+        """
+        Génère un devis au format PDF en consommant les produits au fil de l'eau
+        
+        Même mise en page que generer_devis, mais `produits` peut être un itérateur
+        quelconque (par exemple un flux JSON-lines) : chaque page est construite
+        juste avant d'être mise en page, si bien que seuls les produits de la page
+        en cours sont en mémoire, quel que soit le nombre de lignes.
+        
+        Args:
+            produits (iterable): Produits/services (Produit), consommés une seule fois
+            (autres arguments : voir generer_devis)
+        
+        Returns:
+            Totaux: Totaux du devis (sans le détail des lignes)
+        """
+        profil = profil_sortie or PROFIL_DEFAUT
+        generateur = self._generateur(profil)
+        if generateur is not self:
+            return generateur.generer_devis_flux(
+                nom_fichier, infos_societe, infos_client, produits, conditions, signature,
+                mention_accord, date_signature, profil_sortie=profil
+            )
+        
+        is_auto_entrepreneur = conditions.is_auto_entrepreneur
+        pagination = conditions.pagination
+        
+        # Le nombre de pages n'est pas connu à l'avance : il est résolu à l'écriture (voir _CanvasMesure)
+        doc = self._creer_document(nom_fichier, infos_societe, infos_client, is_auto_entrepreneur, profil)
+        
+        # Totaux cumulés page par page
+        calcul = CalculTotaux(conditions.tva_taux_bp, is_auto_entrepreneur)
+        
+        def elements():
+            if pagination.mode == 'auto':
+                # Chaque page est remplie selon la hauteur mesurée des lignes
+                pages = paginer(produits, self._mesureur_lignes(doc.width), self._capacite_page(doc))
+            else:
+                pages = par_paquets(produits, pagination.items_per_page)
+            page_products = next(pages, [])
+            page_num = 1
+            while True:
+                # Lire la page suivante à l'avance pour savoir si celle-ci est la dernière
+                page_suivante = next(pages, None)
+                totaux_lignes = calcul.ajouter(page_products)
+                
+                if page_num > 1:
+                    yield PageBreak()
+                yield self._creer_tableau_produits(page_products, totaux_lignes, doc.width)
+                yield Spacer(1, ESPACE_APRES_TABLEAU)
+                
+                if page_suivante is None:
+                    break
+                page_products = page_suivante
+                page_num += 1
+            
+            # Même règle que generer_devis : seuls sur une nouvelle page s'ils ne tiennent pas sous la dernière
+            elements_finaux = self._creer_elements_finaux(calcul.resultat(), conditions, signature, mention_accord, date_signature, doc.width, profil)
+            if pagination.mode == 'auto' and self._page_finale_seule(page_products, elements_finaux, doc):
+                yield PageBreak()
+            yield from elements_finaux
+        
+        # Génération du document
+        with metriques.mesurer('build'):
+            doc.build(_FluxFlowables(elements()), canvasmaker=_CanvasFlux)
+        self._compter_rendu(doc, calcul.nombre_lignes)
+        return calcul.resultat()
+    
+    def _generateur(self, profil):
+        """Générateur dont les styles utilisent les polices du profil de sortie (self s'il convient)"""
+        feuille = feuille_de_styles(polices_integrees()) if profil.polices_integrees else FEUILLE_STANDARD
+        return self if feuille is self.feuille else GenerateurDevis(feuille)
+    
+    def _pages_en_cache(self, contenus):
+        """Flowables recopiant les pages PDF d'une page de produits reprise du cache"""
+        elements = []
+        for i, contenu in enumerate(contenus):
+            if i:
+                elements.append(PageBreak())
+            elements.append(_PageEnCache(contenu))
+        metriques.incrementer('devis_pages_reused_total', len(contenus))
+        return elements
+    
+    def _conserver_pages(self, canvas, a_conserver):
+        """Met en cache le flux des pages de produits mises en page par ce rendu"""
+        # Une police hors POLICES_STABLES a un nom interne propre à ce document
+        if not canvas.polices_stables():
+            return
+        contenus = {}
+        for page_num, contenu in canvas.pages_capturees:
+            if page_num in a_conserver:
+                contenus.setdefault(page_num, []).append(contenu)
+        for page_num, contenus_page in contenus.items():
+            if None not in contenus_page:
+                cache_pages.put(a_conserver[page_num], tuple(contenus_page))
+    
+    def _compter_rendu(self, doc, nombre_lignes):
+        """Met à jour les compteurs de rendu une fois le document terminé"""
+        metriques.incrementer('devis_documents_total')
+        metriques.incrementer('devis_pages_total', doc.page)
+        metriques.incrementer('devis_rows_total', nombre_lignes)
+    
+    def _largeurs_colonnes(self, doc_width):
+        """Largeurs des colonnes du tableau des produits, proportionnelles à la largeur du document"""
+        return (
+            doc_width * 0.10,  # Qté - 10% de la largeur
+            doc_width * 0.60,  # Désignation - 60% de la largeur
+            doc_width * 0.15,  # Prix Unit. - 15% de la largeur
+            doc_width * 0.15,  # Total HT - 15% de la largeur
+        )
+    
+    def _mesureur_lignes(self, doc_width):
+        """Fonction donnant la hauteur d'une ligne de produit (mesurée une fois par désignation)"""
+        largeurs = self._largeurs_colonnes(doc_width)
+        style, style_secours = self.styles['Designation'], self.styles['Normal']
+        return lambda produit: hauteur_ligne(produit.designation, style, style_secours, largeurs)
+    
+    def _capacite_page(self, doc):
+        """Hauteur disponible pour les lignes de produits sur une page"""
+        return doc.hauteur_contenu - hauteur_entete(self._largeurs_colonnes(doc.width)) - ESPACE_APRES_TABLEAU
+    
+    def _paginer_auto(self, produits, elements_finaux, doc):
+        """
+        Répartit les produits selon leur hauteur mesurée
+
+        Returns:
+            tuple: (pages, page_finale_seule) ; page_finale_seule est vrai si les
+            totaux, conditions et signature ne tiennent pas sous la dernière page de produits
+        """
+        mesurer = self._mesureur_lignes(doc.width)
+        pages = list(paginer(produits, mesurer, self._capacite_page(doc))) or [[]]
+        return pages, self._page_finale_seule(pages[-1], elements_finaux, doc, mesurer)
+    
+    def _page_finale_seule(self, derniere_page, elements_finaux, doc, mesurer=None):
+        """Vrai si les totaux, conditions et signature ne tiennent pas sous la dernière page de produits"""
+        mesurer = mesurer or self._mesureur_lignes(doc.width)
+        # Place restante sous les produits de la dernière page
+        restant = self._capacite_page(doc) - sum(mesurer(produit) for produit in derniere_page)
+        # Majorant de la hauteur des éléments finaux (espacements comptés sans fusion)
+        hauteur_finale = sum(
+            element.wrap(doc.width, doc.hauteur_contenu)[1] + element.getSpaceBefore() + element.getSpaceAfter()
+            for element in elements_finaux
+        )
+        return hauteur_finale > restant
+    
+    def _creer_document(self, nom_fichier, infos_societe, infos_client, is_auto_entrepreneur, profil):
+        """Crée le document et son template de page (en-tête et pied de page)"""
+        # Créer un document avec marges réduites
+        # (BaseDocTemplate : SimpleDocTemplate remplacerait notre template après la première page)
+        doc = BaseDocTemplate(nom_fichier, pagesize=A4, 
+                             leftMargin=1*cm, rightMargin=1*cm,
+                             topMargin=0.5*cm, bottomMargin=2.5*cm,
+                             initialFontName=self.styles['Normal'].fontName)
+        
+        # Stocker les infos de pied de page sur le document pour les utiliser dans le template
+        # (le générateur ne garde aucun état de rendu et peut être partagé entre threads)
+        doc.footer_info = {
             'infos_societe': infos_societe,
-            'is_auto_entrepreneur': is_auto_entrepreneur,
-            'total_pages': total_pages
+            'is_auto_entrepreneur': is_auto_entrepreneur
         }
         
-        # Définir un template de page avec un cadre pour le contenu débutant tout en haut
+        # En-tête répété sur chaque page (société, numéro de devis, client, intitulé) :
+        # construit et mesuré une seule fois, puis dessiné par le template de page
+        doc.entete = self._creer_entete(infos_societe, infos_client, doc.width, profil)
+        hauteur_entete = sum(h for _, h in doc.entete)
+        # Hauteur disponible pour le contenu, sous l'en-tête
+        doc.hauteur_contenu = doc.height - doc.topMargin - hauteur_entete
+        
+        # Définir un template de page avec un cadre pour le contenu débutant sous l'en-tête
         content_frame = Frame(
             doc.leftMargin,            # X: marge gauche
             doc.bottomMargin,          # Y: laisse l'espace pour le pied de page
             doc.width,                 # Largeur: utilise toute la largeur disponible
-            doc.height - doc.topMargin, # Hauteur: utilise toute la hauteur sauf le haut et le bas
+            doc.hauteur_contenu,       # Hauteur: tout sauf le haut, l'en-tête et le bas
             id='content',
             topPadding=0,             # Pas de padding en haut pour commencer au sommet
             bottomPadding=0,          # Pas de padding en bas
@@ -66,189 +487,178 @@ class GenerateurDevis:
             rightPadding=0            # Pas de padding à droite
         )
         
-        # Créer le template de page avec une fonction de génération du pied de page
+        # Créer le template de page avec une fonction de génération de l'en-tête et du pied de page
         page_template = PageTemplate(
             id='DevisTemplate',
             frames=[content_frame],
-            onPage=self._ajouter_pied_de_page
+            onPage=self._decorer_page
         )
         
         # Appliquer le template au document
         doc.addPageTemplates([page_template])
         
+        return doc
+    
+    def _creer_elements_finaux(self, totaux, conditions, signature, mention_accord, date_signature, doc_width, profil):
+        """Crée les éléments de la dernière page : totaux, conditions et signature"""
         elements = []
         
-        # Diviser les produits en pages
-        for page_num in range(1, total_pages + 1):
-            if page_num > 1:
-                elements.append(PageBreak())
-                
-            # En-tête du document (société et numéro de devis)
-            data_entete = [
-                [self._creer_bloc_societe(infos_societe), self._creer_bloc_devis(infos_societe.get('numero_devis', ''), infos_societe.get('date', datetime.datetime.now().strftime('%d/%m/%Y')))]
-            ]
-            
-            t_entete = Table(data_entete, colWidths=[doc.width/2.0]*2)
-            t_entete.setStyle(TableStyle([
-                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-            ]))
-            elements.append(t_entete)
-            elements.append(Spacer(1, 0.3*cm))
-            
-            # Bloc client
-            elements.append(self._creer_bloc_client(infos_client))
-            elements.append(Spacer(1, 0.8*cm))
-            
-            # Titre du projet
-            elements.append(Paragraph(f"<b>intitulé : {infos_client.get('description_projet', 'description du projet et/ou Produits')}</b>", self.styles['Normal']))
-            elements.append(Spacer(1, 0.3*cm))
+        elements.append(self._creer_tableau_totaux(totaux))
+        elements.append(Spacer(1, 0.6*cm))
+        
+        # Conditions de règlement (affichées uniquement sur la dernière page)
+        if conditions:
+            elements.append(Paragraph(f"<b>Validité du devis : </b>{conditions.validite}", self.styles['Normal']))
+            elements.append(Paragraph(f"<b>Conditions de règlement : </b>{conditions.reglement}", self.styles['Normal']))
+            elements.append(Paragraph("Nous restons à votre disposition pour toute information complémentaire.", self.styles['Normal']))
+            elements.append(Paragraph("Cordialement,", self.styles['Normal']))
+            elements.append(Spacer(1, 0.6*cm))
             
-            # Calculer les indices des produits pour cette page
-            start_idx = (page_num - 1) * items_per_page
-            end_idx = min(start_idx + items_per_page, len(produits))
-            page_products = produits[start_idx:end_idx]
+            # Signature (uniquement sur la dernière page)
+            elements.append(Paragraph("Si ce devis vous convient, veuillez nous le retourner signé précédé de la mention :", self.styles['Normal']))
             
-            # Tableau des produits pour cette page
-            elements.append(self._creer_tableau_produits(page_products, doc.width))
+            if mention_accord:
+                elements.append(Paragraph(f"<b>\"{mention_accord}\"</b>", self.styles['Center']))
+            else:
+                elements.append(Paragraph("<b>\"BON POUR ACCORD ET EXECUTION DES TRAVAUX\"</b>", self.styles['Center']))
+                
             elements.append(Spacer(1, 0.3*cm))
             
-            # Totaux (affichés uniquement sur la dernière page)
-            if page_num == total_pages:
-                total_ht = sum(float(p.get('total_ht', 0)) for p in produits)
-                tva_taux = 0 if is_auto_entrepreneur else float(conditions.get('tva_taux', 20))
-                tva_montant = total_ht * tva_taux / 100
-                total_ttc = total_ht + tva_montant
-                
-                elements.append(self._creer_tableau_totaux(total_ht, tva_taux, tva_montant, total_ttc, is_auto_entrepreneur))
-                elements.append(Spacer(1, 0.6*cm))
-                
-                # Conditions de règlement (affichées uniquement sur la dernière page)
-                if conditions:
-                    validite = conditions.get('validite', '3 mois')
-                    reglement = conditions.get('reglement', '40% à la commande, le solde à la livraison')
-                    elements.append(Paragraph(f"<b>Validité du devis : </b>{validite}", self.styles['Normal']))
-                    elements.append(Paragraph(f"<b>Conditions de règlement : </b>{reglement}", self.styles['Normal']))
-                    elements.append(Paragraph("Nous restons à votre disposition pour toute information complémentaire.", self.styles['Normal']))
-                    elements.append(Paragraph("Cordialement,", self.styles['Normal']))
-                    elements.append(Spacer(1, 0.6*cm))
+            if signature:
+                try:
+                    # Image décodée une seule fois puis partagée entre les rendus
+                    signature_img = cache_images.flowable(signature, 5*cm, 2.5*cm, dpi=profil.dpi, qualite=profil.qualite_jpeg)
                     
-                    # Signature (uniquement sur la dernière page)
-                    elements.append(Paragraph("Si ce devis vous convient, veuillez nous le retourner signé précédé de la mention :", self.styles['Normal']))
+                    # Ajout de la date si disponible
+                    date_value = date_signature if date_signature else ""
                     
-                    if mention_accord:
-                        elements.append(Paragraph(f"<b>\"{mention_accord}\"</b>", self.styles['Center']))
-                    else:
-                        elements.append(Paragraph("<b>\"BON POUR ACCORD ET EXECUTION DES TRAVAUX\"</b>", self.styles['Center']))
-                        
-                    elements.append(Spacer(1, 0.3*cm))
+                    data_signature = [["DATE:", "SIGNATURE:"], [date_value, signature_img]]
                     
-                    if signature:
-                        try:
-                            # Extract the base64 data from the data URI
-                            base64_data = re.sub('^data:image/.+;base64,', '', signature)
-                            signature_data = io.BytesIO(base64.b64decode(base64_data))
-                            signature_img = Image(signature_data, width=5*cm, height=2.5*cm)
-                            
-                            # Ajout de la date si disponible
-                            date_value = date_signature if date_signature else ""
-                            
-                            data_signature = [["DATE:", "SIGNATURE:"], [date_value, signature_img]]
-                            
-                            # Ajout de la mention en petit sous la signature
-                            if mention_accord:
-                                signature_mention = Paragraph(f"<font size='7'>{mention_accord}</font>", self.styles['Center'])
-                                data_signature.append(["", signature_mention])
-                            
-                            t_signature = Table(data_signature, colWidths=[doc.width/2.0]*2)
-                            t_signature.setStyle(TableStyle([
-                                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                                ('LINEBELOW', (0, 0), (0, 0), 1, colors.black),
-                                ('LINEBELOW', (1, 0), (1, 0), 1, colors.black),
-                                ('ALIGN', (1, 1), (1, 1), 'CENTER'),
-                                ('ALIGN', (1, 2), (1, 2), 'CENTER') if mention_accord else None,
-                            ]))
-                            elements.append(t_signature)
-                        except Exception as e:
-                            print(f"Erreur lors du traitement de la signature: {e}")
-                            # En cas d'erreur, on revient au format sans signature
-                            data_signature = [["DATE:", "SIGNATURE:"], [date_signature if date_signature else "", ""]]
-                            t_signature = Table(data_signature, colWidths=[doc.width/2.0]*2)
-                            t_signature.setStyle(TableStyle([
-                                ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                                ('LINEBELOW', (0, 0), (0, 0), 1, colors.black),
-                                ('LINEBELOW', (1, 0), (1, 0), 1, colors.black),
-                            ]))
-                            elements.append(t_signature)
-                    else:
-                        data_signature = [["DATE:", "SIGNATURE:"], [date_signature if date_signature else "", ""]]
-                        t_signature = Table(data_signature, colWidths=[doc.width/2.0]*2)
-                        t_signature.setStyle(TableStyle([
-                            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                            ('LINEBELOW', (0, 0), (0, 0), 1, colors.black),
-                            ('LINEBELOW', (1, 0), (1, 0), 1, colors.black),
-                        ]))
-                        elements.append(t_signature)
+                    # Ajout de la mention en petit sous la signature
+                    if mention_accord:
+                        signature_mention = Paragraph(f"<font size='7'>{mention_accord}</font>", self.styles['Center'])
+                        data_signature.append(["", signature_mention])
                     
-                    elements.append(Spacer(1, 1*cm))
+                    t_signature = Table(data_signature, colWidths=[doc_width/2.0]*2)
+                    t_signature.setStyle(self.feuille.signature_mention if mention_accord else self.feuille.signature_image)
+                    elements.append(t_signature)
+                except Exception as e:
+                    print(f"Erreur lors du traitement de la signature: {e}")
+                    # En cas d'erreur, on revient au format sans signature
+                    data_signature = [["DATE:", "SIGNATURE:"], [date_signature if date_signature else "", ""]]
+                    t_signature = Table(data_signature, colWidths=[doc_width/2.0]*2)
+                    t_signature.setStyle(self.feuille.signature)
+                    elements.append(t_signature)
+            else:
+                data_signature = [["DATE:", "SIGNATURE:"], [date_signature if date_signature else "", ""]]
+                t_signature = Table(data_signature, colWidths=[doc_width/2.0]*2)
+                t_signature.setStyle(self.feuille.signature)
+                elements.append(t_signature)
+            
+            elements.append(Spacer(1, 1*cm))
         
-        # Génération du document
-        doc.build(elements)
+        return elements
     
-    def _ajouter_pied_de_page(self, canvas, doc):
-        """Fonction appelée pour chaque page pour dessiner le pied de page"""
-        page_num = canvas.getPageNumber()
-        
-        # Créer le contenu du pied de page
-        footer_text = self._generer_texte_pied_de_page(
-            self.footer_info['infos_societe'],
-            self.footer_info['is_auto_entrepreneur']
-        )
-        
-        # Ajouter le numéro de page au texte du pied de page avec un espacement minimal
-        footer_text += f"<br/><font size='8'>Page {page_num} / {self.footer_info['total_pages']}</font>"
-        
-        # Créer un style avec wrap pour le pied de page
-        footer_style = ParagraphStyle(
-            'Footer',
-            parent=self.styles['Center'],
-            alignment=1,  # Center
-            wordWrap='CJK',  # Force le retour à la ligne
-            fontSize=8,     # Taille de police réduite pour le pied de page
-            leading=9,      # Espacement entre les lignes très réduit (normal est ~12)
-            spaceBefore=0,  # Pas d'espace avant
-            spaceAfter=0    # Pas d'espace après
-        )
+    def _decorer_page(self, canvas, doc):
+        """Fonction appelée pour chaque page pour dessiner l'en-tête et le pied de page"""
+        self._ajouter_entete(canvas, doc)
+        self._ajouter_pied_de_page(canvas, doc)
+        canvas.marquer_contenu()
+    
+    def _creer_entete(self, infos_societe, infos_client, doc_width, profil):
+        """Crée les blocs de l'en-tête et les mesure ; retourne une liste de (flowable, hauteur)"""
+        # En-tête du document (société et numéro de devis)
+        data_entete = [
+            [self._creer_bloc_societe(infos_societe, profil), self._creer_bloc_devis(infos_societe.numero_devis, infos_societe.date)]
+        ]
         
-        # Sauvegarder l'état du canvas
-        canvas.saveState()
+        t_entete = Table(data_entete, colWidths=[doc_width/2.0]*2)
+        t_entete.setStyle(TABLE_STYLE_ENTETE)
         
+        blocs = [
+            t_entete,
+            Spacer(1, 0.3*cm),
+            # Bloc client
+            self._creer_bloc_client(infos_client),
+            Spacer(1, 0.8*cm),
+            # Titre du projet
+            Paragraph(f"<b>intitulé : {infos_client.description_projet}</b>", self.styles['Normal']),
+            Spacer(1, 0.3*cm),
+        ]
+        return [(bloc, bloc.wrap(doc_width, A4[1])[1]) for bloc in blocs]
+    
+    @metriques.mesurer('entete')
+    def _ajouter_entete(self, canvas, doc):
+        """
+        Dessine l'en-tête en haut de la page
+
+        L'en-tête est dessiné une seule fois dans un Form XObject, puis chaque page
+        y fait référence : le coût et la taille du PDF ne dépendent plus du nombre de pages.
+        """
+        if not canvas.hasForm('entete'):
+            canvas.beginForm('entete')
+            y = doc.bottomMargin + doc.height - doc.topMargin
+            for bloc, hauteur in doc.entete:
+                y -= hauteur
+                bloc.drawOn(canvas, doc.leftMargin, y)
+            canvas.endForm()
+        canvas.doForm('entete')
+    
+    @metriques.mesurer('pied_de_page')
+    def _ajouter_pied_de_page(self, canvas, doc):
+        """
+        Fonction appelée pour chaque page pour dessiner le pied de page
+
+        Les mentions légales et bancaires sont mises en page une seule fois par
+        document dans un Form XObject ; seul le numéro de page est ajouté à chaque page.
+        """
         # Calculer la largeur maximale pour le pied de page
         max_footer_width = 16*cm
         
-        # Centrer le texte du pied de page
-        x = (doc.pagesize[0] - max_footer_width) / 2
-        
         # Positionner le pied de page en bas de la page
         y = 1*cm  # Distance du bas de la page
         
-        # Créer et dessiner le pied de page
-        p = Paragraph(footer_text, footer_style)
-        w, h = p.wrap(max_footer_width, doc.bottomMargin)
-        p.drawOn(canvas, x, y)
+        # Style du pied de page (police réduite, interligne très réduit)
+        footer_style = self.styles['Footer']
+        font_size = footer_style.fontSize
+        leading = footer_style.leading
+        
+        if not canvas.hasForm('pied_de_page'):
+            footer_text = self._generer_texte_pied_de_page(
+                doc.footer_info['infos_societe'],
+                doc.footer_info['is_auto_entrepreneur']
+            )
+            
+            # Centrer le texte du pied de page, une ligne au-dessus du numéro de page
+            canvas.beginForm('pied_de_page')
+            if footer_text:
+                # Analysé et coupé en lignes une seule fois par émetteur
+                p = paragraphe_bloc(footer_text, footer_style)
+                p.wrap(max_footer_width, doc.bottomMargin)
+                p.drawOn(canvas, (doc.pagesize[0] - max_footer_width) / 2, y + leading)
+            canvas.endForm()
+        
+        # Sauvegarder l'état du canvas
+        canvas.saveState()
+        canvas.doForm('pied_de_page')
+        
+        # Numéro de page, sur la dernière ligne du pied de page
+        # (dessiné à l'écriture du PDF, quand le nombre total de pages est connu)
+        canvas.numeroter(doc.pagesize[0] / 2, y + leading - font_size, footer_style.fontName, font_size)
         
         # Restaurer l'état du canvas
         canvas.restoreState()
     
     def _generer_texte_pied_de_page(self, infos_societe, is_auto_entrepreneur):
         """Génère le texte du pied de page"""
-        forme_juridique = infos_societe.get('forme_juridique', '')
-        capital = infos_societe.get('capital', '')
-        siret = infos_societe.get('siret', '')
-        rcs = infos_societe.get('rcs', '')
-        code_ape = infos_societe.get('code_ape', '')
-        tva_intracom = infos_societe.get('tva_intracom', '')
-        info_bancaire = infos_societe.get('info_bancaire', '')
-        rib = infos_societe.get('rib', '')
+        forme_juridique = infos_societe.forme_juridique
+        capital = infos_societe.capital
+        siret = infos_societe.siret
+        rcs = infos_societe.rcs
+        code_ape = infos_societe.code_ape
+        tva_intracom = infos_societe.tva_intracom
+        info_bancaire = infos_societe.info_bancaire
+        rib = infos_societe.rib
         
         # Construire le texte du pied de page
         footer_text = ""
@@ -277,17 +687,18 @@ class GenerateurDevis:
             
         return footer_text
     
-    def _creer_bloc_societe(self, infos_societe):
+    @metriques.mesurer('bloc_societe')
+    def _creer_bloc_societe(self, infos_societe, profil):
         """Crée le bloc avec les informations de la société"""
-        nom = infos_societe.get('nom', 'le nom de votre société')
-        activite = infos_societe.get('activite', 'votre activité')
-        adresse = infos_societe.get('adresse', 'Adresse')
-        code_postal = infos_societe.get('code_postal', 'Code postal')
-        ville = infos_societe.get('ville', 'Ville')
-        telephone = infos_societe.get('telephone', 'Téléphone')
-        email = infos_societe.get('email', 'Email')
-        site = infos_societe.get('site', 'Site web')
-        logo = infos_societe.get('logo', '')
+        nom = infos_societe.nom
+        activite = infos_societe.activite
+        adresse = infos_societe.adresse
+        code_postal = infos_societe.code_postal
+        ville = infos_societe.ville
+        telephone = infos_societe.telephone
+        email = infos_societe.email
+        site = infos_societe.site
+        logo = infos_societe.logo
         
         # Format de l'adresse
         adresse_complete = f"{adresse}<br/>{code_postal} {ville}"
@@ -299,23 +710,18 @@ class GenerateurDevis:
         # Si un logo est fourni, on le dessine
         if logo:
             try:
-                # Extract the base64 data from the data URI
-                base64_data = re.sub('^data:image/.+;base64,', '', logo)
-                logo_data = io.BytesIO(base64.b64decode(base64_data))
-                logo_img = Image(logo_data, width=4*cm, height=3*cm, kind='proportional')
+                # Image décodée une seule fois puis partagée entre les rendus
+                logo_img = cache_images.flowable(logo, *CADRE_LOGO, kind='proportional', dpi=profil.dpi, qualite=profil.qualite_jpeg)
                 
                 # Create a table to hold both the logo and text
-                text_paragraph = Paragraph(f"<b>{nom}</b><br/>{activite}<br/><br/>{adresse_complete}<br/>{contacts}", self.styles['Normal'])
+                text_paragraph = paragraphe_bloc(f"<b>{nom}</b><br/>{activite}<br/><br/>{adresse_complete}<br/>{contacts}", self.styles['Normal'])
                 
                 logo_table = Table([
                     [logo_img],
                     [text_paragraph]
                 ], colWidths=[8*cm])
                 
-                logo_table.setStyle(TableStyle([
-                    ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-                    ('VALIGN', (0, 0), (0, 1), 'TOP'),
-                ]))
+                logo_table.setStyle(TABLE_STYLE_LOGO)
                 
                 return logo_table
             except Exception as e:
@@ -324,7 +730,7 @@ class GenerateurDevis:
                 pass
         
         # Format standard sans logo
-        return Paragraph(f"<b>{nom}</b><br/>{activite}<br/><br/>{adresse_complete}<br/>{contacts}", self.styles['Normal'])
+        return paragraphe_bloc(f"<b>{nom}</b><br/>{activite}<br/><br/>{adresse_complete}<br/>{contacts}", self.styles['Normal'])
     
     def _creer_bloc_devis(self, numero, date):
         """Crée le bloc avec les informations du devis"""
@@ -333,118 +739,57 @@ class GenerateurDevis:
             [Paragraph(f"Date: {date}", self.styles['Normal']), ""]
         ], colWidths=[5*cm, 3*cm])
         
-        bloc.setStyle(TableStyle([
-            ('BOX', (0, 0), (-1, -1), 1, colors.lavender),
-            ('BACKGROUND', (0, 0), (-1, -1), colors.lavender),
-            ('SPAN', (0, 1), (1, 1)),
-        ]))
+        bloc.setStyle(TABLE_STYLE_BLOC_DEVIS)
         
         return bloc
     
     def _creer_bloc_client(self, infos_client):
         """Crée le bloc avec les informations du client"""
-        nom = infos_client.get('nom', 'Société et/ou Nom du client')
-        adresse = infos_client.get('adresse', 'Adresse du client')
-        code_postal = infos_client.get('code_postal', 'Code postal')
-        ville = infos_client.get('ville', 'Ville')
-        
         # Utiliser le style Right pour aligner à droite
-        return Paragraph(f"<b>{nom}</b><br/><br/>{adresse}<br/>{code_postal} {ville}", self.styles['Right'])
+        return Paragraph(f"<b>{infos_client.nom}</b><br/><br/>{infos_client.adresse}<br/>{infos_client.code_postal} {infos_client.ville}", self.styles['Right'])
     
-    def _creer_tableau_produits(self, produits, doc_width):
-        """Crée le tableau des produits/services"""
+    @metriques.mesurer('tableau_produits')
+    def _creer_tableau_produits(self, produits, totaux_lignes, doc_width):
+        """Crée le tableau des produits/services (totaux_lignes : total HT de chaque ligne, en centimes)"""
         # En-tête du tableau
-        data = [["Qté", "Désignation", "Prix Unit.", "Total HT"]]
+        data = [list(ENTETE_PRODUITS)]
         
         # Style pour la désignation avec wrap et support de HTML
-        style_designation = ParagraphStyle(
-            'Designation',
-            parent=self.styles['Normal'],
-            wordWrap='CJK',  # Force le retour à la ligne
-            spaceAfter=3,    # Réduit de 6 à 3
-            spaceBefore=3,   # Réduit de 6 à 3
-            bulletIndent=10, # Indentation des puces
-            leftIndent=5     # Indentation gauche
-        )
+        style_designation = self.styles['Designation']
         
         # Ajout des produits
-        for produit in produits:
-            qte = produit.get('quantite', '')
-            designation = produit.get('designation', '')
-            prix_unit = float(produit.get('prix_unitaire', 0))
-            total_ht = float(produit.get('total_ht', 0))
-            
-            try:
-                # Prétraiter la désignation pour conserver les sauts de ligne
-                # Remplacer les retours à la ligne simples par des balises <br/>
-                designation = designation.replace('\n', '<br/>')
-                
-                # Traiter les listes à puces simples en utilisant le format supporté par ReportLab
-                lines = designation.split('<br/>')
-                formatted_lines = []
-                
-                for line in lines:
-                    # Vérifier si la ligne commence par un tiret, point, étoile ou puce
-                    if line.strip().startswith('-') or line.strip().startswith('•') or line.strip().startswith('*'):
-                        # Enlever le tiret/bullet et les espaces en début de ligne
-                        text = line.strip()[1:].strip()
-                        # Ajouter le texte au format bullet de ReportLab
-                        formatted_lines.append(f"<bullet>&bull;</bullet>{text}")
-                    else:
-                        formatted_lines.append(line)
-                
-                processed_designation = '<br/>'.join(formatted_lines)
-                
-                # Wrap text in designation by creating a Paragraph object with HTML support
-                designation_para = Paragraph(processed_designation, style_designation)
-                
-                data.append([qte, designation_para, f"{prix_unit:.2f} €", f"{total_ht:.2f} €"])
-                
-            except Exception as e:
-                print(f"Erreur lors du traitement de la désignation: {e}")
-                # En cas d'erreur, utiliser le texte brut sans formatage
-                designation_para = Paragraph(designation, self.styles['Normal'])
-                data.append([qte, designation_para, f"{prix_unit:.2f} €", f"{total_ht:.2f} €"])
+        style_secours = self.styles['Normal']
+        for produit, total_ht in zip(produits, totaux_lignes):
+            # Désignation compilée une seule fois (sauts de ligne, puces, analyse du markup)
+            designation_para = paragraphe_designation(produit.designation, style_designation, style_secours)
+            data.append([produit.quantite, designation_para, f"{formater(produit.prix_centimes)} €", f"{formater(total_ht)} €"])
         
         # Calcul des largeurs de colonnes proportionnelles à la largeur du document
-        col_widths = [
-            doc_width * 0.10,  # Qté - 10% de la largeur
-            doc_width * 0.60,  # Désignation - 60% de la largeur
-            doc_width * 0.15,  # Prix Unit. - 15% de la largeur
-            doc_width * 0.15,  # Total HT - 15% de la largeur
-        ]
+        col_widths = self._largeurs_colonnes(doc_width)
         
         # Création du tableau
         tableau = Table(data, colWidths=col_widths, repeatRows=1)  # repeatRows ensures header is repeated on new pages
-        tableau.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 1, colors.lavender),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lavender),
-            ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # Alignement centre pour la quantité
-            ('ALIGN', (2, 0), (3, -1), 'RIGHT'),   # Alignement droite pour les prix
-            ('VALIGN', (0, 0), (-1, -1), 'TOP'),   # Alignement vertical en haut pour toutes les cellules
-            ('LEFTPADDING', (1, 0), (1, -1), 10),  # Plus de padding à gauche pour la désignation
-            ('RIGHTPADDING', (1, 0), (1, -1), 10), # Plus de padding à droite pour la désignation
-        ]))
+        tableau.setStyle(self.feuille.produits)
         
         return tableau
     
-    def _creer_tableau_totaux(self, total_ht, tva_taux, tva_montant, total_ttc, is_auto_entrepreneur=False):
+    @metriques.mesurer('tableau_totaux')
+    def _creer_tableau_totaux(self, totaux):
         """Crée le tableau des totaux"""
         
-        if is_auto_entrepreneur:
+        if totaux.auto_entrepreneur:
             # Pour auto-entrepreneur, pas de TVA
             data = [
-                ["Total HT", f"{total_ht:.2f} €"],
+                ["Total HT", f"{formater(totaux.total_ht)} €"],
                 ["TVA non applicable, article 293B du CGI", ""],
-                ["Total TTC", f"{total_ht:.2f} €"]
+                ["Total TTC", f"{formater(totaux.total_ttc)} €"]
             ]
         else:
-            # Cas standard avec TVA
-            data = [
-                ["Total HT", f"{total_ht:.2f} €"],
-                [f"TVA ({tva_taux}%)", f"{tva_montant:.2f} €"],
-                ["Total TTC", f"{total_ttc:.2f} €"]
-            ]
+            # Cas standard avec TVA : une ligne par taux
+            data = [["Total HT", f"{formater(totaux.total_ht)} €"]]
+            for taux, _, montant in totaux.tva:
+                data.append([f"TVA ({formater_taux(taux)}%)", f"{formater(montant)} €"])
+            data.append(["Total TTC", f"{formater(totaux.total_ttc)} €"])
         
         # Création du tableau avec colonne de montant de largeur fixe minimum
         amount_col_width = 4*cm  # Largeur fixe minimum pour les montants
@@ -452,12 +797,7 @@ class GenerateurDevis:
         total_width = label_col_width + amount_col_width
         
         tableau = Table(data, colWidths=[label_col_width, amount_col_width])
-        tableau.setStyle(TableStyle([
-            ('GRID', (0, 0), (-1, -1), 1, colors.lavender),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.lavender),
-            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),  # Alignement droite pour les montants
-            ('BACKGROUND', (0, -1), (-1, -1), colors.lavender),  # Fond coloré pour le total TTC
-        ]))
+        tableau.setStyle(self.feuille.totaux)
         
         # Créer un tableau externe pour positionner le tableau des totaux à droite
         # Le tableau externe a deux colonnes: une vide à gauche et une avec le tableau à droite
@@ -0,0 +1,90 @@
+# app/echange.py
+"""
+Échange de devis en masse au format NDJSON compressé (gzip)
+
+Un export ou un import de tout l'historique d'un compte porte sur des milliers
+de devis : au lieu d'un fichier JSON par devis, ils circulent dans un seul
+flux NDJSON (un devis par ligne) compressé en gzip. L'encodage comme le
+décodage se font morceau par morceau : la mémoire utilisée ne dépend pas du
+nombre de devis.
+"""
+import gzip
+import io
+import zlib
+
+from app import json_codec
+from app.models import PayloadError
+
+# Taille du NDJSON accumulé avant d'être passé au compresseur
+TAILLE_MORCEAU = 64 * 1024
+
+# Nombre magique d'un flux gzip
+_MAGIC_GZIP = b'\x1f\x8b'
+
+
+def compresser_ndjson(enregistrements, niveau=6):
+    """Encode des enregistrements en NDJSON compressé (gzip), morceau par morceau"""
+    # wbits = 31 : en-tête et somme de contrôle gzip autour du flux deflate
+    compresseur = zlib.compressobj(niveau, zlib.DEFLATED, 31)
+    tampon = []
+    taille = 0
+    for enregistrement in enregistrements:
+        ligne = json_codec.dumps(enregistrement) + b'\n'
+        tampon.append(ligne)
+        taille += len(ligne)
+        if taille >= TAILLE_MORCEAU:
+            morceau = compresseur.compress(b''.join(tampon))
+            tampon.clear()
+            taille = 0
+            if morceau:
+                yield morceau
+    yield compresseur.compress(b''.join(tampon)) + compresseur.flush()
+
+
+def enregistrement_erreur(numero, erreur):
+    """Dernier enregistrement d'un export interrompu par une ligne invalide"""
+    return {'line': numero, 'success': False, 'error': str(erreur)}
+
+
+def _est_erreur(enregistrement):
+    return enregistrement.get('success') is False and 'error' in enregistrement
+
+
+def ouvrir_ndjson(flux):
+    """Lignes d'un corps NDJSON, décompressé à la volée s'il est au format gzip"""
+    if not hasattr(flux, 'peek'):
+        flux = io.BufferedReader(flux)
+    if flux.peek(2)[:2] == _MAGIC_GZIP:
+        return io.BufferedReader(gzip.GzipFile(fileobj=flux, mode='rb'))
+    return flux
+
+
+def lire_enregistrements(flux, lever=False):
+    """
+    Décode un flux NDJSON (compressé ou non) enregistrement par enregistrement
+
+    Produit (numéro de ligne, objet) ; une ligne qui n'est pas un objet JSON
+    donne (numéro de ligne, PayloadError) sans interrompre la lecture, de même
+    que l'enregistrement d'erreur qui termine un export interrompu. Avec
+    `lever=True`, la première ligne invalide lève au contraire PayloadError.
+    Les lignes vides sont ignorées.
+    """
+    for numero, ligne in enumerate(ouvrir_ndjson(flux), start=1):
+        ligne = ligne.strip()
+        if not ligne:
+            continue
+        try:
+            enregistrement = json_codec.loads(ligne)
+        except ValueError:
+            erreur = PayloadError(f"Ligne {numero} : JSON invalide")
+        else:
+            if not isinstance(enregistrement, dict):
+                erreur = PayloadError(f"Ligne {numero} : objet JSON attendu")
+            elif _est_erreur(enregistrement):
+                erreur = PayloadError(f"Ligne {numero} : export interrompu ({enregistrement['error']})")
+            else:
+                yield numero, enregistrement
+                continue
+        if lever:
+            raise erreur
+        yield numero, erreur
@@ -0,0 +1,140 @@
+# app/image_cache.py
+import base64
+import hashlib
+import io
+import re
+import threading
+from collections import OrderedDict
+
+from app.metrics import metriques
+
+# PIL et ReportLab sont importés au premier usage : un worker qui ne sert que des
+# téléchargements ou des exports ne les charge jamais (voir app.demarrage)
+
+# Qualité des images réencodées en JPEG, sans profil de sortie
+QUALITE_JPEG = 85
+
+
+class ImageDecodee:
+    """Image décodée et redimensionnée, prête à être insérée dans un PDF"""
+
+    __slots__ = ('data', 'largeur_px', 'hauteur_px')
+
+    def __init__(self, data, largeur_px, hauteur_px):
+        self.data = data
+        self.largeur_px = largeur_px
+        self.hauteur_px = hauteur_px
+
+
+class ImageCache:
+    """
+    Cache LRU des images (logos, signatures) décodées et pré-redimensionnées
+
+    Les images sont indexées par l'empreinte de leur data URI et du cadre
+    d'impression ; elles sont ramenées à la résolution cible (dpi) avant d'être
+    conservées, ce qui réduit aussi la taille des PDF.
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, dpi=150):
+        self.max_bytes = max_bytes
+        self.dpi = dpi
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def configurer(self, max_bytes=None, dpi=None):
+        """Applique la configuration de l'application et vide le cache"""
+        with self._lock:
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if dpi is not None:
+                self.dpi = dpi
+            self._entries.clear()
+            self._total_bytes = 0
+
+    def flowable(self, data_uri, largeur, hauteur, kind='direct', dpi=None, qualite=None):
+        """Crée un flowable Image à partir d'une data URI, en passant par le cache"""
+        from reportlab.platypus import Image
+
+        image = self.get(data_uri, largeur, hauteur, kind, dpi, qualite)
+        return Image(io.BytesIO(image.data), width=largeur, height=hauteur, kind=kind)
+
+    def get(self, data_uri, largeur, hauteur, kind='direct', dpi=None, qualite=None):
+        """
+        Retourne l'image décodée pour ce cadre d'impression (en points)
+
+        dpi et qualite (JPEG) sont ceux du profil de sortie ; par défaut, la
+        résolution configurée et une qualité de 85.
+        """
+        dpi = dpi or self.dpi
+        qualite = qualite or QUALITE_JPEG
+        cle = hashlib.sha256(f"{largeur:.2f}x{hauteur:.2f}:{kind}:{dpi}:{qualite}:{data_uri}".encode('utf-8')).hexdigest()
+
+        with self._lock:
+            image = self._entries.get(cle)
+            if image is not None:
+                self._entries.move_to_end(cle)
+                self.hits += 1
+                return image
+            self.misses += 1
+
+        with metriques.mesurer('image_decode'):
+            image = self._decoder(data_uri, largeur, hauteur, kind, dpi, qualite)
+
+        with self._lock:
+            if cle not in self._entries and len(image.data) <= self.max_bytes:
+                self._entries[cle] = image
+                self._total_bytes += len(image.data)
+                while self._total_bytes > self.max_bytes:
+                    _, ancienne = self._entries.popitem(last=False)
+                    self._total_bytes -= len(ancienne.data)
+                    self.evictions += 1
+        return image
+
+    def _decoder(self, data_uri, largeur, hauteur, kind, dpi, qualite):
+        """Décode la data URI et ramène l'image au cadre d'impression à la résolution cible"""
+        from PIL import Image as PILImage
+        from reportlab.lib.units import inch
+
+        base64_data = re.sub('^data:image/.+;base64,', '', data_uri)
+        brut = base64.b64decode(base64_data)
+        source = PILImage.open(io.BytesIO(brut))
+
+        cible = (max(1, round(largeur / inch * dpi)), max(1, round(hauteur / inch * dpi)))
+        if source.width <= cible[0] and source.height <= cible[1] and source.format in ('JPEG', 'PNG'):
+            # Déjà assez petite : inutile de la réencoder
+            return ImageDecodee(brut, source.width, source.height)
+
+        if kind == 'direct':
+            # L'image sera étirée au cadre : on peut la redimensionner exactement
+            image = source.resize((min(source.width, cible[0]), min(source.height, cible[1])), PILImage.LANCZOS)
+        else:
+            image = source.copy()
+            image.thumbnail(cible, PILImage.LANCZOS)
+
+        sortie = io.BytesIO()
+        if image.mode in ('RGBA', 'LA', 'P'):
+            image.save(sortie, format='PNG', optimize=True)
+        else:
+            image.convert('RGB').save(sortie, format='JPEG', quality=qualite, optimize=True)
+        return ImageDecodee(sortie.getvalue(), image.width, image.height)
+
+    def stats(self):
+        """Compteurs et occupation du cache"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'dpi': self.dpi,
+            }
+
+
+# Cache partagé par tous les rendus du processus
+cache_images = ImageCache()
@@ -0,0 +1,148 @@
+# app/jobs.py
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+
+class QueueFullError(Exception):
+    """Levée quand la file de rendu a atteint sa profondeur maximale"""
+
+
+class Job:
+    """Rendu de devis soumis en asynchrone"""
+
+    def __init__(self, id, cle, created, status='queued', finished=None, file=None, error=None):
+        self.id = id
+        self.cle = cle
+        self.created = created
+        self.status = status
+        self.finished = finished
+        self.file = file
+        self.error = error
+
+    def to_dict(self):
+        return {
+            'job': self.id,
+            'status': self.status,
+            'created': self.created,
+            'finished': self.finished,
+            'file': self.file,
+            'error': self.error,
+        }
+
+
+class JobQueue:
+    """
+    File de rendus asynchrones, exécutés sur le pool de processus des rendus en lot
+
+    La soumission rend la main immédiatement ; le PDF est enregistré par
+    `enregistrer(cle, pdf)` à la fin du rendu. L'état des jobs est conservé
+    dans une base SQLite (journal WAL) partagée par les workers : le suivi
+    d'un job peut être interrogé sur n'importe quel worker. Le rendu, lui,
+    s'exécute dans le worker qui a reçu le job ; seul ce worker sait qu'il a
+    commencé (`running`), les autres le voient `queued` jusqu'à sa fin. Les
+    jobs terminés sont oubliés après `retention` secondes.
+    """
+
+    def __init__(self, renderer, enregistrer, chemin_base, max_depth=100, retention=3600, timeout=30):
+        self.renderer = renderer
+        self.enregistrer = enregistrer
+        self.chemin_base = chemin_base
+        self.max_depth = max_depth
+        self.retention = retention
+        self.timeout = timeout
+        self._local = threading.local()
+        self._futures = {}  # job_id -> future des rendus lancés par ce worker
+        self._lock = threading.Lock()
+        dossier = os.path.dirname(chemin_base)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        with self._connexion() as connexion:
+            connexion.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                " id TEXT PRIMARY KEY,"
+                " cle TEXT NOT NULL,"
+                " status TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " finished REAL,"
+                " file TEXT,"
+                " error TEXT)"
+            )
+            connexion.execute("CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished)")
+
+    def _connexion(self):
+        connexion = getattr(self._local, 'connexion', None)
+        if connexion is None or self._local.pid != os.getpid():
+            connexion = sqlite3.connect(self.chemin_base, timeout=self.timeout, isolation_level=None)
+            connexion.execute('PRAGMA journal_mode=WAL')
+            connexion.execute('PRAGMA synchronous=NORMAL')
+            self._local.connexion = connexion
+            self._local.pid = os.getpid()
+        return connexion
+
+    def _inserer(self, job):
+        self._connexion().execute(
+            "INSERT INTO jobs (id, cle, status, created, finished, file, error) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (job.id, job.cle, job.status, job.created, job.finished, job.file, job.error)
+        )
+
+    def submit(self, parametres, cle):
+        """Soumet un rendu ; lève QueueFullError si la file de ce worker est pleine"""
+        self._purger()
+        with self._lock:
+            if len(self._futures) >= self.max_depth:
+                raise QueueFullError(f"La file de rendu est pleine ({self.max_depth} devis en attente)")
+
+            job = Job(uuid.uuid4().hex, cle, time.time())
+            self._inserer(job)
+            future = self.renderer.submit(parametres)
+            self._futures[job.id] = future
+
+        future.add_done_callback(lambda future: self._terminer(job, future))
+        return job
+
+    def deja_termine(self, cle, filename):
+        """Enregistre un job déjà terminé (devis présent dans le cache de rendu)"""
+        maintenant = time.time()
+        job = Job(uuid.uuid4().hex, cle, maintenant, status='done', finished=maintenant, file=filename)
+        self._purger()
+        self._inserer(job)
+        return job
+
+    def get(self, job_id):
+        ligne = self._connexion().execute(
+            "SELECT id, cle, created, status, finished, file, error FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if ligne is None:
+            return None
+        job = Job(*ligne)
+        if job.status == 'queued':
+            with self._lock:
+                future = self._futures.get(job_id)
+            if future is not None and future.running():
+                job.status = 'running'
+        return job
+
+    def _terminer(self, job, future):
+        if future.cancelled():
+            job.error = "Rendu annulé"
+        else:
+            try:
+                job.file = self.enregistrer(job.cle, future.result())
+            except Exception as e:
+                job.error = str(e)
+        job.status = 'failed' if job.error is not None else 'done'
+        job.finished = time.time()
+        self._connexion().execute(
+            "UPDATE jobs SET status = ?, finished = ?, file = ?, error = ? WHERE id = ?",
+            (job.status, job.finished, job.file, job.error, job.id)
+        )
+        with self._lock:
+            self._futures.pop(job.id, None)
+
+    def _purger(self):
+        self._connexion().execute(
+            "DELETE FROM jobs WHERE finished IS NOT NULL AND finished < ?", (time.time() - self.retention,)
+        )
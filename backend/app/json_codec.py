@@ -0,0 +1,64 @@
+# app/json_codec.py
+"""
+Encodage et décodage JSON
+
+Utilise orjson s'il est installé (analyse et sérialisation plusieurs fois
+plus rapides, dataclasses sérialisées nativement), sinon le module json de
+la bibliothèque standard. Le résultat est le même dans les deux cas :
+JSON compact en UTF-8.
+"""
+import dataclasses
+import json
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+
+def _defaut(obj):
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    return DefaultJSONProvider.default(obj)
+
+
+def loads(data):
+    """Décode un document JSON (bytes ou str)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj, sort_keys=False):
+    """Encode en JSON compact ; retourne des bytes UTF-8"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, default=_defaut, option=option)
+        except orjson.JSONEncodeError:
+            # Entiers au-delà de 64 bits (totaux démesurés) : le module json les encode
+            pass
+    return json.dumps(obj, sort_keys=sort_keys, separators=(',', ':'), ensure_ascii=False, default=_defaut).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Fournisseur JSON de Flask (request.json, jsonify) s'appuyant sur ce module"""
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return loads(s)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return dumps(obj, sort_keys=self.sort_keys).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Réponses indentées en mode debug
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps(obj, sort_keys=self.sort_keys), mimetype=self.mimetype)
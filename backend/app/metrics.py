@@ -0,0 +1,155 @@
+# app/metrics.py
+"""
+Instrumentation du rendu des devis
+
+Les étapes du rendu sont chronométrées par `metriques.mesurer(etape)` (bloc
+`with` ou décorateur) ; chaque durée alimente un histogramme, et les
+compteurs (documents, pages, lignes, octets) sont incrémentés par le
+générateur et les routes. Le tout est exposé au format texte de Prometheus
+par /metrics.
+
+Les métriques sont propres au processus : avec plusieurs workers, chacun
+expose les siennes. Les rendus exécutés dans le pool de processus des lots
+ne remontent que les compteurs de documents et d'octets.
+"""
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+
+# Bornes des histogrammes de durée, en secondes
+BORNES = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DESCRIPTIONS = {
+    'devis_stage_seconds': ('histogram', "Durée des étapes du rendu des devis"),
+    'devis_documents_total': ('counter', "Devis générés"),
+    'devis_pages_total': ('counter', "Pages de devis générées"),
+    'devis_rows_total': ('counter', "Lignes de produits mises en page"),
+    'devis_pages_reused_total': ('counter', "Pages de produits reprises du cache de pages (rendu incrémental)"),
+    'devis_bytes_total': ('counter', "Octets de PDF produits"),
+    'devis_renders_rejected_total': ('counter', "Rendus refusés faute de créneau libre (503)"),
+    'devis_startup_seconds': ('gauge', "Démarrage du worker : import du rendu, préchauffage, première requête"),
+}
+
+# Durées cumulées par étape pour la requête en cours (en-tête Server-Timing)
+_chronometres = contextvars.ContextVar('chronometres', default=None)
+
+
+class Histogramme:
+    """Histogramme cumulatif à bornes fixes"""
+
+    __slots__ = ('comptes', 'somme', 'total')
+
+    def __init__(self):
+        self.comptes = [0] * (len(BORNES) + 1)
+        self.somme = 0.0
+        self.total = 0
+
+    def observer(self, valeur):
+        self.comptes[bisect.bisect_left(BORNES, valeur)] += 1
+        self.somme += valeur
+        self.total += 1
+
+
+class Metriques:
+    """Registre des histogrammes, compteurs et jauges du processus"""
+
+    def __init__(self):
+        self._histogrammes = {}  # (nom, labels) -> Histogramme
+        self._compteurs = {}     # (nom, labels) -> valeur
+        self._jauges = {}        # (nom, labels) -> valeur
+        self._lock = threading.Lock()
+
+    def observer(self, nom, valeur, **labels):
+        cle = (nom, tuple(sorted(labels.items())))
+        with self._lock:
+            histogramme = self._histogrammes.get(cle)
+            if histogramme is None:
+                histogramme = self._histogrammes[cle] = Histogramme()
+            histogramme.observer(valeur)
+
+    def incrementer(self, nom, valeur=1, **labels):
+        cle = (nom, tuple(sorted(labels.items())))
+        with self._lock:
+            self._compteurs[cle] = self._compteurs.get(cle, 0) + valeur
+
+    def definir(self, nom, valeur, **labels):
+        """Fixe la valeur d'une jauge"""
+        with self._lock:
+            self._jauges[(nom, tuple(sorted(labels.items())))] = valeur
+
+    def reinitialiser(self):
+        """Remet à zéro histogrammes et compteurs (après le rendu de préchauffage)"""
+        with self._lock:
+            self._histogrammes.clear()
+            self._compteurs.clear()
+
+    def valeur(self, nom, **labels):
+        """Valeur courante d'un compteur"""
+        with self._lock:
+            return self._compteurs.get((nom, tuple(sorted(labels.items()))), 0)
+
+    @contextlib.contextmanager
+    def mesurer(self, etape):
+        """Chronomètre une étape du rendu (utilisable aussi comme décorateur)"""
+        debut = time.perf_counter()
+        try:
+            yield
+        finally:
+            duree = time.perf_counter() - debut
+            self.observer('devis_stage_seconds', duree, stage=etape)
+            durees = _chronometres.get()
+            if durees is not None:
+                durees[etape] = durees.get(etape, 0.0) + duree
+
+    def exposer(self):
+        """Rendu des métriques au format texte de Prometheus"""
+        with self._lock:
+            histogrammes = [(cle, list(h.comptes), h.somme, h.total) for cle, h in self._histogrammes.items()]
+            compteurs = list(self._compteurs.items()) + list(self._jauges.items())
+
+        lignes = []
+        for nom, (type_metrique, description) in DESCRIPTIONS.items():
+            lignes.append(f"# HELP {nom} {description}")
+            lignes.append(f"# TYPE {nom} {type_metrique}")
+            for (nom_serie, labels), comptes, somme, total in sorted(histogrammes):
+                if nom_serie != nom:
+                    continue
+                cumul = 0
+                for borne, compte in zip(BORNES + (float('inf'),), comptes):
+                    cumul += compte
+                    le = '+Inf' if borne == float('inf') else repr(borne)
+                    lignes.append(f"{nom}_bucket{_labels(labels + (('le', le),))} {cumul}")
+                lignes.append(f"{nom}_sum{_labels(labels)} {somme}")
+                lignes.append(f"{nom}_count{_labels(labels)} {total}")
+            for (nom_serie, labels), valeur in sorted(compteurs):
+                if nom_serie == nom:
+                    lignes.append(f"{nom}{_labels(labels)} {valeur}")
+        return '\n'.join(lignes) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{cle}="{valeur}"' for cle, valeur in labels) + '}'
+
+
+@contextlib.contextmanager
+def chronometrer():
+    """Collecte les durées des étapes exécutées dans ce contexte (requête en cours)"""
+    durees = {}
+    jeton = _chronometres.set(durees)
+    try:
+        yield durees
+    finally:
+        _chronometres.reset(jeton)
+
+
+def server_timing(durees):
+    """Valeur de l'en-tête Server-Timing pour des durées par étape (en secondes)"""
+    return ', '.join(f"{etape};dur={duree * 1000:.2f}" for etape, duree in durees.items())
+
+
+# Registre partagé par tous les rendus du processus
+metriques = Metriques()
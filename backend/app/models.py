@@ -0,0 +1,275 @@
+# app/models.py
+"""
+Modèles typés des payloads de devis
+
+Les payloads JSON sont validés et convertis une seule fois, à l'entrée de
+l'API : le rendu ne manipule ensuite que des objets immuables aux attributs
+déjà typés (textes, nombres), sans dictionnaires ni conversions répétées.
+Un payload invalide lève `PayloadError` avant tout travail de mise en page.
+
+Les valeurs par défaut reprennent les textes d'exemple affichés quand un
+champ est absent ; une valeur `null` est traitée comme un champ absent.
+"""
+import dataclasses
+import datetime
+import functools
+from dataclasses import dataclass, field
+
+from app import montants
+
+
+class PayloadError(ValueError):
+    """Levée quand un payload de devis est invalide"""
+
+
+def _texte(valeur, chemin, cle):
+    if isinstance(valeur, str):
+        return valeur
+    if isinstance(valeur, (int, float)):
+        return str(valeur)
+    raise PayloadError(f"{chemin}.{cle} : texte attendu")
+
+
+def _quantite(valeur, chemin, cle):
+    """Quantité affichée telle quelle : entier ou décimal, jamais convertie en texte"""
+    if isinstance(valeur, (int, float)) and not isinstance(valeur, bool):
+        return valeur
+    if isinstance(valeur, str):
+        if valeur.strip() == '':
+            return ''
+        try:
+            nombre = float(valeur)
+        except ValueError:
+            raise PayloadError(f"{chemin}.{cle} : nombre attendu") from None
+        return int(nombre) if nombre.is_integer() else nombre
+    raise PayloadError(f"{chemin}.{cle} : nombre attendu")
+
+
+def _centimes(valeur, chemin, cle):
+    """Montant en euros -> centimes (entier exact)"""
+    if isinstance(valeur, (int, float, str)) and not isinstance(valeur, bool):
+        try:
+            return montants.centimes(valeur)
+        except ValueError:
+            pass
+    raise PayloadError(f"{chemin}.{cle} : nombre attendu")
+
+
+def _milliemes(valeur, chemin, cle):
+    """Quantité -> millièmes d'unité (une quantité vide compte pour zéro)"""
+    if isinstance(valeur, str) and valeur.strip() == '':
+        return 0
+    if isinstance(valeur, (int, float, str)) and not isinstance(valeur, bool):
+        try:
+            return montants.milliemes(valeur)
+        except ValueError:
+            pass
+    raise PayloadError(f"{chemin}.{cle} : nombre attendu")
+
+
+def _taux(valeur, chemin, cle):
+    """Taux de TVA en pourcentage -> points de base (5.5 -> 550)"""
+    taux = None
+    if isinstance(valeur, (int, float, str)) and not isinstance(valeur, bool):
+        try:
+            taux = montants.points_de_base(valeur)
+        except ValueError:
+            pass
+    if taux is None or not 0 <= taux <= 10000:
+        raise PayloadError(f"{chemin}.{cle} : taux entre 0 et 100 attendu")
+    return taux
+
+
+def _entier_positif(valeur, chemin, cle):
+    if isinstance(valeur, str):
+        valeur = valeur.strip()
+        if valeur.isdigit():
+            valeur = int(valeur)
+    if isinstance(valeur, float) and valeur.is_integer():
+        valeur = int(valeur)
+    if isinstance(valeur, int) and not isinstance(valeur, bool) and valeur >= 1:
+        return valeur
+    raise PayloadError(f"{chemin}.{cle} : entier strictement positif attendu")
+
+
+def _booleen(valeur, chemin, cle):
+    if isinstance(valeur, bool):
+        return valeur
+    if valeur in (0, 1):
+        return bool(valeur)
+    raise PayloadError(f"{chemin}.{cle} : booléen attendu")
+
+
+def _sous_modele(cls):
+    """Conversion d'un objet imbriqué en modèle"""
+    def conversion(valeur, chemin, cle):
+        return cls.depuis_dict(valeur, f"{chemin}.{cle}")
+    return conversion
+
+
+def _mode_pagination(valeur, chemin, cle):
+    if valeur in ('fixed', 'auto'):
+        return valeur
+    raise PayloadError(f"{chemin}.{cle} : 'fixed' ou 'auto' attendu")
+
+
+def _champ(defaut, conversion, cle=None):
+    """Champ de modèle : valeur par défaut, fonction de conversion et clé JSON (si différente)"""
+    metadata = {'conversion': conversion, 'cle': cle}
+    if callable(defaut):
+        return field(default_factory=defaut, metadata=metadata)
+    return field(default=defaut, metadata=metadata)
+
+
+@functools.cache
+def _schema(cls):
+    """(attribut, clé JSON, conversion) de chaque champ d'un modèle"""
+    return tuple(
+        (champ.name, champ.metadata['cle'] or champ.name, champ.metadata['conversion'])
+        for champ in dataclasses.fields(cls)
+    )
+
+
+def _construire(cls, data, chemin, base=None):
+    """
+    Construit un modèle à partir d'un objet JSON, en validant chaque champ connu
+
+    Les champs absents prennent la valeur par défaut, ou celle de `base` si
+    elle est fournie. Le chemin n'est mis en forme qu'en cas d'erreur : la
+    validation d'une ligne reste bon marché sur les devis de plusieurs
+    milliers de lignes.
+    """
+    if data is None:
+        return cls() if base is None else base
+    if not isinstance(data, dict):
+        raise PayloadError(f"{chemin} : objet attendu")
+    valeurs = {}
+    for nom, cle, conversion in _schema(cls):
+        valeur = data.get(cle)
+        if valeur is not None:
+            valeurs[nom] = conversion(valeur, chemin, cle)
+    if base is not None:
+        return dataclasses.replace(base, **valeurs)
+    return cls(**valeurs)
+
+
+def _aujourdhui():
+    return datetime.datetime.now().strftime('%d/%m/%Y')
+
+
+@dataclass(frozen=True, slots=True)
+class InfosSociete:
+    """Coordonnées et mentions légales de l'émetteur du devis"""
+
+    nom: str = _champ('le nom de votre société', _texte)
+    activite: str = _champ('votre activité', _texte)
+    adresse: str = _champ('Adresse', _texte)
+    code_postal: str = _champ('Code postal', _texte)
+    ville: str = _champ('Ville', _texte)
+    telephone: str = _champ('Téléphone', _texte)
+    email: str = _champ('Email', _texte)
+    site: str = _champ('Site web', _texte)
+    logo: str = _champ('', _texte)
+    numero_devis: str = _champ('', _texte)
+    date: str = _champ(_aujourdhui, _texte)
+    forme_juridique: str = _champ('', _texte)
+    capital: str = _champ('', _texte)
+    siret: str = _champ('', _texte)
+    rcs: str = _champ('', _texte)
+    code_ape: str = _champ('', _texte)
+    tva_intracom: str = _champ('', _texte)
+    info_bancaire: str = _champ('', _texte)
+    rib: str = _champ('', _texte)
+
+    @classmethod
+    def depuis_dict(cls, data, chemin='infos_societe', base=None):
+        return _construire(cls, data, chemin, base)
+
+
+@dataclass(frozen=True, slots=True)
+class InfosClient:
+    """Coordonnées du client et intitulé du projet"""
+
+    nom: str = _champ('Société et/ou Nom du client', _texte)
+    adresse: str = _champ('Adresse du client', _texte)
+    code_postal: str = _champ('Code postal', _texte)
+    ville: str = _champ('Ville', _texte)
+    description_projet: str = _champ('description du projet et/ou Produits', _texte)
+
+    @classmethod
+    def depuis_dict(cls, data, chemin='infos_client'):
+        return _construire(cls, data, chemin)
+
+
+@dataclass(frozen=True, slots=True)
+class Produit:
+    """
+    Ligne de produit ou de prestation
+
+    Le total de la ligne n'est pas repris du client : il est recalculé à partir
+    de la quantité et du prix unitaire (voir app.montants).
+    """
+
+    quantite: object = _champ('', _quantite)
+    quantite_milliemes: int = _champ(0, _milliemes, cle='quantite')
+    designation: str = _champ('', _texte)
+    prix_centimes: int = _champ(0, _centimes, cle='prix_unitaire')
+    tva_taux_bp: int = _champ(None, _taux, cle='tva_taux')  # None : taux du devis
+
+    @classmethod
+    def depuis_dict(cls, data, chemin='produit'):
+        return _construire(cls, data, chemin)
+
+
+@dataclass(frozen=True, slots=True)
+class Pagination:
+    """
+    Découpage des produits en pages
+
+    En mode 'auto', les lignes sont réparties selon leur hauteur réelle
+    (voir app.pagination) : itemsPerPage et totalPages sont alors ignorés.
+    """
+
+    mode: str = _champ('fixed', _mode_pagination)
+    items_per_page: int = _champ(4, _entier_positif, cle='itemsPerPage')
+    total_pages: int = _champ(None, _entier_positif, cle='totalPages')
+
+    @classmethod
+    def depuis_dict(cls, data, chemin='paginationSettings'):
+        return _construire(cls, data, chemin)
+
+
+@dataclass(frozen=True, slots=True)
+class Conditions:
+    """Conditions commerciales, régime de TVA et pagination"""
+
+    validite: str = _champ('3 mois', _texte)
+    reglement: str = _champ('40% à la commande, le solde à la livraison', _texte)
+    tva_taux_bp: int = _champ(2000, _taux, cle='tva_taux')
+    is_auto_entrepreneur: bool = _champ(False, _booleen, cle='isAutoEntrepreneur')
+    pagination: Pagination = _champ(Pagination, _sous_modele(Pagination), cle='paginationSettings')
+
+    @classmethod
+    def depuis_dict(cls, data, chemin='conditions'):
+        return _construire(cls, data, chemin)
+
+
+def texte(data, cle, defaut=None):
+    """Champ texte optionnel à la racine du payload"""
+    valeur = data.get(cle)
+    return defaut if valeur is None else _texte(valeur, 'payload', cle)
+
+
+def produits_depuis_liste(data, chemin='produits'):
+    """Valide la liste des produits d'un payload"""
+    if data is None:
+        return ()
+    if not isinstance(data, list):
+        raise PayloadError(f"{chemin} : liste attendue")
+    return tuple(Produit.depuis_dict(p, f"{chemin}[{i}]") for i, p in enumerate(data))
+
+
+def produits_depuis_flux(lignes, debut=0, chemin='produits'):
+    """Valide des produits reçus au fil de l'eau (un objet par ligne)"""
+    for i, p in enumerate(lignes, start=debut):
+        yield Produit.depuis_dict(p, f"{chemin}[{i}]")
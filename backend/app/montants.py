@@ -0,0 +1,212 @@
+# app/montants.py
+"""
+Calcul exact des montants d'un devis
+
+Les prix sont convertis en centimes et les quantités en millièmes dès la
+validation du payload (voir app.models), si bien que tous les calculs se
+font en entiers : aucune erreur d'arrondi ne s'accumule, quel que soit le
+nombre de lignes. Le total de chaque ligne est recalculé ici (quantité ×
+prix unitaire) au lieu de reprendre celui envoyé par le client.
+
+Les totaux sont calculés en une passe sur des colonnes (quantités, prix,
+taux) ; avec NumPy les colonnes sont des tableaux int64 et le calcul est
+vectorisé, sans NumPy une boucle Python donne exactement le même résultat.
+
+La TVA est calculée par taux, sur la somme des lignes soumises à ce taux,
+puis arrondie au centime (arrondi commercial, au plus proche, 0,5 s'éloignant
+de zéro).
+"""
+import importlib.util
+import math
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# numpy (dépendance optionnelle) n'est importé qu'au premier calcul vectorisé
+NUMPY_DISPONIBLE = importlib.util.find_spec('numpy') is not None
+
+# Au-delà, quantité × prix pourrait dépasser un entier 64 bits : calcul en entiers Python
+_LIMITE_INT64 = 2 ** 62
+
+
+def _decimal(valeur):
+    try:
+        nombre = Decimal(valeur if isinstance(valeur, str) else repr(valeur))
+    except InvalidOperation:
+        raise ValueError(f"Montant invalide : {valeur!r}") from None
+    if not nombre.is_finite():
+        raise ValueError(f"Montant invalide : {valeur!r}")
+    return nombre
+
+
+def _en_entier(valeur, echelle, exposant):
+    """valeur × echelle arrondie au plus proche, bornée à ±2**62 ; lève ValueError"""
+    entier = _vers_entier(valeur, echelle, exposant)
+    if abs(entier) >= _LIMITE_INT64:
+        raise ValueError(f"Montant hors limites : {valeur!r}")
+    return entier
+
+
+def _vers_entier(valeur, echelle, exposant):
+    """valeur × echelle arrondie au plus proche (0,5 s'éloignant de zéro)"""
+    if type(valeur) is int:
+        return valeur * echelle
+    if type(valeur) is float:
+        if not math.isfinite(valeur):
+            raise ValueError(f"Montant invalide : {valeur!r}")
+        # Cas courant : pas plus de décimales que l'échelle, le produit est
+        # alors à un epsilon d'un entier et l'arrondi direct est exact
+        produit = valeur * echelle
+        arrondi = round(produit)
+        if abs(produit - arrondi) < 1e-6:
+            return int(arrondi)
+    try:
+        return int(_decimal(valeur).scaleb(exposant).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except ArithmeticError:
+        # InvalidOperation : plus de chiffres que la précision décimale (montant démesuré)
+        raise ValueError(f"Montant invalide : {valeur!r}") from None
+
+
+def centimes(valeur):
+    """Convertit un montant en euros (nombre ou texte) en centimes, arrondi au plus proche"""
+    return _en_entier(valeur, 100, 2)
+
+
+def milliemes(valeur):
+    """Convertit une quantité en millièmes d'unité"""
+    return _en_entier(valeur, 1000, 3)
+
+
+def points_de_base(taux):
+    """Convertit un taux en pourcentage (5.5) en centièmes de pour cent (550)"""
+    return centimes(taux)
+
+
+def formater(montant):
+    """Centimes -> texte en euros avec deux décimales ('1234.50')"""
+    signe = '-' if montant < 0 else ''
+    euros, cents = divmod(abs(montant), 100)
+    return f"{signe}{euros}.{cents:02d}"
+
+
+def formater_taux(taux_bp):
+    """Points de base -> pourcentage sans zéros inutiles ('20', '5.5')"""
+    return f"{Decimal(taux_bp).scaleb(-2).normalize():f}"
+
+
+def _arrondir(numerateur, diviseur):
+    """Division entière arrondie au plus proche, 0,5 s'éloignant de zéro"""
+    quotient = (abs(numerateur) + diviseur // 2) // diviseur
+    return -quotient if numerateur < 0 else quotient
+
+
+@dataclass(frozen=True, slots=True)
+class Totaux:
+    """Totaux d'un devis, en centimes"""
+
+    lignes: tuple           # total HT de chaque ligne (vide en rendu au fil de l'eau)
+    nombre_lignes: int
+    total_ht: int
+    tva: tuple              # (taux en points de base, base HT, montant de TVA) par taux
+    total_tva: int
+    total_ttc: int
+    auto_entrepreneur: bool
+
+    def to_dict(self):
+        """Détail des totaux pour les réponses JSON (montants en euros, au format texte)"""
+        return {
+            'total_ht': formater(self.total_ht),
+            'tva': [
+                {'taux': formater_taux(taux), 'base_ht': formater(base), 'montant': formater(montant)}
+                for taux, base, montant in self.tva
+            ],
+            'total_tva': formater(self.total_tva),
+            'total_ttc': formater(self.total_ttc),
+            'tva_applicable': not self.auto_entrepreneur,
+            'lignes': self.nombre_lignes,
+        }
+
+
+class CalculTotaux:
+    """
+    Accumulateur des totaux d'un devis
+
+    `ajouter()` peut être appelé plusieurs fois (une fois par page en rendu au
+    fil de l'eau) ; il retourne le total de chaque ligne ajoutée.
+    """
+
+    def __init__(self, taux_defaut_bp, auto_entrepreneur=False, vectoriser=None):
+        self.taux_defaut_bp = taux_defaut_bp
+        self.auto_entrepreneur = auto_entrepreneur
+        self.vectoriser = NUMPY_DISPONIBLE if vectoriser is None else vectoriser
+        self.total_ht = 0
+        self.nombre_lignes = 0
+        self._bases = {}  # taux en points de base -> base HT
+
+    def ajouter(self, produits):
+        """Ajoute des lignes ; retourne la liste de leurs totaux HT (centimes)"""
+        produits = produits if isinstance(produits, (list, tuple)) else list(produits)
+        if not produits:
+            return []
+        self.nombre_lignes += len(produits)
+
+        quantites = [p.quantite_milliemes for p in produits]
+        prix = [p.prix_centimes for p in produits]
+        taux_defaut = self.taux_defaut_bp
+        taux = [taux_defaut if p.tva_taux_bp is None else p.tva_taux_bp for p in produits]
+
+        if self.vectoriser:
+            # Les produits et leurs sommes doivent tenir dans des entiers 64 bits
+            borne = max(map(abs, quantites)) * max(map(abs, prix))
+            if borne < _LIMITE_INT64 and len(produits) * (borne // 1000 + 1) < _LIMITE_INT64:
+                return self._ajouter_vectorise(quantites, prix, taux)
+
+        lignes = [_arrondir(q * p, 1000) for q, p in zip(quantites, prix)]
+        bases = self._bases
+        for montant, t in zip(lignes, taux):
+            bases[t] = bases.get(t, 0) + montant
+        self.total_ht += sum(lignes)
+        return lignes
+
+    def _ajouter_vectorise(self, quantites, prix, taux):
+        import numpy as np
+
+        montants = np.array(quantites, dtype=np.int64) * np.array(prix, dtype=np.int64)
+        lignes = np.sign(montants) * ((np.abs(montants) + 500) // 1000)
+
+        # Somme des lignes par taux (quelques taux distincts au plus)
+        taux = np.array(taux, dtype=np.int64)
+        for t in np.unique(taux).tolist():
+            self._bases[t] = self._bases.get(t, 0) + int(lignes[taux == t].sum())
+
+        lignes = lignes.tolist()
+        self.total_ht += sum(lignes)
+        return lignes
+
+    def resultat(self, lignes=()):
+        """Totaux HT, TVA par taux et TTC des lignes ajoutées"""
+        if self.auto_entrepreneur:
+            tva = ()
+        else:
+            # Sans ligne, le taux du devis est tout de même affiché
+            bases = self._bases or {self.taux_defaut_bp: 0}
+            tva = tuple(
+                (taux, base, _arrondir(base * taux, 10000))
+                for taux, base in sorted(bases.items())
+            )
+        total_tva = sum(montant for _, _, montant in tva)
+        return Totaux(
+            lignes=tuple(lignes),
+            nombre_lignes=self.nombre_lignes,
+            total_ht=self.total_ht,
+            tva=tva,
+            total_tva=total_tva,
+            total_ttc=self.total_ht + total_tva,
+            auto_entrepreneur=self.auto_entrepreneur,
+        )
+
+
+def calculer_totaux(produits, conditions, vectoriser=None):
+    """Totaux complets d'un devis (lignes, HT, TVA par taux, TTC)"""
+    calcul = CalculTotaux(conditions.tva_taux_bp, conditions.is_auto_entrepreneur, vectoriser)
+    lignes = calcul.ajouter(produits)
+    return calcul.resultat(lignes)
@@ -0,0 +1,91 @@
+# app/pagination.py
+"""
+Pagination automatique des tableaux de produits
+
+Au lieu d'un nombre fixe de lignes par page, les lignes sont réparties selon
+leur hauteur réelle une fois mise en page : chaque page reçoit autant de
+lignes que le cadre peut en contenir. La hauteur d'une ligne ne dépend que de
+sa désignation (les autres cellules tiennent sur une ligne) ; elle est mesurée
+une seule fois par désignation et largeur de colonnes, puis mise en cache.
+
+La répartition est faite avant le rendu, en une seule passe sur les lignes.
+"""
+import functools
+import itertools
+
+from reportlab.platypus import Table
+
+from app.designation import paragraphe_designation
+from app.styles import TABLE_STYLE_PRODUITS
+
+# Nombre de hauteurs de lignes conservées
+TAILLE_CACHE = 8192
+
+# Hauteur de mesure : assez grande pour qu'aucune ligne ne soit coupée
+_HAUTEUR_MESURE = 1e6
+
+ENTETE_PRODUITS = ("Qté", "Désignation", "Prix Unit.", "Total HT")
+
+
+def _hauteur_rangee(rangee, largeurs):
+    tableau = Table([rangee], colWidths=largeurs)
+    tableau.setStyle(TABLE_STYLE_PRODUITS)
+    tableau.wrap(sum(largeurs), _HAUTEUR_MESURE)
+    return tableau._rowHeights[0]
+
+
+@functools.lru_cache(maxsize=16)
+def hauteur_entete(largeurs):
+    """Hauteur de la rangée d'en-tête du tableau des produits"""
+    return _hauteur_rangee(list(ENTETE_PRODUITS), largeurs)
+
+
+@functools.lru_cache(maxsize=TAILLE_CACHE)
+def hauteur_ligne(designation, style, style_secours, largeurs):
+    """Hauteur d'une ligne de produit, mesurée avec le style du tableau"""
+    return _hauteur_rangee(["0", paragraphe_designation(designation, style, style_secours), "0", "0"], largeurs)
+
+
+def paginer(produits, hauteur, capacite):
+    """
+    Répartit des lignes en pages, dans l'ordre, en remplissant chaque page
+
+    Args:
+        produits (iterable): lignes à répartir (consommées une seule fois)
+        hauteur (callable): hauteur d'une ligne
+        capacite (float): hauteur disponible pour les lignes d'une page
+
+    Yields:
+        list: lignes de chaque page (au moins une ligne par page, même si
+        elle dépasse la capacité)
+    """
+    page = []
+    restant = capacite
+    for produit in produits:
+        h = hauteur(produit)
+        if page and h > restant:
+            yield page
+            page = []
+            restant = capacite
+        page.append(produit)
+        restant -= h
+    if page:
+        yield page
+
+
+def par_paquets(produits, taille):
+    """Répartition fixe : `taille` lignes par page"""
+    produits = iter(produits)
+    while page := list(itertools.islice(produits, taille)):
+        yield page
+
+
+def stats():
+    """Compteurs du cache des hauteurs de lignes"""
+    info = hauteur_ligne.cache_info()
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'entries': info.currsize,
+        'max_entries': info.maxsize,
+    }
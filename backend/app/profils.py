@@ -0,0 +1,198 @@
+# app/profils.py
+"""
+Profils de société enregistrés côté serveur
+
+Un émetteur régulier enregistre une fois ses coordonnées, mentions légales et
+son logo ; ses devis ne font ensuite référence qu'à `profile_id` (et
+éventuellement `profile_version`) au lieu de renvoyer à chaque requête tout
+`infos_societe` et un logo en base64 de plusieurs centaines de Ko.
+
+Le logo est décodé et ramené au cadre d'impression de l'en-tête dès
+l'enregistrement. Chaque enregistrement crée une nouvelle version, jamais
+modifiée ensuite : une version peut donc être gardée en mémoire sans
+invalidation, et un devis rendu avec une version précise reste reproductible.
+"""
+import base64
+import dataclasses
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from app import json_codec
+from app.image_cache import cache_images
+from app.models import InfosSociete, PayloadError
+
+# Champs propres à chaque devis, jamais conservés dans un profil
+CHAMPS_DEVIS = ('numero_devis', 'date')
+
+_ID_VALIDE = re.compile(r'[A-Za-z0-9_-]{1,64}')
+
+
+class ProfilIntrouvable(Exception):
+    """Levée quand un profil (ou une version de profil) n'existe pas"""
+
+
+def _valider_id(profil_id):
+    if not isinstance(profil_id, str) or not _ID_VALIDE.fullmatch(profil_id):
+        raise PayloadError("profile_id : identifiant attendu (lettres, chiffres, - et _, 64 caractères au plus)")
+    return profil_id
+
+
+@dataclass(frozen=True, slots=True)
+class ProfilSociete:
+    """Version enregistrée d'un profil de société"""
+
+    id: str
+    version: int
+    infos: InfosSociete  # sans numéro ni date de devis ; logo pré-redimensionné
+    cree: float
+
+    def infos_societe(self, data, chemin='infos_societe'):
+        """Informations de la société d'un devis : celles du profil, complétées ou remplacées par data"""
+        # Date du jour par défaut, comme sans profil
+        base = dataclasses.replace(self.infos, date=InfosSociete().date)
+        return InfosSociete.depuis_dict(data, chemin, base=base)
+
+    def to_dict(self):
+        infos = dataclasses.asdict(self.infos)
+        for champ in CHAMPS_DEVIS:
+            del infos[champ]
+        infos['logo'] = bool(self.infos.logo)
+        return {'id': self.id, 'version': self.version, 'created': self.cree, 'infos_societe': infos}
+
+
+class RegistreProfils:
+    """
+    Profils de société stockés dans une base SQLite (journal WAL)
+
+    Comme pour les artefacts, la base peut être partagée par les workers d'une
+    même machine ; chaque thread ouvre sa propre connexion. Les versions lues
+    sont gardées dans un cache LRU propre au processus.
+    """
+
+    def __init__(self, chemin_base, max_entrees=256, timeout=30):
+        self.chemin_base = chemin_base
+        self.max_entrees = max_entrees
+        self.timeout = timeout
+        self._local = threading.local()
+        self._versions = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        dossier = os.path.dirname(chemin_base)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        with self._connexion() as connexion:
+            connexion.execute(
+                "CREATE TABLE IF NOT EXISTS profils ("
+                " id TEXT NOT NULL,"
+                " version INTEGER NOT NULL,"
+                " infos BLOB NOT NULL,"
+                " cree REAL NOT NULL,"
+                " PRIMARY KEY (id, version))"
+            )
+
+    def _connexion(self):
+        connexion = getattr(self._local, 'connexion', None)
+        if connexion is None or self._local.pid != os.getpid():
+            connexion = sqlite3.connect(self.chemin_base, timeout=self.timeout, isolation_level=None)
+            connexion.execute('PRAGMA journal_mode=WAL')
+            connexion.execute('PRAGMA synchronous=NORMAL')
+            self._local.connexion = connexion
+            self._local.pid = os.getpid()
+        return connexion
+
+    def enregistrer(self, profil_id, data):
+        """
+        Enregistre une nouvelle version d'un profil à partir d'un objet infos_societe
+
+        Lève PayloadError si les informations ou le logo sont invalides.
+        """
+        _valider_id(profil_id)
+        if isinstance(data, dict):
+            data = {cle: valeur for cle, valeur in data.items() if cle not in CHAMPS_DEVIS}
+        infos = InfosSociete.depuis_dict(data, 'infos_societe')
+        infos = dataclasses.replace(infos, logo=self._reduire_logo(infos.logo), numero_devis='', date='')
+
+        connexion = self._connexion()
+        # BEGIN IMMEDIATE : deux enregistrements simultanés ne peuvent obtenir le même numéro
+        connexion.execute('BEGIN IMMEDIATE')
+        try:
+            (version,) = connexion.execute(
+                "SELECT COALESCE(MAX(version), 0) + 1 FROM profils WHERE id = ?", (profil_id,)
+            ).fetchone()
+            cree = time.time()
+            connexion.execute(
+                "INSERT INTO profils (id, version, infos, cree) VALUES (?, ?, ?, ?)",
+                (profil_id, version, json_codec.dumps(infos), cree)
+            )
+            connexion.execute('COMMIT')
+        except BaseException:
+            connexion.execute('ROLLBACK')
+            raise
+        return self._conserver(ProfilSociete(profil_id, version, infos, cree))
+
+    def _reduire_logo(self, logo):
+        """Logo décodé et ramené au cadre de l'en-tête, sous forme de data URI compacte"""
+        if not logo:
+            return ''
+        from app.sortie import PROFILS_SORTIE
+        from app.styles import CADRE_LOGO
+
+        # Résolution et qualité du profil de sortie le plus exigeant : chaque rendu la réduit ensuite au besoin
+        dpi = max(cache_images.dpi, *(profil.dpi for profil in PROFILS_SORTIE.values()))
+        qualite = max(profil.qualite_jpeg for profil in PROFILS_SORTIE.values())
+        try:
+            image = cache_images.get(logo, *CADRE_LOGO, kind='proportional', dpi=dpi, qualite=qualite)
+        except Exception as e:
+            raise PayloadError(f"infos_societe.logo : image invalide ({e})") from None
+        format_image = 'png' if image.data.startswith(b'\x89PNG') else 'jpeg'
+        return f"data:image/{format_image};base64,{base64.b64encode(image.data).decode('ascii')}"
+
+    def profil(self, profil_id, version=None):
+        """Version demandée d'un profil (la dernière par défaut) ; lève ProfilIntrouvable"""
+        _valider_id(profil_id)
+        if version is None:
+            ligne = self._connexion().execute(
+                "SELECT MAX(version) FROM profils WHERE id = ?", (profil_id,)
+            ).fetchone()
+            version = ligne[0]
+            if version is None:
+                raise ProfilIntrouvable(f"Profil de société introuvable : {profil_id}")
+
+        cle = (profil_id, version)
+        with self._lock:
+            profil = self._versions.get(cle)
+            if profil is not None:
+                self._versions.move_to_end(cle)
+                self.hits += 1
+                return profil
+            self.misses += 1
+
+        ligne = self._connexion().execute(
+            "SELECT infos, cree FROM profils WHERE id = ? AND version = ?", cle
+        ).fetchone()
+        if ligne is None:
+            raise ProfilIntrouvable(f"Profil de société introuvable : {profil_id} (version {version})")
+        infos = InfosSociete(**json_codec.loads(ligne[0]))
+        return self._conserver(ProfilSociete(profil_id, version, infos, ligne[1]))
+
+    def _conserver(self, profil):
+        with self._lock:
+            self._versions[(profil.id, profil.version)] = profil
+            while len(self._versions) > self.max_entrees:
+                self._versions.popitem(last=False)
+        return profil
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._versions),
+                'max_entries': self.max_entrees,
+            }
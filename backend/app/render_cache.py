@@ -0,0 +1,166 @@
+# app/render_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+
+from app import json_codec
+from app.models import Conditions, InfosClient, InfosSociete, PayloadError, produits_depuis_liste, texte
+from app.profils import ProfilIntrouvable
+from app.sortie import profil_sortie
+
+
+def cle_payload(parametres):
+    """Calcule une empreinte canonique (sha256) des paramètres normalisés d'un devis"""
+    return hashlib.sha256(json_codec.dumps(parametres, sort_keys=True)).hexdigest()
+
+
+def normaliser_parametres(data, profils=None):
+    """
+    Valide un payload de devis et le convertit en paramètres de génération typés
+
+    Les valeurs par défaut dépendantes du contexte (date du jour) sont figées ici
+    afin que deux requêtes identiques produisent la même empreinte. Un payload
+    qui fait référence à un profil de société (`profile_id`, `profile_version`)
+    est complété par ce profil, lu dans le registre `profils` ; `output_profile`
+    choisit le profil de sortie du PDF (voir app.sortie). Lève
+    PayloadError si le payload est invalide.
+    """
+    if not isinstance(data, dict):
+        raise PayloadError("Le devis doit être un objet JSON")
+
+    profil_id = data.get('profile_id')
+    if profil_id is not None:
+        if profils is None:
+            raise PayloadError("profile_id : aucun registre de profils de société")
+        version = data.get('profile_version')
+        if version is not None and (isinstance(version, bool) or not isinstance(version, int) or version < 1):
+            raise PayloadError("profile_version : entier strictement positif attendu")
+        try:
+            infos_societe = profils.profil(profil_id, version).infos_societe(data.get('infos_societe'))
+        except ProfilIntrouvable as e:
+            raise PayloadError(str(e)) from None
+    else:
+        infos_societe = InfosSociete.depuis_dict(data.get('infos_societe'))
+
+    conditions = dict(data.get('conditions') or {})
+    conditions['isAutoEntrepreneur'] = data.get('isAutoEntrepreneur', False)
+
+    return {
+        'infos_societe': infos_societe,
+        'infos_client': InfosClient.depuis_dict(data.get('infos_client')),
+        'produits': produits_depuis_liste(data.get('produits')),
+        'conditions': Conditions.depuis_dict(conditions),
+        'signature': texte(data, 'signature') or None,
+        'mention_accord': texte(data, 'mentionAccord', "BON POUR ACCORD ET EXECUTION DES TRAVAUX"),
+        'date_signature': texte(data, 'dateSignature'),
+        'profil_sortie': profil_sortie(data.get('output_profile')),
+    }
+
+
+class RenderCache:
+    """
+    Cache LRU des PDF générés, adressé par l'empreinte du payload normalisé
+
+    Les fichiers sont conservés dans le stockage d'artefacts sous un nom dérivé
+    de l'empreinte ; le cache ne garde en mémoire que l'index (nom, taille).
+    L'éviction ne retire que l'entrée de l'index : le fichier a pu être remis à
+    un client, et sa suppression revient au nettoyage des artefacts. Comme le
+    nom ne dépend que de l'empreinte, un fichier rendu par un autre worker est
+    retrouvé dans le stockage partagé.
+    """
+
+    def __init__(self, store, max_entries=256, max_bytes=200 * 1024 * 1024, on_hit=None):
+        self.store = store
+        self.on_hit = on_hit
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @staticmethod
+    def nom_fichier(cle):
+        """Nom du fichier PDF associé à une empreinte"""
+        return f"devis_{cle[:32]}.pdf"
+
+    def get(self, cle):
+        """Retourne le nom du fichier en cache pour cette empreinte, ou None"""
+        if not self.enabled:
+            return None
+
+        with self._lock:
+            entree = self._entries.get(cle)
+            if entree is not None:
+                filename, taille = entree
+                # Le fichier a pu être supprimé par le nettoyage des artefacts
+                if self.store.existe(filename):
+                    self._entries.move_to_end(cle)
+                    self.hits += 1
+                else:
+                    del self._entries[cle]
+                    self._total_bytes -= taille
+                    entree = None
+        if entree is None:
+            # Absent de l'index de ce worker : peut-être rendu par un autre
+            filename = self.nom_fichier(cle)
+            taille = self.store.taille(filename)
+            with self._lock:
+                if taille is None:
+                    self.misses += 1
+                    return None
+                self.hits += 1
+            self._indexer(cle, filename, taille)
+
+        if self.on_hit is not None:
+            self.on_hit(filename, taille)
+        return filename
+
+    def invalider(self, cle):
+        """Retire une entrée dont le fichier a disparu depuis get() (suppression concurrente)"""
+        with self._lock:
+            entree = self._entries.pop(cle, None)
+            if entree is not None:
+                self._total_bytes -= entree[1]
+
+    def put(self, cle, filename, taille):
+        """Enregistre un fichier généré et applique le budget (entrées et octets)"""
+        if not self.enabled:
+            return
+
+        self._indexer(cle, filename, taille)
+
+    def _indexer(self, cle, filename, taille):
+        with self._lock:
+            ancienne = self._entries.pop(cle, None)
+            if ancienne is not None:
+                self._total_bytes -= ancienne[1]
+            self._entries[cle] = (filename, taille)
+            self._total_bytes += taille
+
+            while self._entries and (len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes):
+                cle_lru, (_, taille_lru) = self._entries.popitem(last=False)
+                self._total_bytes -= taille_lru
+                self.evictions += 1
+                if cle_lru == cle:
+                    # Un fichier plus gros que le budget n'est simplement pas indexé
+                    break
+
+    def stats(self):
+        """Compteurs et occupation du cache"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+            }
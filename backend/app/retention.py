@@ -0,0 +1,222 @@
+# app/retention.py
+import heapq
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou inter-processus, chaque worker se croit élu
+    fcntl = None
+
+
+class RetentionManager:
+    """
+    Suppression planifiée des artefacts générés
+
+    Chaque fichier écrit est enregistré avec sa date d'expiration dans un tas ;
+    le thread de nettoyage dort jusqu'à la prochaine expiration au lieu de
+    parcourir le stockage. Un plafond d'octets optionnel supprime les fichiers
+    les plus proches de l'expiration en premier.
+
+    Chaque worker gère les fichiers qu'il a écrits. Un seul worker, élu par un
+    verrou sur un fichier partagé, parcourt en plus le stockage à intervalle
+    long pour rattraper les fichiers orphelins (worker arrêté, redémarrage) et
+    les écritures inachevées abandonnées par un worker tué. Le plafond d'octets
+    porte sur tout le stockage partagé : seul le worker élu l'applique, et il
+    parcourt alors le stockage à intervalle court (`intervalle_plafond`) pour
+    en connaître l'occupation totale.
+
+    La réutilisation d'un fichier (hit du cache de rendu, quel que soit le
+    worker) est inscrite sur le fichier lui-même, dont la date de modification
+    est reportée à maintenant. Le tas de chaque worker n'est qu'une
+    planification : avant de supprimer un fichier expiré, le nettoyage relit
+    sa date de modification, qui fait foi.
+
+    Le thread appartient au processus qui l'a démarré : un processus forké
+    (workers gunicorn avec preload_app) n'en hérite pas, et `start()` en démarre
+    un nouveau, qui se présente à son tour à l'élection.
+    """
+
+    NOM_VERROU = '.retention.lock'
+
+    def __init__(self, store, retention, max_bytes=0, intervalle_reconciliation=None, intervalle_plafond=60, logger=None):
+        self.store = store
+        self.retention = retention
+        self.max_bytes = max_bytes
+        self.intervalle_reconciliation = intervalle_reconciliation or retention
+        self.intervalle_plafond = min(intervalle_plafond, self.intervalle_reconciliation)
+        self.logger = logger
+        self._tas = []
+        self._index = {}  # filename -> (expiration, taille)
+        self._total_bytes = 0
+        self._condition = threading.Condition()
+        self._verrou = None
+        self._elu = False
+        self._thread = None
+        self._pid = None
+        self.deleted = 0
+        self.bytes_reclaimed = 0
+        self.reconciliations = 0
+        self.temporaires_supprimes = 0
+
+    def suivre(self, filename, taille=None, expiration=None):
+        """Enregistre (ou prolonge) un fichier écrit dans le stockage"""
+        if taille is None:
+            taille = self.store.taille(filename)
+            if taille is None:
+                return
+        if expiration is None:
+            expiration = time.time() + self.retention
+
+        with self._condition:
+            ancienne = self._index.get(filename)
+            if ancienne is not None:
+                self._total_bytes -= ancienne[1]
+            self._index[filename] = (expiration, taille)
+            self._total_bytes += taille
+            heapq.heappush(self._tas, (expiration, filename))
+            self._condition.notify()
+
+    def prolonger(self, filename, taille=None):
+        """Fichier réutilisé : date de modification reportée à maintenant, expiration prolongée"""
+        if self.store.toucher(filename):
+            self.suivre(filename, taille)
+
+    def start(self):
+        """Démarre le thread de nettoyage de ce processus (sans effet s'il tourne déjà)"""
+        if self._pid != os.getpid():
+            # Premier démarrage, ou processus forké : l'état hérité ne vaut que pour le parent
+            self._pid = os.getpid()
+            self._condition = threading.Condition()
+            self._verrou = None
+            self._elu = False
+            self._thread = None
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._boucle, name='retention', daemon=True)
+            self._thread.start()
+
+    def _boucle(self):
+        prochaine_reconciliation = 0
+        while True:
+            maintenant = time.time()
+            if maintenant >= prochaine_reconciliation:
+                if self._est_elu():
+                    self.reconcilier()
+                intervalle = self.intervalle_plafond if self.max_bytes and self._elu else self.intervalle_reconciliation
+                prochaine_reconciliation = maintenant + intervalle
+
+            self.purger()
+
+            with self._condition:
+                prochaine = self._tas[0][0] if self._tas else prochaine_reconciliation
+                attente = min(prochaine, prochaine_reconciliation) - time.time()
+                if attente > 0:
+                    self._condition.wait(attente)
+
+    def purger(self, maintenant=None):
+        """Supprime les fichiers expirés, puis (worker élu) les plus anciens au-delà du plafond d'octets"""
+        maintenant = maintenant or time.time()
+        # L'index des autres workers ne couvre qu'une partie du stockage
+        plafond = self.max_bytes if self._elu else 0
+        a_supprimer = []
+        with self._condition:
+            while self._tas:
+                expiration, filename = self._tas[0]
+                entree = self._index.get(filename)
+                if entree is None or entree[0] != expiration:
+                    # Entrée périmée (fichier prolongé ou oublié)
+                    heapq.heappop(self._tas)
+                    continue
+                if expiration > maintenant and not (plafond and self._total_bytes > plafond):
+                    break
+                heapq.heappop(self._tas)
+                del self._index[filename]
+                self._total_bytes -= entree[1]
+                a_supprimer.append((filename, entree[1], expiration <= maintenant))
+
+        for filename, taille, expire in a_supprimer:
+            if expire:
+                # Réutilisé depuis, éventuellement par un autre worker : la date de modification fait foi
+                mtime = self.store.mtime(filename)
+                if mtime is not None and mtime + self.retention > maintenant:
+                    self.suivre(filename, taille, mtime + self.retention)
+                    continue
+            try:
+                if not self.store.supprimer(filename):
+                    continue
+            except Exception as e:
+                if self.logger:
+                    self.logger.error(f"Failed to delete {filename}: {str(e)}")
+                continue
+            self.deleted += 1
+            self.bytes_reclaimed += taille
+
+    def reconcilier(self):
+        """
+        Parcourt le stockage et met l'index à jour
+
+        Suit les fichiers inconnus, prolonge ceux réutilisés depuis leur entrée
+        dans l'index et oublie ceux supprimés par un autre worker : l'index
+        reflète ensuite l'occupation de tout le stockage. Supprime aussi les
+        écritures inachevées plus anciennes que la durée de rétention.
+        """
+        debut = time.time()
+        with self._condition:
+            connus = {filename: entree[0] for filename, entree in self._index.items()}
+        presents = set()
+        for filename, taille, mtime in self.store.lister():
+            presents.add(filename)
+            expiration = mtime + self.retention
+            if expiration > connus.get(filename, 0):
+                self.suivre(filename, taille, expiration)
+
+        with self._condition:
+            for filename, (expiration, taille) in list(self._index.items()):
+                # Entrées antérieures au parcours dont le fichier n'existe plus
+                if filename not in presents and expiration - self.retention < debut:
+                    del self._index[filename]
+                    self._total_bytes -= taille
+
+        try:
+            self.temporaires_supprimes += self.store.supprimer_temporaires(debut - self.retention)
+        except Exception as e:
+            if self.logger:
+                self.logger.error(f"Failed to delete temporary files: {str(e)}")
+        self.reconciliations += 1
+
+    def _est_elu(self):
+        """Tente de devenir le worker chargé des parcours du stockage (verrou non bloquant)"""
+        if self._elu:
+            return True
+        chemin = self.store.chemin_verrou(self.NOM_VERROU)
+        if chemin is None or fcntl is None:
+            # Stockage propre au processus, ou pas de verrou inter-processus
+            self._elu = True
+            return True
+        try:
+            verrou = open(chemin, 'a')
+        except OSError:
+            return False
+        try:
+            fcntl.flock(verrou, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            verrou.close()
+            return False
+        self._verrou = verrou
+        self._elu = True
+        return True
+
+    def stats(self):
+        """Compteurs et occupation du stockage suivi par ce worker"""
+        with self._condition:
+            return {
+                'tracked': len(self._index),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'deleted': self.deleted,
+                'bytes_reclaimed': self.bytes_reclaimed,
+                'reconciliations': self.reconciliations,
+                'tmp_deleted': self.temporaires_supprimes,
+                'sweeper': self._elu,
+            }
@@ -1,52 +1,438 @@
-from flask import Blueprint, request, jsonify, send_file, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context, url_for
+import io
+import itertools
 import os
+import sys
+import time
 import uuid
-import json
-from app.devis_generator import GenerateurDevis
+import zipfile
+from app.render_cache import cle_payload, normaliser_parametres
+from app.jobs import QueueFullError
+from app.concurrence import RenduSatureError
+from app.telechargement import ArtefactIntrouvable
+from app.profils import ProfilIntrouvable
+from app.models import PayloadError, produits_depuis_flux
+from app.montants import calculer_totaux
+from app import demarrage, json_codec
+from app.echange import compresser_ndjson, enregistrement_erreur, lire_enregistrements
+from app.image_cache import cache_images
+from app.cache_pages import cache_pages
+from app.metrics import chronometrer, metriques, server_timing
 
 bp = Blueprint('main', __name__)
 
 @bp.route('/api/generate-devis', methods=['POST'])
 def generate_devis():
     """API endpoint pour générer un devis PDF"""
+    if request.args.get('inline') == '1':
+        return devis_pdf()
+    
     try:
-        data = request.json
-        
-        # Récupérer les données
-        infos_societe = data.get('infos_societe', {})
-        infos_client = data.get('infos_client', {})
-        produits = data.get('produits', [])
-        conditions = data.get('conditions', {})
-        is_auto_entrepreneur = data.get('isAutoEntrepreneur', False)
-        
-        # Mise à jour des conditions avec le statut auto-entrepreneur
-        if conditions:
-            conditions['isAutoEntrepreneur'] = is_auto_entrepreneur
+        with chronometrer() as durees:
+            response = _generer_devis()
+        if current_app.config['SERVER_TIMING']:
+            response.headers['Server-Timing'] = server_timing(durees)
+        return response
+    
+    except PayloadError as e:
+        return _payload_invalide(e)
+    
+    except RenduSatureError as e:
+        return _service_sature(e, current_app.config['RENDER_RETRY_AFTER'])
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _payload_invalide(e):
+    """Réponse 400 pour un payload rejeté avant tout rendu"""
+    return jsonify({
+        'success': False,
+        'error': str(e)
+    }), 400
+
+def _service_sature(e, retry_after):
+    """Réponse 503 invitant le client à réessayer plus tard"""
+    response = jsonify({
+        'success': False,
+        'error': str(e)
+    })
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 503
+
+def _corps_json():
+    """Corps JSON de la requête ; lève PayloadError s'il est absent ou illisible"""
+    data = request.get_json(silent=True)
+    if data is None:
+        raise PayloadError("Le corps de la requête n'est pas un JSON valide")
+    return data
+
+def _generer_devis():
+    data = _corps_json()
+    
+    # Valider et convertir les données
+    with metriques.mesurer('payload'):
+        parametres = normaliser_parametres(data, current_app.extensions['profiles'])
+        cle = cle_payload(parametres)
+    
+    # Totaux recalculés côté serveur, renvoyés avec le fichier
+    with metriques.mesurer('totaux'):
+        totaux = calculer_totaux(parametres['produits'], parametres['conditions'])
+    
+    # Un devis identique a déjà été généré : on renvoie le fichier existant
+    cache = current_app.extensions['render_cache']
+    filename = cache.get(cle)
+    if filename is not None:
+        return jsonify({
+            'success': True,
+            'file': filename,
+            'cached': True,
+            'totaux': totaux.to_dict()
+        })
+    
+    # Nom de fichier dérivé de l'empreinte du devis
+    filename = cache.nom_fichier(cle) if cache.enabled else f"devis_{uuid.uuid4().hex}.pdf"
+    
+    # Générer le PDF (publié atomiquement une fois complet)
+    store = current_app.extensions['artifacts']
+    with store.ecriture(filename) as f:
+        _rendre(f, parametres, totaux)
+        taille = f.tell()
+    metriques.incrementer('devis_bytes_total', taille)
+    cache.put(cle, filename, taille)
+    current_app.extensions['retention'].suivre(filename, taille)
+    
+    # Retourner le chemin du fichier
+    return jsonify({
+        'success': True,
+        'file': filename,
+        'cached': False,
+        'totaux': totaux.to_dict()
+    })
+
+def _rendre(f, parametres, totaux=None):
+    """
+    Rend un devis dans f après avoir obtenu un créneau de rendu
+
+    Avec RENDER_EXECUTOR = 'process', le rendu est exécuté dans le pool de
+    processus des lots : il n'occupe plus le GIL du worker, qui continue de
+    servir les requêtes légères sans ralentir.
+    """
+    with current_app.extensions['render_limiter'].creneau():
+        if current_app.config['RENDER_EXECUTOR'] == 'process':
+            f.write(current_app.extensions['batch_renderer'].submit(parametres).result())
+            # Le rendu a eu lieu dans le pool de processus : seul ce compteur remonte
+            metriques.incrementer('devis_documents_total')
+        else:
+            from app.devis_generator import GenerateurDevis
+
+            generator = GenerateurDevis()
+            generator.generer_devis(f, totaux=totaux, **parametres)
+
+def _enregistrer_pdf(cle, pdf):
+    """Écrit un PDF rendu dans le stockage d'artefacts et l'enregistre dans le cache de rendu"""
+    cache = current_app.extensions['render_cache']
+    filename = cache.nom_fichier(cle) if cache.enabled else f"devis_{uuid.uuid4().hex}.pdf"
+    current_app.extensions['artifacts'].ecrire(filename, pdf)
+    # Le rendu a eu lieu dans le pool de processus : seuls ces compteurs remontent
+    metriques.incrementer('devis_documents_total')
+    metriques.incrementer('devis_bytes_total', len(pdf))
+    cache.put(cle, filename, len(pdf))
+    current_app.extensions['retention'].suivre(filename, len(pdf))
+    return filename
+
+def _preparer_lot(payloads):
+    """Normalise chaque devis d'un lot ; une erreur n'invalide que l'élément concerné"""
+    profils = current_app.extensions['profiles']
+    items = []
+    for payload in payloads:
+        if isinstance(payload, PayloadError):
+            # Ligne illisible d'un import
+            items.append((None, None, payload))
+            continue
+        try:
+            parametres = normaliser_parametres(payload, profils)
+            items.append((parametres, cle_payload(parametres), None))
+        except Exception as e:
+            items.append((None, None, e))
+    return items
+
+def _rendre_lot(items):
+    """
+    Rend les devis d'un lot via le pool de processus
+
+    Produit (index, pdf, filename, erreur) dans l'ordre du lot ; les devis déjà
+    présents dans le cache de rendu ne sont pas régénérés.
+    """
+    cache = current_app.extensions['render_cache']
+    renderer = current_app.extensions['batch_renderer']
+    
+    resultats = {}
+    a_rendre = []
+    for index, (parametres, cle, erreur) in enumerate(items):
+        if erreur is not None:
+            resultats[index] = (None, None, erreur)
         else:
-            conditions = {'isAutoEntrepreneur': is_auto_entrepreneur}
-            
-        signature = data.get('signature', None)
-        mention_accord = data.get('mentionAccord', "BON POUR ACCORD ET EXECUTION DES TRAVAUX")
-        date_signature = data.get('dateSignature', None)
+            filename = cache.get(cle)
+            if filename is not None:
+                resultats[index] = (None, filename, None)
+            else:
+                a_rendre.append(index)
+    
+    rendus = renderer.rendre([items[i][0] for i in a_rendre])
+    for index in range(len(items)):
+        if index not in resultats:
+            _, pdf, erreur = next(rendus)
+            resultats[index] = (pdf, None, erreur)
+        yield (index,) + resultats.pop(index)
+
+class _FluxZip(io.RawIOBase):
+    """Flux en écriture seule accumulant les octets d'une archive ZIP en cours de construction"""
+    
+    def __init__(self):
+        self._morceaux = []
+    
+    def writable(self):
+        return True
+    
+    def write(self, b):
+        self._morceaux.append(bytes(b))
+        return len(b)
+    
+    def vider(self):
+        data = b''.join(self._morceaux)
+        self._morceaux.clear()
+        return data
+
+@bp.route('/api/generate-devis/stream', methods=['POST'])
+def generate_devis_stream():
+    """
+    API endpoint pour générer un devis de très grande taille au fil de l'eau
+
+    Le corps est au format JSON-lines : la première ligne contient le devis
+    (sans les produits, ou avec une partie d'entre eux), chaque ligne suivante
+    un produit. Les produits sont lus et mis en page page par page, sans jamais
+    charger la liste complète en mémoire.
+    """
+    try:
+        lignes = (objet for _, objet in lire_enregistrements(request.stream, lever=True))
+        data = next(lignes, None)
+        if data is None:
+            return jsonify({
+                'success': False,
+                'error': "La première ligne doit contenir le devis"
+            }), 400
         
-        # Générer un nom de fichier unique
+        parametres = normaliser_parametres(data, current_app.extensions['profiles'])
+        produits = parametres['produits']
+        parametres['produits'] = itertools.chain(produits, produits_depuis_flux(lignes, debut=len(produits)))
+        
+        from app.devis_generator import GenerateurDevis
+
         filename = f"devis_{uuid.uuid4().hex}.pdf"
-        temp_folder = current_app.config['TEMP_FOLDER']
-        filepath = os.path.join(temp_folder, filename)
+        with current_app.extensions['render_limiter'].creneau(), current_app.extensions['artifacts'].ecriture(filename) as f:
+            generator = GenerateurDevis()
+            totaux = generator.generer_devis_flux(f, **parametres)
+            taille = f.tell()
+        metriques.incrementer('devis_bytes_total', taille)
+        current_app.extensions['retention'].suivre(filename, taille)
         
-        # Créer le dossier temp s'il n'existe pas
-        os.makedirs(temp_folder, exist_ok=True)
+        return jsonify({
+            'success': True,
+            'file': filename,
+            'totaux': totaux.to_dict()
+        })
+    
+    except PayloadError as e:
+        # Produit invalide ou ligne JSON mal formée
+        return _payload_invalide(e)
+    
+    except RenduSatureError as e:
+        return _service_sature(e, current_app.config['RENDER_RETRY_AFTER'])
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/generate-devis/batch', methods=['POST'])
+def generate_devis_batch():
+    """API endpoint pour générer un lot de devis en parallèle"""
+    try:
+        data = _corps_json()
+        payloads = data.get('devis', []) if isinstance(data, dict) else data
+        if not isinstance(payloads, list):
+            return jsonify({
+                'success': False,
+                'error': "Le lot doit être une liste de devis"
+            }), 400
         
-        # Générer le PDF
-        generator = GenerateurDevis()
-        generator.generer_devis(filepath, infos_societe, infos_client, produits, conditions, signature, mention_accord, date_signature)
+        max_items = current_app.config['BATCH_MAX_ITEMS']
+        if len(payloads) > max_items:
+            return jsonify({
+                'success': False,
+                'error': f"Le lot ne peut pas dépasser {max_items} devis"
+            }), 413
+        
+        items = _preparer_lot(payloads)
+        
+        # Archive ZIP envoyée au fil des rendus
+        if request.args.get('format') == 'zip':
+            return Response(
+                stream_with_context(_zip_lot(items)),
+                mimetype='application/zip',
+                headers={'Content-Disposition': 'attachment; filename="devis.zip"'}
+            )
+        
+        debut = time.perf_counter()
+        results = []
+        for index, pdf, filename, erreur in _rendre_lot(items):
+            if erreur is not None:
+                results.append({'index': index, 'success': False, 'error': str(erreur)})
+            elif filename is not None:
+                results.append({'index': index, 'success': True, 'file': filename, 'cached': True})
+            else:
+                filename = _enregistrer_pdf(items[index][1], pdf)
+                results.append({'index': index, 'success': True, 'file': filename, 'cached': False})
+        duree = time.perf_counter() - debut
         
-        # Retourner le chemin du fichier
         return jsonify({
             'success': True,
-            'file': filename
+            'results': results,
+            'count': len(results),
+            'duration': round(duree, 3),
+            'docs_per_second': round(len(results) / duree, 2) if duree > 0 else None
         })
     
+    except PayloadError as e:
+        return _payload_invalide(e)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _zip_lot(items):
+    """Génère l'archive ZIP d'un lot morceau par morceau, avec un rapport final"""
+    store = current_app.extensions['artifacts']
+    flux = _FluxZip()
+    debut = time.perf_counter()
+    rapport = []
+    
+    with zipfile.ZipFile(flux, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for index, pdf, filename, erreur in _rendre_lot(items):
+            if erreur is not None:
+                rapport.append({'index': index, 'success': False, 'error': str(erreur)})
+                continue
+            if pdf is None:
+                pdf = store.lire(filename)
+            archive.writestr(f"devis_{index + 1:04d}.pdf", pdf)
+            rapport.append({'index': index, 'success': True})
+            yield flux.vider()
+        
+        duree = time.perf_counter() - debut
+        archive.writestr('rapport.json', json_codec.dumps({
+            'results': rapport,
+            'count': len(rapport),
+            'duration': round(duree, 3),
+            'docs_per_second': round(len(rapport) / duree, 2) if duree > 0 else None
+        }))
+    yield flux.vider()
+
+@bp.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """API endpoint pour soumettre un rendu de devis asynchrone"""
+    try:
+        parametres = normaliser_parametres(_corps_json(), current_app.extensions['profiles'])
+        cle = cle_payload(parametres)
+        
+        # Devis déjà généré : le job est immédiatement terminé
+        jobs = current_app.extensions['job_queue']
+        filename = current_app.extensions['render_cache'].get(cle)
+        job = jobs.submit(parametres, cle) if filename is None else jobs.deja_termine(cle, filename)
+        
+        return jsonify(dict(
+            job.to_dict(),
+            success=True,
+            status_url=url_for('main.job_status', job_id=job.id)
+        )), 202
+    
+    except QueueFullError as e:
+        return _service_sature(e, current_app.config['JOB_RETRY_AFTER'])
+    
+    except PayloadError as e:
+        return _payload_invalide(e)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """API endpoint pour suivre l'état d'un rendu asynchrone"""
+    job = current_app.extensions['job_queue'].get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': "Job inconnu"
+        }), 404
+    
+    resultat = dict(job.to_dict(), success=True)
+    if job.file is not None:
+        resultat['download'] = url_for('main.download_file', filename=job.file)
+    return jsonify(resultat)
+
+@bp.route('/api/devis.pdf', methods=['POST'])
+def devis_pdf():
+    """API endpoint pour générer un devis et renvoyer directement le PDF dans la réponse"""
+    try:
+        parametres = normaliser_parametres(_corps_json(), current_app.extensions['profiles'])
+        cle = cle_payload(parametres)
+        
+        # Précondition If-None-Match d'une requête POST : 412, jamais 304 (RFC 9110).
+        # Le téléchargement conditionnel d'un PDF passe par GET /api/download
+        if request.if_none_match.contains_weak(cle):
+            response = jsonify({
+                'success': False,
+                'error': "Le client possède déjà cette version du devis"
+            })
+            response.set_etag(cle, weak=True)
+            return response, 412
+        
+        # Réutiliser le fichier en cache s'il existe, sinon générer en mémoire
+        cache = current_app.extensions['render_cache']
+        filename = cache.get(cle)
+        pdf = None
+        if filename is not None:
+            try:
+                pdf = current_app.extensions['artifacts'].lire(filename)
+            except FileNotFoundError:
+                # Supprimé par le nettoyage depuis cache.get() : traité comme un défaut de cache
+                cache.invalider(cle)
+        if pdf is None:
+            buffer = io.BytesIO()
+            _rendre(buffer, parametres)
+            pdf = buffer.getvalue()
+            metriques.incrementer('devis_bytes_total', len(pdf))
+        
+        response = Response(pdf, mimetype='application/pdf')
+        response.headers['Content-Disposition'] = 'inline; filename="devis.pdf"'
+        # Empreinte du payload, pas des octets du PDF : validateur faible
+        response.set_etag(cle, weak=True)
+        return response
+    
+    except PayloadError as e:
+        return _payload_invalide(e)
+    
+    except RenduSatureError as e:
+        return _service_sature(e, current_app.config['RENDER_RETRY_AFTER'])
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -55,34 +441,38 @@ def generate_devis():
 
 @bp.route('/api/download/<filename>', methods=['GET'])
 def download_file(filename):
-    """API endpoint pour télécharger un devis généré"""
+    """API endpoint pour télécharger un devis généré (ou un export)"""
     try:
-        temp_folder = current_app.config['TEMP_FOLDER']
-        filepath = os.path.join(temp_folder, filename)
-        return send_file(filepath, as_attachment=True, download_name="devis.pdf")
+        extension = os.path.splitext(filename)[1] or '.pdf'
+        return current_app.extensions['downloads'].reponse(filename, f"devis{extension}")
+    except ArtefactIntrouvable:
+        return jsonify({
+            'success': False,
+            'error': "Fichier introuvable"
+        }), 404
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 404
+        }), 500
 
 @bp.route('/api/export-devis', methods=['POST'])
 def export_devis():
     """API endpoint pour exporter les données du devis au format JSON"""
     try:
-        data = request.json
+        # Le corps est déjà du JSON : on vérifie qu'il est valide puis on l'écrit tel quel
+        contenu = request.get_data()
+        try:
+            json_codec.loads(contenu)
+        except ValueError:
+            return _payload_invalide(ValueError("Le corps de la requête n'est pas un JSON valide"))
         
         # Générer un nom de fichier unique
         filename = f"devis_export_{uuid.uuid4().hex}.json"
-        temp_folder = current_app.config['TEMP_FOLDER']
-        filepath = os.path.join(temp_folder, filename)
-        
-        # Créer le dossier temp s'il n'existe pas
-        os.makedirs(temp_folder, exist_ok=True)
         
         # Écrire les données dans un fichier JSON
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        taille = current_app.extensions['artifacts'].ecrire(filename, contenu)
+        current_app.extensions['retention'].suivre(filename, taille)
         
         # Retourner le chemin du fichier
         return jsonify({
@@ -96,3 +486,163 @@ def export_devis():
             'error': str(e)
         }), 500
 
+@bp.route('/api/export-devis/bulk', methods=['POST'])
+def export_devis_bulk():
+    """
+    API endpoint pour exporter de nombreux devis en un seul fichier NDJSON compressé
+
+    Le corps est au format JSON-lines (un devis par ligne), éventuellement
+    compressé en gzip ; la réponse, envoyée au fil de la lecture, est le
+    fichier `devis.ndjson.gz` correspondant, accepté tel quel par
+    /api/import-devis. Une ligne qui n'est pas un devis interrompt l'export :
+    la réponse 200 étant déjà commencée, le fichier se termine (proprement)
+    par un enregistrement d'erreur `{"line": n, "success": false, "error": ...}`,
+    de la forme des résultats de /api/import-devis, qui le signale à son tour.
+    """
+    def enregistrements():
+        for numero, enregistrement in lire_enregistrements(request.stream):
+            if isinstance(enregistrement, PayloadError):
+                yield enregistrement_erreur(numero, enregistrement)
+                return
+            yield enregistrement
+    
+    return Response(
+        stream_with_context(compresser_ndjson(enregistrements())),
+        mimetype='application/gzip',
+        headers={'Content-Disposition': 'attachment; filename="devis.ndjson.gz"'}
+    )
+
+@bp.route('/api/import-devis', methods=['POST'])
+def import_devis():
+    """
+    API endpoint pour importer de nombreux devis (NDJSON, compressé en gzip ou non)
+
+    Chaque devis est validé dès sa lecture ; la réponse, au format JSON-lines,
+    donne le résultat de chaque ligne au fil de l'eau, puis un bilan. Avec
+    `render=1`, les devis valides sont aussi rendus en PDF, par lots de
+    BATCH_MAX_ITEMS, sur le pool de processus des lots.
+    """
+    rendre = request.args.get('render') == '1'
+    taille_lot = current_app.config['BATCH_MAX_ITEMS']
+    
+    def resultats():
+        debut = time.perf_counter()
+        compte = valides = 0
+        lignes = lire_enregistrements(request.stream)
+        while True:
+            lot = list(itertools.islice(lignes, taille_lot))
+            if not lot:
+                break
+            items = _preparer_lot(enregistrement for _, enregistrement in lot)
+            if rendre:
+                rendus = _rendre_lot(items)
+            else:
+                rendus = ((index, None, None, erreur) for index, (_, _, erreur) in enumerate(items))
+            for index, pdf, filename, erreur in rendus:
+                if erreur is None:
+                    valides += 1
+                    if pdf is not None:
+                        filename = _enregistrer_pdf(items[index][1], pdf)
+                yield _resultat_import(lot[index][0], erreur, filename)
+            compte += len(lot)
+        duree = time.perf_counter() - debut
+        yield json_codec.dumps({
+            'success': True,
+            'count': compte,
+            'valid': valides,
+            'errors': compte - valides,
+            'duration': round(duree, 3),
+            'records_per_second': round(compte / duree, 2) if duree > 0 else None
+        }) + b'\n'
+    
+    return Response(stream_with_context(resultats()), mimetype='application/x-ndjson')
+
+def _resultat_import(numero, erreur, filename=None):
+    """Ligne de résultat de /api/import-devis pour un devis du flux"""
+    if erreur is not None:
+        resultat = {'line': numero, 'success': False, 'error': str(erreur)}
+    else:
+        resultat = {'line': numero, 'success': True}
+        if filename is not None:
+            resultat['file'] = filename
+    return json_codec.dumps(resultat) + b'\n'
+
+@bp.route('/api/profiles/<profile_id>', methods=['PUT'])
+def save_profile(profile_id):
+    """API endpoint pour enregistrer une nouvelle version d'un profil de société (logo compris)"""
+    try:
+        profil = current_app.extensions['profiles'].enregistrer(profile_id, _corps_json())
+        return jsonify({
+            'success': True,
+            'profile': profil.to_dict()
+        }), 201
+    
+    except PayloadError as e:
+        return _payload_invalide(e)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@bp.route('/api/profiles/<profile_id>', methods=['GET'])
+def get_profile(profile_id):
+    """API endpoint pour lire un profil de société (dernière version, ou ?version=N)"""
+    try:
+        version = request.args.get('version', type=int)
+        profil = current_app.extensions['profiles'].profil(profile_id, version)
+        return jsonify({
+            'success': True,
+            'profile': profil.to_dict()
+        })
+    
+    except ProfilIntrouvable as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 404
+    
+    except PayloadError as e:
+        return _payload_invalide(e)
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def _stats_rendu(module):
+    """Compteurs d'un module de la pile de rendu, sans l'importer (None tant qu'aucun rendu ne l'a chargé)"""
+    module = sys.modules.get(module)
+    return module.stats() if module is not None else None
+
+@bp.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """API endpoint exposant les compteurs des caches de rendu et d'images"""
+    return jsonify({
+        'success': True,
+        'render': current_app.extensions['render_cache'].stats(),
+        'images': cache_images.stats(),
+        'designations': _stats_rendu('app.designation'),
+        'row_heights': _stats_rendu('app.pagination'),
+        'pages': cache_pages.stats(),
+        'profiles': current_app.extensions['profiles'].stats(),
+        'retention': current_app.extensions['retention'].stats(),
+        'artifacts': current_app.extensions['artifacts'].stats(),
+        'downloads': current_app.extensions['downloads'].stats()
+    })
+
+@bp.route('/health', methods=['GET'])
+def health():
+    """État du worker : créneaux de rendu occupés et en attente, durées de démarrage"""
+    return jsonify({
+        'success': True,
+        'renders': current_app.extensions['render_limiter'].stats(),
+        'startup': demarrage.stats()
+    })
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    """Métriques du rendu au format texte de Prometheus"""
+    return Response(metriques.exposer(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,92 @@
+# app/sortie.py
+"""
+Profils de sortie des PDF
+
+Un devis peut être demandé avec `output_profile` :
+
+- `screen` : affichage et envoi par e-mail ; images ramenées à 96 dpi et
+  fortement recompressées ;
+- `print` : impression ; images à 300 dpi, peu recompressées ;
+- `archive` : conservation ; images à 200 dpi et polices TrueType intégrées
+  au document (sous-ensembles : seuls les glyphes utilisés), pour un rendu
+  identique sur tout poste, sans dépendre des polices standard du lecteur.
+
+Sans profil, le rendu est inchangé (images à IMAGE_DPI, polices standard non
+intégrées). Les flux de pages sont compressés dans tous les cas.
+"""
+import functools
+import threading
+from dataclasses import dataclass
+
+from app.models import PayloadError
+
+# Polices intégrées par le profil archive (normale, grasse, italique, grasse italique) :
+# par défaut la famille Vera livrée avec ReportLab, remplaçable par PDF_FONT_FILES
+POLICES_DEFAUT = ('Vera.ttf', 'VeraBd.ttf', 'VeraIt.ttf', 'VeraBI.ttf')
+
+# Noms sous lesquels ces polices sont enregistrées auprès de ReportLab
+FAMILLE_INTEGREE = 'DevisSans'
+_VARIANTES = ('', '-Bold', '-Oblique', '-BoldOblique')
+
+_fichiers_polices = POLICES_DEFAUT
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class ProfilSortie:
+    """Réglages de taille et de fidélité d'un PDF"""
+
+    nom: str
+    dpi: int | None = None           # résolution des images ; None = IMAGE_DPI
+    qualite_jpeg: int = 85           # qualité des images réencodées en JPEG
+    polices_integrees: bool = False  # polices TrueType intégrées au lieu des polices standard
+
+
+PROFILS_SORTIE = {
+    'screen': ProfilSortie('screen', dpi=96, qualite_jpeg=70),
+    'print': ProfilSortie('print', dpi=300, qualite_jpeg=92),
+    'archive': ProfilSortie('archive', dpi=200, qualite_jpeg=90, polices_integrees=True),
+}
+
+# Rendu sans profil demandé
+PROFIL_DEFAUT = ProfilSortie('default')
+
+
+def profil_sortie(nom):
+    """Profil de sortie demandé par un payload (None si aucun) ; lève PayloadError"""
+    if nom is None:
+        return None
+    profil = PROFILS_SORTIE.get(nom) if isinstance(nom, str) else None
+    if profil is None:
+        raise PayloadError(f"output_profile : une valeur parmi {', '.join(PROFILS_SORTIE)} attendue")
+    return profil
+
+
+def configurer(fichiers_polices=None):
+    """Applique la configuration de l'application (fichiers TTF du profil archive)"""
+    global _fichiers_polices
+    with _lock:
+        fichiers = tuple(fichiers_polices or POLICES_DEFAUT)
+        if len(fichiers) != len(_VARIANTES):
+            raise ValueError("PDF_FONT_FILES : quatre fichiers attendus (normale, grasse, italique, grasse italique)")
+        if fichiers != _fichiers_polices:
+            _fichiers_polices = fichiers
+            polices_integrees.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def polices_integrees():
+    """
+    Enregistre la famille TrueType intégrée, une seule fois par processus
+
+    Retourne les noms (normale, grasse, italique, grasse italique). ReportLab
+    n'intègre que les glyphes effectivement utilisés par chaque document.
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    noms = tuple(FAMILLE_INTEGREE + variante for variante in _VARIANTES)
+    for nom, fichier in zip(noms, _fichiers_polices):
+        pdfmetrics.registerFont(TTFont(nom, fichier))
+    pdfmetrics.registerFontFamily(FAMILLE_INTEGREE, normal=noms[0], bold=noms[1], italic=noms[2], boldItalic=noms[3])
+    return noms
@@ -0,0 +1,150 @@
+# app/styles.py
+"""
+Registre des styles partagés par tous les rendus
+
+Les styles ReportLab sont construits une seule fois à l'import du module, puis
+partagés en lecture seule entre les rendus (et donc entre les threads) : aucun
+rendu ne doit les modifier. Les styles d'une autre famille de polices (polices
+intégrées du profil archive, voir app.sortie) sont construits à la première
+demande par `feuille_de_styles`, puis conservés de la même façon.
+"""
+import functools
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import TableStyle
+
+
+# Polices standard remplacées par une autre famille (normale, grasse, italique, grasse italique)
+POLICES_STANDARD = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique')
+
+
+def _creer_feuille_de_styles(polices=POLICES_STANDARD):
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='Center', alignment=1))
+    styles.add(ParagraphStyle(name='Right', alignment=2))
+
+    # Style pour la désignation avec wrap et support de HTML
+    styles.add(ParagraphStyle(
+        'Designation',
+        parent=styles['Normal'],
+        wordWrap='CJK',  # Force le retour à la ligne
+        spaceAfter=3,    # Réduit de 6 à 3
+        spaceBefore=3,   # Réduit de 6 à 3
+        bulletIndent=10, # Indentation des puces
+        leftIndent=5     # Indentation gauche
+    ))
+
+    # Style avec wrap pour le pied de page
+    styles.add(ParagraphStyle(
+        'Footer',
+        parent=styles['Center'],
+        alignment=1,     # Center
+        wordWrap='CJK',  # Force le retour à la ligne
+        fontSize=8,      # Taille de police réduite pour le pied de page
+        leading=9,       # Espacement entre les lignes très réduit (normal est ~12)
+        spaceBefore=0,   # Pas d'espace avant
+        spaceAfter=0     # Pas d'espace après
+    ))
+
+    if polices != POLICES_STANDARD:
+        remplacements = dict(zip(POLICES_STANDARD, polices))
+        for style in styles.byName.values():
+            for attribut in ('fontName', 'bulletFontName'):
+                police = getattr(style, attribut, None)
+                if police in remplacements:
+                    setattr(style, attribut, remplacements[police])
+
+    return MappingProxyType(dict(styles.byName))
+
+
+# Styles de paragraphe, indexés par nom ('Normal', 'Center', 'Right', 'Designation', 'Footer'...)
+STYLES = _creer_feuille_de_styles()
+
+# Prototypes de styles de tableaux
+TABLE_STYLE_ENTETE = TableStyle([
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+])
+
+TABLE_STYLE_LOGO = TableStyle([
+    ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+    ('VALIGN', (0, 0), (0, 1), 'TOP'),
+])
+
+# Cadre d'impression du logo dans l'en-tête (largeur, hauteur)
+CADRE_LOGO = (4*cm, 3*cm)
+
+TABLE_STYLE_BLOC_DEVIS = TableStyle([
+    ('BOX', (0, 0), (-1, -1), 1, colors.lavender),
+    ('BACKGROUND', (0, 0), (-1, -1), colors.lavender),
+    ('SPAN', (0, 1), (1, 1)),
+])
+
+TABLE_STYLE_PRODUITS = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 1, colors.lavender),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lavender),
+    ('ALIGN', (0, 0), (0, -1), 'CENTER'),  # Alignement centre pour la quantité
+    ('ALIGN', (2, 0), (3, -1), 'RIGHT'),   # Alignement droite pour les prix
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),   # Alignement vertical en haut pour toutes les cellules
+    ('LEFTPADDING', (1, 0), (1, -1), 10),  # Plus de padding à gauche pour la désignation
+    ('RIGHTPADDING', (1, 0), (1, -1), 10), # Plus de padding à droite pour la désignation
+])
+
+TABLE_STYLE_TOTAUX = TableStyle([
+    ('GRID', (0, 0), (-1, -1), 1, colors.lavender),
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lavender),
+    ('ALIGN', (1, 0), (1, -1), 'RIGHT'),  # Alignement droite pour les montants
+    ('BACKGROUND', (0, -1), (-1, -1), colors.lavender),  # Fond coloré pour le total TTC
+])
+
+TABLE_STYLE_SIGNATURE = TableStyle([
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('LINEBELOW', (0, 0), (0, 0), 1, colors.black),
+    ('LINEBELOW', (1, 0), (1, 0), 1, colors.black),
+])
+
+TABLE_STYLE_SIGNATURE_IMAGE = TableStyle([
+    ('ALIGN', (1, 1), (1, 1), 'CENTER'),
+], parent=TABLE_STYLE_SIGNATURE)
+
+TABLE_STYLE_SIGNATURE_MENTION = TableStyle([
+    ('ALIGN', (1, 2), (1, 2), 'CENTER'),
+], parent=TABLE_STYLE_SIGNATURE_IMAGE)
+
+
+@dataclass(frozen=True)
+class FeuilleDeStyles:
+    """Styles de paragraphe et styles des tableaux à texte simple d'une famille de polices"""
+
+    styles: MappingProxyType
+    produits: TableStyle
+    totaux: TableStyle
+    signature: TableStyle
+    signature_image: TableStyle
+    signature_mention: TableStyle
+
+
+# Polices standard, non intégrées aux PDF
+FEUILLE_STANDARD = FeuilleDeStyles(
+    STYLES, TABLE_STYLE_PRODUITS, TABLE_STYLE_TOTAUX,
+    TABLE_STYLE_SIGNATURE, TABLE_STYLE_SIGNATURE_IMAGE, TABLE_STYLE_SIGNATURE_MENTION
+)
+
+
+@functools.lru_cache(maxsize=4)
+def feuille_de_styles(polices=POLICES_STANDARD):
+    """Feuille de styles d'une famille de polices (normale, grasse, italique, grasse italique)"""
+    if polices == POLICES_STANDARD:
+        return FEUILLE_STANDARD
+    # Les cellules en texte simple (quantités, montants, libellés) prennent la police normale
+    police = [('FONTNAME', (0, 0), (-1, -1), polices[0])]
+    return FeuilleDeStyles(
+        _creer_feuille_de_styles(polices),
+        *(TableStyle(police, parent=parent) for parent in (
+            TABLE_STYLE_PRODUITS, TABLE_STYLE_TOTAUX,
+            TABLE_STYLE_SIGNATURE, TABLE_STYLE_SIGNATURE_IMAGE, TABLE_STYLE_SIGNATURE_MENTION
+        ))
+    )
@@ -0,0 +1,174 @@
+# app/telechargement.py
+"""
+Téléchargement des artefacts générés
+
+Un artefact n'est jamais réécrit sous le même nom avec un autre contenu : il
+est servi avec un ETag dérivé de son contenu et un Cache-Control `immutable`,
+si bien qu'un navigateur ne le redemande pas et qu'une revalidation
+(If-None-Match) coûte une réponse 304 sans corps. Les requêtes Range (reprise
+d'un téléchargement, lecteurs PDF qui chargent par morceaux) reçoivent une
+réponse 206 partielle.
+
+Le corps est envoyé sans copie en mémoire : par `wsgi.file_wrapper` (sendfile
+du noyau sous gunicorn) ou, derrière un proxy, délégué à celui-ci par un
+en-tête X-Accel-Redirect (nginx) ou X-Sendfile (Apache, lighttpd).
+"""
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+
+from flask import Response, request
+from werkzeug.wsgi import wrap_file
+
+from app.artifacts import valider_nom
+
+OFFLOAD_MODES = ('x-accel-redirect', 'x-sendfile')
+
+# Taille des blocs lus pour calculer l'empreinte d'un artefact
+_TAILLE_BLOC = 256 * 1024
+
+
+class ArtefactIntrouvable(Exception):
+    """Levée quand le nom demandé ne correspond à aucun artefact"""
+
+
+class Telechargements:
+    """
+    Réponses HTTP de téléchargement des artefacts d'un stockage
+
+    L'empreinte (ETag) de chaque artefact est calculée une fois puis
+    conservée, indexée par son nom, sa taille et, pour un fichier sur disque,
+    son inode. La date de modification n'en fait pas partie : elle est
+    reportée à chaque réutilisation (voir RetentionManager.prolonger). Un
+    fichier régénéré sous le même nom, lui, est publié par renommage et change
+    donc d'inode.
+    """
+
+    def __init__(self, store, max_age=3600, offload=None, prefixe_accel='/_artifacts/', max_empreintes=4096):
+        if offload and offload not in OFFLOAD_MODES:
+            raise ValueError(f"Mode de délégation inconnu : {offload!r} (attendu : {', '.join(OFFLOAD_MODES)})")
+        self.store = store
+        self.max_age = max_age
+        self.offload = offload or None
+        self.prefixe_accel = prefixe_accel.rstrip('/') + '/'
+        self.max_empreintes = max_empreintes
+        self._empreintes = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _etat(self, nom):
+        """(chemin sur disque ou None, taille, inode ou None) ; lève ArtefactIntrouvable"""
+        try:
+            valider_nom(nom)
+        except ValueError:
+            raise ArtefactIntrouvable(nom) from None
+
+        chemin = self.store.chemin(nom)
+        if chemin is not None:
+            try:
+                st = os.stat(chemin)
+            except FileNotFoundError:
+                raise ArtefactIntrouvable(nom) from None
+            return chemin, st.st_size, st.st_ino
+
+        taille = self.store.taille(nom)
+        if taille is None:
+            raise ArtefactIntrouvable(nom)
+        return None, taille, None
+
+    def empreinte(self, nom, taille, inode=None):
+        """Empreinte SHA-256 du contenu d'un artefact (calculée une fois par version)"""
+        cle = (nom, taille, inode)
+        with self._lock:
+            empreinte = self._empreintes.get(cle)
+            if empreinte is not None:
+                self._empreintes.move_to_end(cle)
+                return empreinte
+
+        h = hashlib.sha256()
+        try:
+            with self.store.ouvrir(nom) as f:
+                while bloc := f.read(_TAILLE_BLOC):
+                    h.update(bloc)
+        except FileNotFoundError:
+            raise ArtefactIntrouvable(nom) from None
+        empreinte = h.hexdigest()
+
+        with self._lock:
+            self._empreintes[cle] = empreinte
+            while len(self._empreintes) > self.max_empreintes:
+                self._empreintes.popitem(last=False)
+        return empreinte
+
+    def reponse(self, nom, nom_telechargement):
+        """Réponse à une requête GET sur un artefact (200, 206, 304 ou 416)"""
+        chemin, taille, inode = self._etat(nom)
+        etag = self.empreinte(nom, taille, inode)
+        mimetype = mimetypes.guess_type(nom)[0] or 'application/octet-stream'
+
+        response = Response(mimetype=mimetype)
+        response.set_etag(etag)
+        # Contenu propre au client (privé), jamais modifié sous ce nom
+        response.headers['Cache-Control'] = f'private, max-age={self.max_age}, immutable'
+        response.headers['Accept-Ranges'] = 'bytes'
+
+        # If-None-Match : comparaison faible (RFC 9110, 13.1.2)
+        if request.if_none_match.contains_weak(etag):
+            response.status_code = 304
+            return response
+
+        response.headers['Content-Disposition'] = f'attachment; filename="{nom_telechargement}"'
+
+        # Fichier sur disque derrière un proxy : le proxy envoie lui-même le fichier (et gère Range)
+        if self.offload and chemin is not None:
+            if self.offload == 'x-sendfile':
+                response.headers['X-Sendfile'] = chemin
+            else:
+                relatif = os.path.relpath(chemin, self.store.racine).replace(os.sep, '/')
+                response.headers['X-Accel-Redirect'] = self.prefixe_accel + relatif
+            return response
+
+        plage = self._plage(etag, taille)
+        if plage is False:
+            response.status_code = 416
+            response.headers['Content-Range'] = f'bytes */{taille}'
+            return response
+
+        f = open(chemin, 'rb') if chemin is not None else self.store.ouvrir(nom)
+        if plage is None:
+            response.response = wrap_file(request.environ, f)
+            response.direct_passthrough = True
+            response.content_length = taille
+            return response
+
+        debut, fin = plage
+        with f:
+            f.seek(debut)
+            response.set_data(f.read(fin - debut))
+        response.status_code = 206
+        response.headers['Content-Range'] = f'bytes {debut}-{fin - 1}/{taille}'
+        return response
+
+    def _plage(self, etag, taille):
+        """(début, fin) de la plage demandée, None pour le fichier entier, False si insatisfaisable"""
+        plages = request.range
+        if plages is None or plages.units != 'bytes':
+            return None
+        # If-Range : la plage ne vaut que pour cette version de l'artefact
+        if_range = request.if_range
+        if (if_range.etag or if_range.date) and if_range.etag != etag:
+            return None
+        # Plusieurs plages : le fichier entier est envoyé (autorisé par la RFC 9110)
+        if len(plages.ranges) != 1:
+            return None
+        plage = plages.range_for_length(taille)
+        return plage if plage is not None else False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'offload': self.offload,
+                'etags': len(self._empreintes),
+                'max_etags': self.max_empreintes,
+            }
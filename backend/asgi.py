@@ -0,0 +1,14 @@
+"""
+Point d'entrée ASGI (voir app.asgi), par exemple :
+
+    uvicorn asgi:app --workers 4
+"""
+from app import create_app
+from app.asgi import ApplicationAsgi
+from app.demarrage import prechauffer
+
+application_flask = create_app()
+if application_flask.config['RENDER_WARMUP']:
+    prechauffer(application_flask)
+
+app = ApplicationAsgi.depuis_flask(application_flask)
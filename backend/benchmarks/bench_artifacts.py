@@ -0,0 +1,54 @@
+# benchmarks/bench_artifacts.py
+"""
+Débit des stockages d'artefacts : écriture, lecture, existence, parcours et suppression
+
+Compare le dossier à plat (ancienne disposition), le dossier réparti en
+sous-dossiers, la base SQLite (WAL) et la mémoire.
+
+Usage : python -m benchmarks.bench_artifacts [nombre] [taille_ko]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from app.artifacts import FilesystemStore, MemoryStore, SQLiteStore
+
+
+def _mesurer(fonction, noms):
+    debut = time.perf_counter()
+    for nom in noms:
+        fonction(nom)
+    return len(noms) / (time.perf_counter() - debut)
+
+
+def main(nombre=5000, taille_ko=40):
+    data = os.urandom(taille_ko * 1024)
+    noms = [f"devis_{i:032x}.pdf" for i in range(nombre)]
+
+    print(f"{nombre} artefacts de {taille_ko} Ko")
+    print(f"{'stockage':<18} {'écriture/s':>11} {'lecture/s':>10} {'existe/s':>10} {'parcours':>10} {'suppr./s':>10}")
+
+    with tempfile.TemporaryDirectory() as dossier:
+        for nom, store in (
+            ('dossier à plat', FilesystemStore(os.path.join(dossier, 'plat'), profondeur=0)),
+            ('sous-dossiers', FilesystemStore(os.path.join(dossier, 'reparti'), profondeur=2)),
+            ('sqlite (WAL)', SQLiteStore(os.path.join(dossier, 'artifacts.sqlite3'))),
+            ('mémoire', MemoryStore()),
+        ):
+            ecriture = _mesurer(lambda n: store.ecrire(n, data), noms)
+            lecture = _mesurer(store.lire, noms)
+            existe = _mesurer(store.existe, noms)
+
+            debut = time.perf_counter()
+            total = sum(1 for _ in store.lister())
+            parcours = time.perf_counter() - debut
+            assert total == nombre
+
+            suppression = _mesurer(store.supprimer, noms)
+            print(f"{nom:<18} {ecriture:>11.0f} {lecture:>10.0f} {existe:>10.0f} "
+                  f"{parcours * 1000:>8.1f}ms {suppression:>10.0f}")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,71 @@
+# benchmarks/bench_demarrage.py
+"""
+Démarrage d'un worker : import, préchauffage et première requête
+
+Chaque mesure est faite dans un processus neuf (python -c) : temps de
+création de l'application, modules lourds déjà importés, durée du
+préchauffage, puis latence de la première requête de rendu et de la première
+requête légère (/health), avec et sans préchauffage.
+
+Usage : python -m benchmarks.bench_demarrage
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+SCRIPT = """
+import json, sys, time
+debut = time.perf_counter()
+from app import create_app
+from config import Config
+
+class ConfigBenchmark(Config):
+    TEMP_FOLDER = {dossier!r}
+    PROFILES_DB = {dossier!r} + '/profiles.sqlite3'
+    JOBS_DB = {dossier!r} + '/jobs.sqlite3'
+    DEBUG = True
+
+app = create_app(ConfigBenchmark)
+creation = time.perf_counter() - debut
+modules = [m for m in ('reportlab', 'PIL', 'numpy') if m in sys.modules]
+prechauffage = 0.0
+if {prechauffer!r}:
+    from app.demarrage import prechauffer
+    debut = time.perf_counter()
+    prechauffer(app)
+    prechauffage = time.perf_counter() - debut
+client = app.test_client()
+debut = time.perf_counter()
+client.{methode}({chemin!r}, data={corps!r}, content_type='application/json')
+requete = time.perf_counter() - debut
+print(json.dumps([creation, modules, prechauffage, requete]))
+"""
+
+
+def _mesurer(dossier, prechauffer, methode, chemin, corps):
+    script = SCRIPT.format(dossier=dossier, prechauffer=prechauffer, methode=methode, chemin=chemin, corps=corps)
+    sortie = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    return json.loads(sortie.stdout.strip().splitlines()[-1])
+
+
+def main():
+    from benchmarks.payloads import payload
+
+    corps = json.dumps(payload(nombre_lignes=20))
+    with tempfile.TemporaryDirectory(prefix='bench_demarrage_') as dossier:
+        print(f"{'requête':<22} {'préchauffage':>12} {'create_app (ms)':>16} {'chargés':>16} "
+              f"{'préchauffage (ms)':>18} {'1re requête (ms)':>17}")
+        for nom, methode, chemin in (('/api/generate-devis', 'post', '/api/generate-devis'), ('/health', 'get', '/health')):
+            for prechauffer in (False, True):
+                creation, modules, prechauffage, requete = _mesurer(dossier, prechauffer, methode, chemin, corps)
+                print(f"{nom:<22} {'oui' if prechauffer else 'non':>12} {creation * 1000:>16.0f} "
+                      f"{','.join(modules) or '-':>16} {prechauffage * 1000:>18.0f} {requete * 1000:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,32 @@
+# benchmarks/bench_designations.py
+"""
+Coût de construction du tableau des produits pour un catalogue de désignations récurrentes
+
+Usage : python -m benchmarks.bench_designations
+"""
+import timeit
+
+from reportlab.lib.pagesizes import A4
+
+from app.devis_generator import GenerateurDevis
+from app.models import produits_depuis_liste
+from benchmarks.payloads import produits
+
+
+def main():
+    generator = GenerateurDevis()
+    # 50 désignations de catalogue, réutilisées sur 1000 lignes
+    catalogue = produits_depuis_liste(produits(50, longueur_designation=200))
+    lignes = [catalogue[i % len(catalogue)] for i in range(1000)]
+    totaux_lignes = [0] * len(lignes)
+
+    def construire():
+        generator._creer_tableau_produits(lignes, totaux_lignes, A4[0])
+
+    construire()
+    duree = min(timeit.repeat(construire, number=1, repeat=5))
+    print(f"tableau de {len(lignes)} lignes : {duree * 1000:.1f} ms ({duree * 1e6 / len(lignes):.1f} µs/ligne)")
+
+
+if __name__ == '__main__':
+    main()
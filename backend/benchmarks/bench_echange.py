@@ -0,0 +1,110 @@
+# benchmarks/bench_echange.py
+"""
+Export et import en masse de devis (NDJSON compressé en gzip)
+
+Via le client de test Flask, pour 100 000 devis :
+
+- export devis par devis (/api/export-devis, mesuré sur un échantillon puis
+  extrapolé) et export en masse (/api/export-devis/bulk) ;
+- import avec validation de chaque devis (/api/import-devis) ;
+- import suivi du rendu PDF (render=1), sur un échantillon.
+
+Affiche le débit, la taille des données, et le pic de mémoire de la chaîne
+lecture → compression, qui ne doit pas dépendre du nombre de devis.
+
+Usage : python -m benchmarks.bench_echange [nombre de devis]
+"""
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app import json_codec
+from app.echange import compresser_ndjson, lire_enregistrements
+from benchmarks.payloads import payload
+
+ECHANTILLON_UNITAIRE = 2000
+ECHANTILLON_RENDU = 200
+
+
+def _corps(nombre):
+    modeles = [payload(nombre_lignes=3 + i % 8, seed=i) for i in range(100)]
+    return b''.join(
+        json_codec.dumps(dict(modeles[i % 100], id=f"devis-{i}")) + b'\n' for i in range(nombre)
+    )
+
+
+def _pic_memoire(corps):
+    """Pic de mémoire (octets) de la chaîne lecture → compression, corps exclu"""
+    tracemalloc.start()
+    for _ in compresser_ndjson(enregistrement for _, enregistrement in lire_enregistrements(io.BytesIO(corps))):
+        pass
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pic
+
+
+def _ligne(nom, nombre, duree, octets=None):
+    taille = f"{octets / 1e6:>9.1f}" if octets is not None else f"{'':>9}"
+    print(f"{nom:<34} {nombre:>8} {duree:>9.2f} {nombre / duree:>10.0f} {taille}")
+
+
+def main():
+    from app import create_app
+    from config import Config
+
+    nombre = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    dossier = tempfile.mkdtemp(prefix='bench_echange_')
+
+    class ConfigBenchmark(Config):
+        TEMP_FOLDER = dossier
+        PROFILES_DB = f"{dossier}/profiles.sqlite3"
+        JOBS_DB = f"{dossier}/jobs.sqlite3"
+        ARTIFACT_BACKEND = 'memory'
+        DEBUG = True  # pas de thread de nettoyage
+
+    try:
+        client = create_app(ConfigBenchmark).test_client()
+        corps = _corps(nombre)
+        lignes = corps.splitlines()
+        print(f"{nombre} devis, {len(corps) / 1e6:.1f} Mo de NDJSON")
+        print(f"{'':<34} {'devis':>8} {'s':>9} {'devis/s':>10} {'Mo':>9}")
+
+        debut = time.perf_counter()
+        for ligne in lignes[:ECHANTILLON_UNITAIRE]:
+            client.post('/api/export-devis', data=ligne, content_type='application/json')
+        duree = (time.perf_counter() - debut) * nombre / ECHANTILLON_UNITAIRE
+        _ligne('export unitaire (extrapolé)', nombre, duree)
+
+        debut = time.perf_counter()
+        archive = client.post('/api/export-devis/bulk', data=corps, content_type='application/x-ndjson').data
+        duree = time.perf_counter() - debut
+        _ligne('export en masse (gzip)', nombre, duree, len(archive))
+
+        debut = time.perf_counter()
+        resultats = client.post('/api/import-devis', data=archive, content_type='application/gzip').data
+        duree = time.perf_counter() - debut
+        bilan = json.loads(resultats.splitlines()[-1])
+        if bilan['valid'] != nombre:
+            raise RuntimeError(bilan)
+        _ligne('import et validation', nombre, duree)
+
+        echantillon = b'\n'.join(lignes[:ECHANTILLON_RENDU])
+        debut = time.perf_counter()
+        client.post('/api/import-devis?render=1', data=echantillon, content_type='application/x-ndjson').data
+        duree = time.perf_counter() - debut
+        _ligne('import et rendu PDF (échantillon)', ECHANTILLON_RENDU, duree)
+
+        print()
+        for taille in (nombre // 10, nombre):
+            partie = b''.join(ligne + b'\n' for ligne in lignes[:taille])
+            print(f"pic mémoire lecture → gzip, {taille} devis : {_pic_memoire(partie) / 1e6:.2f} Mo")
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
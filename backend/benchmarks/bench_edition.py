@@ -0,0 +1,59 @@
+# benchmarks/bench_edition.py
+"""
+Latence de re-rendu d'un devis modifié (rendu incrémental)
+
+Rend un devis une première fois, modifie un seul prix au milieu, puis le
+rend de nouveau : une fois en remettant toutes les pages en page (cache de
+pages désactivé), une fois en reprenant les pages inchangées du cache. Le
+re-rendu incrémental doit dépendre de la taille de la modification, pas de
+celle du devis.
+
+Usage : python -m benchmarks.bench_edition
+"""
+import copy
+import io
+import time
+
+from app.cache_pages import cache_pages
+from app.devis_generator import GenerateurDevis
+from app.metrics import metriques
+from app.render_cache import normaliser_parametres
+from benchmarks.payloads import payload
+
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def _rendre(data):
+    parametres = normaliser_parametres(data)
+    debut = time.perf_counter()
+    GenerateurDevis().generer_devis(io.BytesIO(), **parametres)
+    return time.perf_counter() - debut
+
+
+def mesurer(nombre_lignes, pagination):
+    data = payload(nombre_lignes=nombre_lignes, items_per_page=25, pagination=pagination)
+    modifie = copy.deepcopy(data)
+    modifie['produits'][nombre_lignes // 2]['prix_unitaire'] += 1
+
+    # Rendu complet (désignations déjà compilées par un premier rendu)
+    cache_pages.configurer(max_bytes=0)
+    _rendre(data)
+    complet = _rendre(modifie)
+
+    cache_pages.configurer(max_bytes=MAX_BYTES)
+    _rendre(data)
+    reprises = metriques.valeur('devis_pages_reused_total')
+    incremental = _rendre(modifie)
+    return complet, incremental, metriques.valeur('devis_pages_reused_total') - reprises
+
+
+def main():
+    print(f"{'pagination':>10} {'lignes':>7} {'complet (ms)':>13} {'incrémental (ms)':>17} {'pages reprises':>15}")
+    for pagination in ('fixed', 'auto'):
+        for nombre_lignes in (100, 500, 2000):
+            complet, incremental, reprises = mesurer(nombre_lignes, pagination)
+            print(f"{pagination:>10} {nombre_lignes:>7} {complet * 1000:>13.1f} {incremental * 1000:>17.1f} {reprises:>15}")
+
+
+if __name__ == '__main__':
+    main()
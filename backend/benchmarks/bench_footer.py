@@ -0,0 +1,40 @@
+# benchmarks/bench_footer.py
+"""
+Coût du pied de page par page en fonction du nombre de pages
+
+Usage : python -m benchmarks.bench_footer
+"""
+import io
+import time
+
+from app.devis_generator import GenerateurDevis
+from app.render_cache import normaliser_parametres
+from benchmarks.payloads import payload
+
+
+def mesurer(nombre_pages):
+    generator = GenerateurDevis()
+    duree_pied = [0.0]
+    original = generator._ajouter_pied_de_page
+
+    def chronometre(canvas, doc):
+        debut = time.perf_counter()
+        original(canvas, doc)
+        duree_pied[0] += time.perf_counter() - debut
+
+    generator._ajouter_pied_de_page = chronometre
+    parametres = normaliser_parametres(payload(nombre_lignes=nombre_pages * 4, items_per_page=4))
+    debut = time.perf_counter()
+    generator.generer_devis(io.BytesIO(), **parametres)
+    return time.perf_counter() - debut, duree_pied[0]
+
+
+def main():
+    print(f"{'pages':>6} {'total (ms)':>11} {'pied (ms)':>10} {'pied ms/page':>13}")
+    for pages in (1, 10, 50, 200):
+        total, pied = mesurer(pages)
+        print(f"{pages:>6} {total * 1000:>11.1f} {pied * 1000:>10.2f} {pied * 1000 / pages:>13.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+# benchmarks/bench_header.py
+"""
+Coût par page du rendu en fonction du nombre de pages
+
+Usage : python -m benchmarks.bench_header
+"""
+import io
+import time
+
+from app.cache_pages import cache_pages
+from app.devis_generator import GenerateurDevis
+from app.render_cache import normaliser_parametres
+from benchmarks.payloads import image_data_uri, payload
+
+
+def mesurer(nombre_pages, logo, repetitions=3):
+    parametres = normaliser_parametres(payload(nombre_lignes=nombre_pages * 4, items_per_page=4, logo=logo))
+    meilleur = None
+    for _ in range(repetitions):
+        buffer = io.BytesIO()
+        debut = time.perf_counter()
+        GenerateurDevis().generer_devis(buffer, **parametres)
+        duree = time.perf_counter() - debut
+        meilleur = duree if meilleur is None else min(meilleur, duree)
+    return meilleur, len(buffer.getvalue())
+
+
+def main():
+    # Chaque répétition doit remettre toutes les pages en page
+    cache_pages.configurer(max_bytes=0)
+    logo = image_data_uri()
+    mesures = [(pages,) + mesurer(pages, logo) for pages in (1, 10, 25, 50)]
+    print(f"{'pages':>6} {'temps (ms)':>11} {'ms/page':>8} {'octets':>9} {'octets/page':>12}")
+    for pages, duree, taille in mesures:
+        print(f"{pages:>6} {duree * 1000:>11.1f} {duree * 1000 / pages:>8.2f} {taille:>9} {taille // pages:>12}")
+
+    # Coût marginal d'une page (pente entre la plus petite et la plus grande mesure)
+    (p0, d0, t0), (p1, d1, t1) = mesures[0], mesures[-1]
+    print(f"coût marginal : {(d1 - d0) * 1000 / (p1 - p0):.2f} ms/page, {(t1 - t0) // (p1 - p0)} octets/page")
+
+
+if __name__ == '__main__':
+    main()
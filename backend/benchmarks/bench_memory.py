@@ -0,0 +1,59 @@
+# benchmarks/bench_memory.py
+"""
+Pic de mémoire (RSS) du rendu en fonction du nombre de lignes
+
+Chaque mesure tourne dans un processus neuf ; les produits sont générés à la
+volée pour que le payload lui-même ne pèse pas dans la mesure du mode flux.
+
+Usage : python -m benchmarks.bench_memory [lignes ...]
+"""
+import io
+import json
+import resource
+import subprocess
+import sys
+import time
+
+
+def _mesurer(mode, nombre_lignes, items_per_page):
+    from app.cache_pages import cache_pages
+    from app.devis_generator import GenerateurDevis
+    from app.models import Produit
+    from app.render_cache import normaliser_parametres
+    from benchmarks.payloads import payload, produits
+
+    parametres = normaliser_parametres(payload(nombre_lignes=0, items_per_page=items_per_page))
+    # Mémoire de la mise en page seule, sans les pages conservées pour un rendu incrémental
+    cache_pages.configurer(max_bytes=0)
+    base = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    debut = time.perf_counter()
+    sortie = io.BytesIO()
+    if mode == 'flux':
+        parametres['produits'] = (Produit.depuis_dict(p) for i in range(nombre_lignes) for p in produits(1, seed=i))
+        GenerateurDevis().generer_devis_flux(sortie, **parametres)
+    else:
+        parametres['produits'] = [Produit.depuis_dict(p) for p in produits(nombre_lignes)]
+        GenerateurDevis().generer_devis(sortie, **parametres)
+    return {
+        'mode': mode,
+        'lignes': nombre_lignes,
+        'secondes': round(time.perf_counter() - debut, 2),
+        'rss_mo': round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - base) / 1024, 1),
+        'octets_pdf': len(sortie.getvalue()),
+    }
+
+
+def main():
+    tailles = [int(a) for a in sys.argv[1:]] or [100, 1000, 10000, 50000]
+    print(f"{'mode':>8} {'lignes':>7} {'s':>7} {'Δ RSS (Mo)':>11} {'PDF (Ko)':>9}")
+    for mode in ('liste', 'flux'):
+        for lignes in tailles:
+            resultat = json.loads(subprocess.check_output([
+                sys.executable, '-c',
+                f"import json; from benchmarks.bench_memory import _mesurer; print(json.dumps(_mesurer({mode!r}, {lignes}, 25)))"
+            ]))
+            print(f"{mode:>8} {lignes:>7} {resultat['secondes']:>7} {resultat['rss_mo']:>11} {resultat['octets_pdf'] // 1024:>9}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_numerotation.py
+"""
+Coût de la numérotation « Page n / N » différée
+
+Compare le rendu en une passe (total résolu à l'écriture du PDF) au coût
+d'un rendu en deux passes (multiBuild), sur des tableaux qui débordent de
+leur page : l'ancienne estimation ceil(lignes / itemsPerPage) y était fausse.
+
+Usage : python -m benchmarks.bench_numerotation
+"""
+import io
+import math
+import re
+import time
+
+from app.devis_generator import GenerateurDevis
+from app.metrics import chronometrer
+from app.render_cache import normaliser_parametres
+from benchmarks.payloads import payload
+
+ITEMS_PER_PAGE = 25
+
+
+def mesurer(nombre_lignes):
+    parametres = normaliser_parametres(
+        payload(nombre_lignes=nombre_lignes, items_per_page=ITEMS_PER_PAGE, longueur_designation=200)
+    )
+    sortie = io.BytesIO()
+    with chronometrer() as durees:
+        debut = time.perf_counter()
+        GenerateurDevis().generer_devis(sortie, **parametres)
+        total = time.perf_counter() - debut
+    pdf = sortie.getvalue()
+    pages = len(re.findall(rb'/Type /Page\b(?!s)', pdf))
+    resolu = max(int(n) for n in re.findall(rb'numero_page_(\d+)', pdf))
+    return total, durees.get('build', 0.0), durees.get('numerotation', 0.0), pages, resolu
+
+
+def main():
+    print(f"{'lignes':>6} {'estimé':>7} {'pages':>6} {'N':>4} {'1 passe (ms)':>13} "
+          f"{'build (ms)':>11} {'N différé (ms)':>15} {'2 passes (ms)':>14}")
+    for nombre_lignes in (10, 100, 500, 2000):
+        total, build, numerotation, pages, resolu = mesurer(nombre_lignes)
+        estime = math.ceil(nombre_lignes / ITEMS_PER_PAGE)
+        # multiBuild refait toute la mise en page au moins une seconde fois
+        print(f"{nombre_lignes:>6} {estime:>7} {pages:>6} {resolu:>4} {total * 1000:>13.1f} "
+              f"{build * 1000:>11.1f} {numerotation * 1000:>15.2f} {(total + build) * 1000:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
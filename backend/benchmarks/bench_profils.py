@@ -0,0 +1,67 @@
+# benchmarks/bench_profils.py
+"""
+Devis d'un émetteur régulier : infos_societe complet ou profil enregistré
+
+Compare, via le client de test Flask sur /api/devis.pdf, un payload qui
+renvoie à chaque fois tout infos_societe (logo en base64 compris) et un
+payload qui fait référence au même profil de société enregistré une fois.
+Mesure la taille du corps de la requête et la latence (médiane).
+
+Usage : python -m benchmarks.bench_profils
+"""
+import json
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.payloads import image_data_uri, payload
+
+REPETITIONS = 20
+
+
+def _latence(client, corps):
+    durees = []
+    for _ in range(REPETITIONS):
+        debut = time.perf_counter()
+        reponse = client.post('/api/devis.pdf', data=corps, content_type='application/json')
+        durees.append(time.perf_counter() - debut)
+        if reponse.status_code != 200:
+            raise RuntimeError(reponse.get_json())
+    return statistics.median(durees)
+
+
+def main():
+    from app import create_app
+    from config import Config
+
+    dossier = tempfile.mkdtemp(prefix='bench_profils_')
+
+    class ConfigBenchmark(Config):
+        TEMP_FOLDER = dossier
+        PROFILES_DB = f"{dossier}/profiles.sqlite3"
+        JOBS_DB = f"{dossier}/jobs.sqlite3"
+        RENDER_CACHE_MAX_ENTRIES = 0  # chaque requête doit vraiment rendre le devis
+        DEBUG = True  # pas de thread de nettoyage
+
+    try:
+        client = create_app(ConfigBenchmark).test_client()
+        print(f"{'logo':>10} {'payload':>8} {'octets':>9} {'p50 (ms)':>9}")
+        for largeur, hauteur in ((0, 0), (600, 450), (1200, 900), (2400, 1800)):
+            logo = image_data_uri(largeur, hauteur, seed=1) if largeur else None
+            data = payload(nombre_lignes=10, logo=logo)
+            client.put('/api/profiles/bench', json=data['infos_societe'])
+            reference = dict(
+                data, profile_id='bench',
+                infos_societe={'numero_devis': data['infos_societe']['numero_devis']}
+            )
+            for nom, corps in (('complet', data), ('profil', reference)):
+                corps = json.dumps(corps)
+                print(f"{f'{largeur}x{hauteur}' if logo else '-':>10} {nom:>8} {len(corps):>9} "
+                      f"{_latence(client, corps) * 1000:>9.1f}")
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+# benchmarks/bench_setup.py
+"""
+Coût fixe par requête : construction du générateur et rendu d'un devis d'une ligne
+
+Usage : python -m benchmarks.bench_setup
+"""
+import io
+import timeit
+
+from app.devis_generator import GenerateurDevis
+from app.render_cache import normaliser_parametres
+from benchmarks.payloads import payload
+
+
+def main():
+    parametres = normaliser_parametres(payload(nombre_lignes=1))
+
+    def rendre():
+        GenerateurDevis().generer_devis(io.BytesIO(), **parametres)
+
+    for nom, fonction, nombre in (
+        ('GenerateurDevis()', GenerateurDevis, 2000),
+        ('rendu 1 ligne', rendre, 200),
+    ):
+        duree = min(timeit.repeat(fonction, number=nombre, repeat=5)) / nombre
+        print(f"{nom:<20} {duree * 1e6:>10.1f} µs")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_sortie.py
+"""
+Taille et temps de rendu des PDF selon le profil de sortie
+
+Rend le même devis (logo et signature de la taille d'une photo de
+téléphone, ou sans image) sans profil puis avec chaque profil de sortie, et
+affiche la taille du PDF et le temps de rendu (médiane). Les caches d'images
+et de pages sont vidés avant chaque rendu : le temps inclut le décodage et
+la recompression des images.
+
+Usage : python -m benchmarks.bench_sortie
+"""
+import io
+import statistics
+import time
+
+from app.cache_pages import cache_pages
+from app.devis_generator import GenerateurDevis
+from app.image_cache import cache_images
+from app.render_cache import normaliser_parametres
+from app.sortie import PROFILS_SORTIE
+from benchmarks.payloads import image_data_uri, payload
+
+REPETITIONS = 5
+
+
+def mesurer(data):
+    parametres = normaliser_parametres(data)
+    generateur = GenerateurDevis()
+    durees = []
+    for _ in range(REPETITIONS):
+        cache_images.configurer()
+        buffer = io.BytesIO()
+        debut = time.perf_counter()
+        generateur.generer_devis(buffer, **parametres)
+        durees.append(time.perf_counter() - debut)
+    return len(buffer.getvalue()), statistics.median(durees)
+
+
+def main():
+    cache_pages.configurer(max_bytes=0)
+    images = {
+        'sans image': {},
+        'photos 2400x1600': {
+            'logo': image_data_uri(2400, 1600, seed=1),
+            'signature': image_data_uri(1200, 600, seed=2),
+        },
+    }
+    print(f"{'images':<18} {'profil':<9} {'octets':>9} {'rendu (ms)':>11}")
+    for nom_images, uris in images.items():
+        for profil in (None, *PROFILS_SORTIE):
+            data = payload(nombre_lignes=40, **uris)
+            if profil:
+                data['output_profile'] = profil
+            taille, duree = mesurer(data)
+            print(f"{nom_images:<18} {profil or '-':<9} {taille:>9} {duree * 1000:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# benchmarks/bench_telechargement.py
+"""
+Coût d'un téléchargement d'artefact selon la requête du client
+
+Premier téléchargement (empreinte calculée), téléchargements suivants,
+revalidation (If-None-Match -> 304) et lecture partielle (Range -> 206).
+
+Usage : python -m benchmarks.bench_telechargement [lignes]
+"""
+import sys
+import tempfile
+import timeit
+
+from app import create_app
+from config import Config
+from benchmarks.payloads import payload
+
+
+def main(nombre_lignes=2000):
+    class ConfigBench(Config):
+        TEMP_FOLDER = tempfile.mkdtemp()
+        DEBUG = True  # pas de thread de rétention
+
+    client = create_app(ConfigBench).test_client()
+    fichier = client.post('/api/generate-devis', json=payload(nombre_lignes=nombre_lignes)).json['file']
+    url = f'/api/download/{fichier}'
+
+    premier = timeit.timeit(lambda: client.get(url).data, number=1)
+    etag = client.get(url).headers['ETag']
+    mesures = [
+        ('premier (empreinte)', premier),
+        ('200 complet', min(timeit.repeat(lambda: client.get(url).data, number=20, repeat=3)) / 20),
+        ('304 If-None-Match', min(timeit.repeat(
+            lambda: client.get(url, headers={'If-None-Match': etag}), number=20, repeat=3)) / 20),
+        ('206 Range 64 Ko', min(timeit.repeat(
+            lambda: client.get(url, headers={'Range': 'bytes=0-65535'}).data, number=20, repeat=3)) / 20),
+    ]
+
+    taille = len(client.get(url).data)
+    print(f"{fichier} : {taille / 1024:.0f} Ko")
+    for nom, duree in mesures:
+        print(f"{nom:<22} {duree * 1000:>8.2f} ms")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,51 @@
+# benchmarks/bench_totaux.py
+"""
+Coût du calcul des totaux pour un devis de très grande taille
+
+Compare l'ancien calcul (somme de flottants des totaux envoyés par le client)
+au moteur en centimes, vectorisé (NumPy) ou en Python pur, et mesure l'écart
+d'arrondi accumulé par les flottants.
+
+Usage : python -m benchmarks.bench_totaux [lignes]
+"""
+import sys
+import timeit
+
+from app import montants
+from app.models import Conditions, produits_depuis_liste
+from benchmarks.payloads import produits
+
+
+def main(nombre_lignes=100000):
+    lignes = produits(nombre_lignes, longueur_designation=20)
+    for i, ligne in enumerate(lignes):
+        # Quelques taux réduits pour exercer le calcul multi-taux
+        if i % 7 == 0:
+            ligne['tva_taux'] = 5.5 if i % 2 else 10
+    modeles = produits_depuis_liste(lignes)
+    conditions = Conditions.depuis_dict({'tva_taux': 20})
+
+    def flottants():
+        total_ht = sum(float(p.get('total_ht', 0)) for p in lignes)
+        return total_ht + total_ht * 20.0 / 100
+
+    mesures = [
+        ('flottants (ancien)', flottants),
+        ('validation', lambda: produits_depuis_liste(lignes)),
+        ('centimes, Python', lambda: montants.calculer_totaux(modeles, conditions, vectoriser=False)),
+    ]
+    if montants.NUMPY_DISPONIBLE:
+        mesures.append(('centimes, NumPy', lambda: montants.calculer_totaux(modeles, conditions, vectoriser=True)))
+
+    print(f"{nombre_lignes} lignes")
+    for nom, fonction in mesures:
+        duree = min(timeit.repeat(fonction, number=1, repeat=3))
+        print(f"{nom:<20} {duree * 1000:>9.1f} ms")
+
+    totaux = montants.calculer_totaux(modeles, conditions)
+    ecart = sum(float(p['total_ht']) for p in lignes) - totaux.total_ht / 100
+    print(f"total HT exact : {montants.formater(totaux.total_ht)} € ; écart de la somme flottante : {ecart:+.6f} €")
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,161 @@
+# benchmarks/load_test.py
+"""
+Test de charge : latence des téléchargements pendant des rendus saturés
+
+Démarre le serveur dans un processus séparé (uvicorn sur asgi:app, ou le
+serveur de développement Flask multi-thread sur wsgi:app), mesure la latence
+des téléchargements au repos, puis pendant que des clients envoient en
+continu plus de rendus que RENDER_CONCURRENCY n'en admet. Les rendus en
+excès doivent être refusés (503 + Retry-After) et le p99 des téléchargements
+rester stable.
+
+Usage :
+    python -m benchmarks.load_test [--server asgi|wsgi] [--render-clients 8]
+        [--download-clients 4] [--duration 10] [--concurrency 2] [--queue-timeout 1]
+        [--executor thread|process]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from benchmarks.payloads import payload
+
+
+def _port_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _demarrer_serveur(serveur, port, options, dossier):
+    env = dict(
+        os.environ,
+        TEMP_FOLDER=dossier,
+        RENDER_CONCURRENCY=str(options.concurrency),
+        RENDER_QUEUE_TIMEOUT=str(options.queue_timeout),
+        RENDER_EXECUTOR=options.executor,
+        RENDER_CACHE_MAX_ENTRIES='0',
+    )
+    if serveur == 'asgi':
+        commande = [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port), '--log-level', 'warning']
+    else:
+        commande = [sys.executable, '-c', f"from wsgi import app; app.run(port={port}, threaded=True)"]
+    processus = subprocess.Popen(commande, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            urllib.request.urlopen(f"{url}/health", timeout=1).read()
+            return processus, url
+        except OSError:
+            time.sleep(0.1)
+    processus.kill()
+    raise RuntimeError(f"Le serveur {serveur} n'a pas démarré")
+
+
+def _requete(url, data=None):
+    """Envoie une requête ; retourne (statut, durée en secondes)"""
+    corps = None if data is None else json.dumps(data).encode('utf-8')
+    requete = urllib.request.Request(url, data=corps, headers={'Content-Type': 'application/json'})
+    debut = time.perf_counter()
+    try:
+        with urllib.request.urlopen(requete, timeout=60) as reponse:
+            reponse.read()
+            statut = reponse.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        statut = e.code
+    return statut, time.perf_counter() - debut
+
+
+def _telecharger(url, fin, latences):
+    while time.perf_counter() < fin:
+        statut, duree = _requete(url)
+        if statut == 200:
+            latences.append(duree)
+
+
+def _rendre(url, fin, numero, resultats):
+    i = 0
+    while time.perf_counter() < fin:
+        data = payload(nombre_lignes=200, seed=numero * 100000 + i)
+        statut, duree = _requete(url, data)
+        resultats.append((statut, duree))
+        i += 1
+        if statut == 503:
+            time.sleep(0.05)
+
+
+def _centile(valeurs, q):
+    if not valeurs:
+        return float('nan')
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(q * len(valeurs)))]
+
+
+def _phase(url, fichier, options, rendus):
+    fin = time.perf_counter() + options.duration
+    latences, resultats = [], []
+    threads = [
+        threading.Thread(target=_telecharger, args=(f"{url}/api/download/{fichier}", fin, latences))
+        for _ in range(options.download_clients)
+    ]
+    if rendus:
+        threads += [
+            threading.Thread(target=_rendre, args=(f"{url}/api/generate-devis", fin, n, resultats))
+            for n in range(options.render_clients)
+        ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latences, resultats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--server', choices=('asgi', 'wsgi'), default='asgi')
+    parser.add_argument('--render-clients', type=int, default=8)
+    parser.add_argument('--download-clients', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--concurrency', type=int, default=2, help="RENDER_CONCURRENCY du serveur")
+    parser.add_argument('--queue-timeout', type=float, default=1.0, help="RENDER_QUEUE_TIMEOUT du serveur")
+    parser.add_argument('--executor', choices=('thread', 'process'), default='thread', help="RENDER_EXECUTOR du serveur")
+    options = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as dossier:
+        processus, url = _demarrer_serveur(options.server, _port_libre(), options, dossier)
+        try:
+            # Devis téléchargé en boucle pendant le test
+            requete = urllib.request.Request(
+                f"{url}/api/generate-devis", data=json.dumps(payload(nombre_lignes=10)).encode('utf-8'),
+                headers={'Content-Type': 'application/json'}
+            )
+            fichier = json.loads(urllib.request.urlopen(requete).read())['file']
+
+            print(f"serveur {options.server}, RENDER_CONCURRENCY={options.concurrency} ({options.executor}), "
+                  f"{options.render_clients} clients de rendu, {options.download_clients} de téléchargement")
+            print(f"{'phase':<16} {'téléch.':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'rendus 200':>11} {'503':>5} {'rendu p50 (ms)':>15}")
+            for nom, rendus in (('repos', False), ('rendus saturés', True)):
+                latences, resultats = _phase(url, fichier, options, rendus)
+                reussis = [duree for statut, duree in resultats if statut == 200]
+                refuses = sum(1 for statut, _ in resultats if statut == 503)
+                rendu_p50 = f"{statistics.median(reussis) * 1000:.0f}" if reussis else '-'
+                print(f"{nom:<16} {len(latences):>8} {_centile(latences, 0.5) * 1000:>9.1f} "
+                      f"{_centile(latences, 0.99) * 1000:>9.1f} {len(reussis):>11} {refuses:>5} {rendu_p50:>15}")
+        finally:
+            processus.terminate()
+            processus.wait()
+
+
+if __name__ == '__main__':
+    main()
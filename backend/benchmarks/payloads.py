@@ -0,0 +1,65 @@
+# benchmarks/payloads.py
+import base64
+import io
+import random
+
+from PIL import Image
+
+
+def image_data_uri(largeur=1200, hauteur=900, seed=0):
+    """Image PNG synthétique (bruitée, donc peu compressible) encodée en data URI"""
+    rnd = random.Random(seed)
+    image = Image.new('RGB', (largeur, hauteur))
+    image.putdata([(rnd.randrange(256), rnd.randrange(256), rnd.randrange(256)) for _ in range(largeur * hauteur)])
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG')
+    return 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def produits(nombre, longueur_designation=60, densite_puces=0.3, seed=0):
+    """Lignes de produits synthétiques avec désignations multi-lignes et puces"""
+    rnd = random.Random(seed)
+    mots = ['pose', 'fourniture', 'peinture', 'enduit', 'placo', 'carrelage', 'plinthe', 'porte', 'fenêtre', 'isolation']
+    lignes = []
+    for i in range(nombre):
+        texte = []
+        while sum(len(t) for t in texte) < longueur_designation:
+            ligne = ' '.join(rnd.choice(mots) for _ in range(6))
+            texte.append(f"- {ligne}" if not texte and rnd.random() < densite_puces else ligne)
+        quantite = rnd.randint(1, 20)
+        prix = round(rnd.uniform(5, 500), 2)
+        lignes.append({
+            'quantite': quantite,
+            'designation': '\n'.join(texte),
+            'prix_unitaire': prix,
+            'total_ht': round(quantite * prix, 2),
+        })
+    return lignes
+
+
+def payload(nombre_lignes=10, items_per_page=4, logo=None, signature=None, auto_entrepreneur=False,
+            longueur_designation=60, densite_puces=0.3, seed=0, pagination='fixed'):
+    """Payload complet de /api/generate-devis"""
+    return {
+        'infos_societe': {
+            'nom': 'ACME Rénovation', 'activite': 'Travaux', 'adresse': '1 rue de la Paix',
+            'code_postal': '75002', 'ville': 'Paris', 'telephone': '01 23 45 67 89',
+            'email': 'contact@acme.fr', 'site': 'acme.fr', 'numero_devis': f'D-{seed:05d}',
+            'date': '01/01/2025', 'forme_juridique': 'SARL', 'capital': '10 000 €',
+            'siret': '123 456 789 00012', 'rcs': 'Paris', 'code_ape': '4334Z',
+            'tva_intracom': 'FR00123456789', 'info_bancaire': 'Banque Exemple', 'rib': 'FR76 0000 0000 0000',
+            'logo': logo or '',
+        },
+        'infos_client': {
+            'nom': 'Client', 'adresse': '2 avenue Foch', 'code_postal': '69001', 'ville': 'Lyon',
+            'description_projet': 'Rénovation complète',
+        },
+        'produits': produits(nombre_lignes, longueur_designation, densite_puces, seed),
+        'conditions': {
+            'tva_taux': 20, 'validite': '3 mois',
+            'paginationSettings': {'mode': pagination, 'itemsPerPage': items_per_page},
+        },
+        'isAutoEntrepreneur': auto_entrepreneur,
+        'signature': signature,
+        'dateSignature': '02/01/2025',
+    }
@@ -0,0 +1,225 @@
+# benchmarks/suite.py
+"""
+Suite de benchmarks reproductible du générateur de devis
+
+Chaque scénario (nombre de lignes, longueur des désignations, densité de
+puces, logo et signature, itemsPerPage ou pagination automatique, auto-entrepreneur ou TVA) est rendu
+dans un processus neuf, directement par `generer_devis` et via le client de
+test Flask sur /api/generate-devis. On mesure le temps (médiane des
+répétitions), le pic de mémoire (RSS), la taille du PDF et les pages/s.
+
+Les résultats sont écrits en JSON ; une référence enregistrée peut être
+comparée avec un seuil de régression (code de sortie 1 si dépassé).
+
+Usage :
+    python -m benchmarks.suite --output resultats.json
+    python -m benchmarks.suite --quick --baseline reference.json --threshold 0.15
+"""
+import argparse
+import datetime
+import json
+import platform
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Paramètres de payloads.payload() propres à chaque scénario
+SCENARIOS = {
+    'lignes_1': {'nombre_lignes': 1},
+    'lignes_100': {'nombre_lignes': 100},
+    'lignes_1000': {'nombre_lignes': 1000, 'items_per_page': 25},
+    'lignes_10000': {'nombre_lignes': 10000, 'items_per_page': 25},
+    'pagination_auto_1000': {'nombre_lignes': 1000, 'pagination': 'auto'},
+    'designations_longues': {'nombre_lignes': 100, 'longueur_designation': 400, 'densite_puces': 0.8},
+    'logo_signature': {'nombre_lignes': 20, 'logo': (1200, 900), 'signature': (600, 300)},
+    'une_ligne_par_page': {'nombre_lignes': 50, 'items_per_page': 1},
+    'auto_entrepreneur': {'nombre_lignes': 100, 'auto_entrepreneur': True},
+}
+
+# Sous-ensemble rapide (quelques secondes par scénario)
+SCENARIOS_RAPIDES = ('lignes_1', 'lignes_100', 'designations_longues', 'logo_signature', 'une_ligne_par_page', 'auto_entrepreneur')
+
+MODES = ('direct', 'flask')
+
+# Mesures comparées à la référence (plus grand = moins bon)
+MESURES_COMPAREES = ('secondes', 'rss_pic_mo', 'octets_pdf')
+
+
+def _payload(scenario):
+    from benchmarks.payloads import image_data_uri, payload
+
+    options = dict(SCENARIOS[scenario])
+    for cle, seed in (('logo', 1), ('signature', 2)):
+        if options.get(cle):
+            options[cle] = image_data_uri(*options[cle], seed=seed)
+    return payload(**options)
+
+
+def _mesurer(scenario, mode, repetitions):
+    """Rend un scénario plusieurs fois dans le processus courant et retourne ses mesures"""
+    import io
+
+    from app.metrics import metriques
+    from app.render_cache import normaliser_parametres
+
+    data = _payload(scenario)
+    durees = []
+
+    if mode == 'direct':
+        from app.cache_pages import cache_pages
+        from app.devis_generator import GenerateurDevis
+
+        cache_pages.configurer(max_bytes=0)  # chaque répétition doit remettre toutes les pages en page
+
+        def rendre():
+            sortie = io.BytesIO()
+            GenerateurDevis().generer_devis(sortie, **normaliser_parametres(data))
+            return len(sortie.getvalue())
+    else:
+        from app import create_app
+        from config import Config
+
+        dossier = tempfile.mkdtemp(prefix='bench_devis_')
+
+        class ConfigBenchmark(Config):
+            TEMP_FOLDER = dossier
+            RENDER_CACHE_MAX_ENTRIES = 0  # chaque répétition doit vraiment rendre le devis
+            PAGE_CACHE_MAX_BYTES = 0
+            DEBUG = True  # pas de thread de nettoyage
+
+        app = create_app(ConfigBenchmark)
+        client = app.test_client()
+        store = app.extensions['artifacts']
+
+        def rendre():
+            reponse = client.post('/api/generate-devis', json=data)
+            if reponse.status_code != 200:
+                raise RuntimeError(reponse.get_json())
+            return store.taille(reponse.get_json()['file'])
+
+    rss_avant = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pages_avant = metriques.valeur('devis_pages_total')
+    try:
+        for _ in range(repetitions):
+            debut = time.perf_counter()
+            octets = rendre()
+            durees.append(time.perf_counter() - debut)
+    finally:
+        if mode == 'flask':
+            shutil.rmtree(dossier, ignore_errors=True)
+    rss_pic = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    pages = (metriques.valeur('devis_pages_total') - pages_avant) // repetitions
+
+    secondes = statistics.median(durees)
+    return {
+        'scenario': scenario,
+        'mode': mode,
+        'repetitions': repetitions,
+        'secondes': round(secondes, 4),
+        'secondes_min': round(min(durees), 4),
+        'rss_pic_mo': round(rss_pic / 1024, 1),
+        'rss_delta_mo': round((rss_pic - rss_avant) / 1024, 1),
+        'octets_pdf': octets,
+        'pages': pages,
+        'pages_par_seconde': round(pages / secondes, 1) if secondes > 0 else None,
+    }
+
+
+def _executer(scenario, mode, repetitions):
+    """Exécute une mesure dans un processus neuf (pic RSS propre à la mesure)"""
+    sortie = subprocess.check_output([
+        sys.executable, '-c',
+        "import json; from benchmarks.suite import _mesurer; "
+        f"print(json.dumps(_mesurer({scenario!r}, {mode!r}, {repetitions})))"
+    ])
+    return json.loads(sortie.splitlines()[-1])
+
+
+def _meta():
+    import reportlab
+
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'reportlab': reportlab.Version,
+        'machine': platform.machine(),
+        'systeme': platform.platform(),
+    }
+
+
+def comparer(resultats, reference, seuil):
+    """Liste des régressions (mesure plus de `seuil` au-dessus de la référence)"""
+    index = {(r['scenario'], r['mode']): r for r in reference['results']}
+    regressions = []
+    for resultat in resultats['results']:
+        ancien = index.get((resultat['scenario'], resultat['mode']))
+        if ancien is None:
+            continue
+        for mesure in MESURES_COMPAREES:
+            avant, apres = ancien.get(mesure), resultat.get(mesure)
+            if avant and apres is not None and apres > avant * (1 + seuil):
+                regressions.append({
+                    'scenario': resultat['scenario'],
+                    'mode': resultat['mode'],
+                    'mesure': mesure,
+                    'reference': avant,
+                    'actuel': apres,
+                    'ecart': round(apres / avant - 1, 3),
+                })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('scenarios', nargs='*', help="Scénarios à exécuter (par défaut : tous)")
+    parser.add_argument('--quick', action='store_true', help="Sous-ensemble rapide des scénarios")
+    parser.add_argument('--mode', choices=MODES + ('all',), default='all')
+    parser.add_argument('--repeat', type=int, default=3, help="Répétitions par mesure (médiane)")
+    parser.add_argument('--output', help="Fichier JSON des résultats")
+    parser.add_argument('--baseline', help="Fichier JSON de référence à comparer")
+    parser.add_argument('--threshold', type=float, default=0.15, help="Seuil de régression (0.15 = +15 %%)")
+    args = parser.parse_args(argv)
+
+    scenarios = args.scenarios or (SCENARIOS_RAPIDES if args.quick else tuple(SCENARIOS))
+    inconnus = set(scenarios) - set(SCENARIOS)
+    if inconnus:
+        parser.error(f"scénarios inconnus : {', '.join(sorted(inconnus))}")
+    modes = MODES if args.mode == 'all' else (args.mode,)
+
+    resultats = {'meta': _meta(), 'results': []}
+    print(f"{'scénario':<22} {'mode':<7} {'s':>8} {'RSS (Mo)':>9} {'PDF (Ko)':>9} {'pages':>6} {'pages/s':>8}")
+    for scenario in scenarios:
+        for mode in modes:
+            r = _executer(scenario, mode, args.repeat)
+            resultats['results'].append(r)
+            print(f"{scenario:<22} {mode:<7} {r['secondes']:>8.3f} {r['rss_pic_mo']:>9} "
+                  f"{r['octets_pdf'] // 1024:>9} {r['pages']:>6} {r['pages_par_seconde']:>8}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(resultats, f, ensure_ascii=False, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            reference = json.load(f)
+        regressions = comparer(resultats, reference, args.threshold)
+        for r in regressions:
+            print(f"RÉGRESSION {r['scenario']} ({r['mode']}) {r['mesure']} : "
+                  f"{r['reference']} -> {r['actuel']} (+{r['ecart'] * 100:.1f} %)")
+        if regressions:
+            return 1
+        print(f"Aucune régression au-delà de {args.threshold * 100:.0f} %")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
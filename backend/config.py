@@ -8,4 +8,31 @@ class Config:
     TEMP_FOLDER = os.environ.get('TEMP_FOLDER') or 'temp'
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',')
     PDF_RETENTION_TIME = int(os.environ.get('PDF_RETENTION_TIME', 3600))  # 1 heure par défaut
-    DEBUG = os.environ.get('FLASK_DEBUG', '0') == '1'
\ No newline at end of file
+    TEMP_FOLDER_MAX_BYTES = int(os.environ.get('TEMP_FOLDER_MAX_BYTES', 0))  # 0 = pas de plafond
+    RETENTION_RECONCILE_INTERVAL = int(os.environ.get('RETENTION_RECONCILE_INTERVAL', 3600))  # Parcours du dossier par le worker élu
+    RETENTION_CAP_INTERVAL = int(os.environ.get('RETENTION_CAP_INTERVAL', 60))  # Parcours plus fréquent quand TEMP_FOLDER_MAX_BYTES est fixé
+    ARTIFACT_BACKEND = os.environ.get('ARTIFACT_BACKEND', 'filesystem')  # filesystem, sqlite ou memory
+    ARTIFACT_SHARD_DEPTH = int(os.environ.get('ARTIFACT_SHARD_DEPTH', 2))  # Niveaux de sous-dossiers (0 = à plat)
+    ARTIFACT_SQLITE_PATH = os.environ.get('ARTIFACT_SQLITE_PATH')  # Par défaut : <TEMP_FOLDER>/artifacts.sqlite3
+    PROFILES_DB = os.environ.get('PROFILES_DB')  # Base SQLite des profils de société (par défaut : instance/profiles.sqlite3)
+    DOWNLOAD_OFFLOAD = os.environ.get('DOWNLOAD_OFFLOAD') or None  # x-accel-redirect (nginx) ou x-sendfile, derrière un proxy
+    DOWNLOAD_ACCEL_PREFIX = os.environ.get('DOWNLOAD_ACCEL_PREFIX', '/_artifacts/')  # Location interne nginx pointant sur TEMP_FOLDER
+    DEBUG = os.environ.get('FLASK_DEBUG', '0') == '1'
+    RENDER_CACHE_MAX_ENTRIES = int(os.environ.get('RENDER_CACHE_MAX_ENTRIES', 256))  # 0 désactive le cache
+    RENDER_CACHE_MAX_BYTES = int(os.environ.get('RENDER_CACHE_MAX_BYTES', 200 * 1024 * 1024))  # 200 Mo par défaut
+    BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', 0)) or None  # None = nombre de CPU
+    BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 1000))
+    JOB_MAX_QUEUE_DEPTH = int(os.environ.get('JOB_MAX_QUEUE_DEPTH', 100))
+    JOB_RETRY_AFTER = int(os.environ.get('JOB_RETRY_AFTER', 5))  # secondes
+    JOBS_DB = os.environ.get('JOBS_DB')  # Base SQLite de l'état des jobs, partagée par les workers (par défaut : instance/jobs.sqlite3)
+    RENDER_CONCURRENCY = int(os.environ.get('RENDER_CONCURRENCY', 2))  # Rendus simultanés par worker (0 = illimité)
+    RENDER_QUEUE_TIMEOUT = float(os.environ.get('RENDER_QUEUE_TIMEOUT', 10))  # Attente maximale d'un créneau de rendu, en secondes
+    RENDER_RETRY_AFTER = int(os.environ.get('RENDER_RETRY_AFTER', 2))  # secondes
+    RENDER_EXECUTOR = os.environ.get('RENDER_EXECUTOR', 'thread')  # thread, ou process (pool des lots, hors GIL du worker)
+    RENDER_WARMUP = os.environ.get('RENDER_WARMUP', '1') == '1'  # Import et rendu jetable au chargement de wsgi.py / asgi.py
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 16))  # Threads des requêtes légères (point d'entrée ASGI)
+    IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', 32 * 1024 * 1024))  # 32 Mo par défaut
+    PAGE_CACHE_MAX_BYTES = int(os.environ.get('PAGE_CACHE_MAX_BYTES', 64 * 1024 * 1024))  # Pages de produits déjà mises en page (0 désactive le rendu incrémental)
+    IMAGE_DPI = int(os.environ.get('IMAGE_DPI', 150))  # Résolution des logos et signatures dans le PDF
+    PDF_FONT_FILES = [f for f in os.environ.get('PDF_FONT_FILES', '').split(',') if f]  # TTF intégrés par le profil archive (normale, grasse, italique, grasse italique ; par défaut Vera)
+    SERVER_TIMING = os.environ.get('SERVER_TIMING', '0') == '1'  # En-tête Server-Timing sur /api/generate-devis
@@ -0,0 +1,34 @@
+"""
+Configuration gunicorn du point d'entrée WSGI :
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Avec preload_app, wsgi.py (création de l'application et préchauffage de la
+pile de rendu, voir app.demarrage) est chargé une seule fois dans le maître ;
+les workers forkés partagent ces pages mémoire en copie sur écriture.
+Les threads, eux, ne survivent pas au fork : le thread de nettoyage des
+artefacts est démarré dans chaque worker (post_fork).
+"""
+import gc
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+preload_app = os.environ.get('GUNICORN_PRELOAD', '1') == '1'
+
+
+def pre_fork(server, worker):
+    # Objets du maître exclus du ramasse-miettes : leurs en-têtes ne sont pas
+    # réécrits dans les workers, et les pages restent partagées
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Application déjà chargée par le maître : le nettoyage démarre sans
+    # attendre la première requête du worker (l'élection choisit qui parcourt le stockage)
+    if server.cfg.preload_app:
+        app = worker.app.wsgi()
+        if not app.config['DEBUG']:
+            app.extensions['retention'].start()
@@ -1,6 +1,12 @@
 from app import create_app
+from app.demarrage import prechauffer
 
 app = create_app()
 
+# Pile de rendu importée et exercée avant la première requête
+# (une seule fois dans le maître avec gunicorn -c gunicorn.conf.py)
+if app.config['RENDER_WARMUP']:
+    prechauffer(app)
+
 if __name__ == '__main__':
     app.run(debug=app.config['DEBUG'])
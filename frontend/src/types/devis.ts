@@ -43,6 +43,7 @@ export interface Conditions {
 }
 
 export interface PaginationSettings {
+  mode?: "fixed" | "auto";
   itemsPerPage: number;
   currentPage: number;
   totalPages: number;
@@ -62,4 +63,9 @@ export interface DevisData {
   conditions: Conditions;
   isAutoEntrepreneur?: boolean;
   paginationSettings?: PaginationSettings;
+  // Profil de société enregistré côté serveur (PUT /api/profiles/:id)
+  profile_id?: string;
+  profile_version?: number;
+  // Profil de sortie du PDF : taille des images, polices intégrées
+  output_profile?: 'screen' | 'print' | 'archive';
 }